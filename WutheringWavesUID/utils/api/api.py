@@ -13,17 +13,29 @@ NET_SERVER_ID_MAP = {
 }
 
 
+def get_mock_url():
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("KuroApiMockUrl").data.rstrip("/")
+
+
 def get_main_url():
     from ...wutheringwaves_config import WutheringWavesConfig
 
+    if mock_url := get_mock_url():
+        return mock_url
+
     KuroUrlProxyUrl = WutheringWavesConfig.get_config("KuroUrlProxyUrl").data
     return KuroUrlProxyUrl or "https://api.kurobbs.com"
 
 
 MAIN_URL = get_main_url()
+MOCK_URL = get_mock_url()
 
-GACHA_LOG_URL = "https://gmserver-api.aki-game2.com/gacha/record/query"
-GACHA_NET_LOG_URL = "https://gmserver-api.aki-game2.net/gacha/record/query"
+GACHA_LOG_URL = f"{MOCK_URL or 'https://gmserver-api.aki-game2.com'}/gacha/record/query"
+GACHA_NET_LOG_URL = (
+    f"{MOCK_URL or 'https://gmserver-api.aki-game2.net'}/gacha/record/query"
+)
 
 REQUEST_TOKEN = f"{MAIN_URL}/aki/roleBox/requestToken"
 LOGIN_LOG_URL = f"{MAIN_URL}/user/login/log"
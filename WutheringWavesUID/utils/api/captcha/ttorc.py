@@ -4,6 +4,7 @@ from typing import Any, Dict
 import aiohttp
 
 from ..captcha.errors import CaptchaVerifyError
+from ..http_pool import http_pool
 from . import register_solver
 from .base import RemoteCaptchaSolver
 
@@ -30,9 +31,15 @@ class TtorcCaptchaSolver(RemoteCaptchaSolver):
         session: aiohttp.ClientSession | None = None,
     ):
         self._appkey = appkey
-        self._session = session or aiohttp.ClientSession()
+        self._session = session
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self._session and not self._session.closed:
+            return self._session
+        return await http_pool.get_session()
 
     async def close(self) -> None:
+        # 共享连接池由插件统一关闭
         if self._session and not self._session.closed:
             await self._session.close()
 
@@ -49,7 +56,8 @@ class TtorcCaptchaSolver(RemoteCaptchaSolver):
         }
 
         try:
-            async with self._session.post(
+            session = await self.get_session()
+            async with session.post(
                 self.API_SOLVE,
                 data=params,
                 timeout=aiohttp.ClientTimeout(total=10),
@@ -0,0 +1,79 @@
+import random
+import time
+from typing import Dict
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 8.0) -> float:
+    """指数退避 + 全抖动"""
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+class CircuitBreaker:
+    """
+    单个接口的熔断器
+    连续失败达到阈值后熔断，冷却期内直接失败；冷却结束后放行一个探测请求
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                # 冷却结束，放行一个探测请求
+                self.state = self.HALF_OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+        # 半开状态下探测请求尚未返回；超过冷却时间仍未返回则重新放行一个探测
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_cancelled(self):
+        """请求被取消: 探测请求按失败处理，正常状态下不计入失败次数"""
+        if self.state == self.HALF_OPEN:
+            self.record_failure()
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.cooldown)
+            self._breakers[endpoint] = breaker
+        return breaker
+
+    def open_endpoints(self) -> Dict[str, int]:
+        """熔断中的接口 -> 连续失败次数"""
+        return {
+            k: v.failures
+            for k, v in self._breakers.items()
+            if v.state != CircuitBreaker.CLOSED
+        }
@@ -0,0 +1,205 @@
+import asyncio
+import random
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+from gsuid_core.logger import logger
+
+from ..database.models import WavesUser
+
+if TYPE_CHECKING:
+    from .requests import WavesApi
+
+
+def get_pool_size() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("PublicCookiePoolSize").data or 0
+
+
+def get_pool_quota() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("PublicCookieHourQuota").data or 0
+
+
+class CookieEntry:
+    MAX_SCORE = 10
+    ERROR_PENALTY = 3
+
+    def __init__(self, uid: str, cookie: str):
+        self.uid = uid
+        self.cookie = cookie
+        # 健康分，即加权轮询的权重
+        self.score = self.MAX_SCORE
+        # 平滑加权轮询的当前权重
+        self.current_weight = 0
+        self.used = 0
+        self.window_start = time.time()
+
+    def quota_left(self, quota: int) -> bool:
+        if quota <= 0:
+            return True
+        now = time.time()
+        if now - self.window_start >= 3600:
+            self.window_start = now
+            self.used = 0
+        return self.used < quota
+
+
+class PublicCookiePool:
+    """
+    预校验的公共ck池
+    热路径只做内存选择，校验交给后台任务 revalidate
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CookieEntry] = {}
+        self._lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        # 正在进行的复查/补充任务
+        self._revalidating: Optional[asyncio.Task] = None
+        # 有新ck入池时通知等待者
+        self._added = asyncio.Event()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def pick(self) -> Optional[str]:
+        """平滑加权轮询，跳过配额用尽的ck"""
+        if get_pool_size() <= 0:
+            return None
+        quota = get_pool_quota()
+        candidates = [e for e in self._entries.values() if e.quota_left(quota)]
+        if not candidates:
+            return None
+
+        total = 0
+        best: Optional[CookieEntry] = None
+        for entry in candidates:
+            entry.current_weight += entry.score
+            total += entry.score
+            if best is None or entry.current_weight > best.current_weight:
+                best = entry
+
+        assert best is not None
+        best.current_weight -= total
+        best.used += 1
+        return best.cookie
+
+    def add(self, uid: str, cookie: str):
+        if cookie in self._entries:
+            return
+        # 容量为0时关闭ck池
+        if len(self._entries) >= get_pool_size():
+            return
+        self._entries[cookie] = CookieEntry(uid, cookie)
+        self._added.set()
+
+    def remove(self, uid: Optional[str] = None, cookie: Optional[str] = None):
+        for key in [
+            k
+            for k, e in self._entries.items()
+            if (cookie and e.cookie == cookie) or (uid and e.uid == uid)
+        ]:
+            del self._entries[key]
+
+    def report_ok(self, cookie: str):
+        if entry := self._entries.get(cookie):
+            entry.score = min(entry.score + 1, CookieEntry.MAX_SCORE)
+
+    def report_error(self, cookie: Optional[str]):
+        if not cookie:
+            return
+        entry = self._entries.get(cookie)
+        if not entry:
+            return
+        entry.score -= CookieEntry.ERROR_PENALTY
+        if entry.score <= 0:
+            logger.info(f"[鸣潮] 公共ck健康分过低，移出ck池 uid:{entry.uid}")
+            del self._entries[cookie]
+
+    async def validate(self, api: "WavesApi", uid: str, cookie: str) -> bool:
+        data = await api.login_log(uid, cookie)
+        if not data.success:
+            await data.mark_cookie_invalid(uid, cookie)
+            return False
+
+        data = await api.refresh_data(uid, cookie)
+        if not data.success:
+            await data.mark_cookie_invalid(uid, cookie)
+            return False
+
+        return True
+
+    async def revalidate(self, api: "WavesApi") -> int:
+        """复查池内ck并补充至配置数量，返回池内ck数"""
+        pool_size = get_pool_size()
+        if pool_size <= 0:
+            self._entries.clear()
+            return 0
+
+        if self._lock.locked():
+            # 已有复查进行中，等其结束即可
+            async with self._lock:
+                return len(self._entries)
+
+        async with self._lock:
+            for entry in list(self._entries.values()):
+                if await self.validate(api, entry.uid, entry.cookie):
+                    self.report_ok(entry.cookie)
+                else:
+                    self.remove(cookie=entry.cookie)
+
+            need = pool_size - len(self._entries)
+            if need <= 0:
+                return len(self._entries)
+
+            user_list: List[WavesUser] = await WavesUser.get_waves_all_user()
+            random.shuffle(user_list)
+            # 单次补充最多校验的数量，避免一次性打满上游
+            checks = need * 2
+            for user in user_list:
+                if need <= 0 or checks <= 0:
+                    break
+                if user.cookie in self._entries:
+                    continue
+                if not await WavesUser.cookie_validate(user.uid):
+                    continue
+
+                checks -= 1
+                if await self.validate(api, user.uid, user.cookie):
+                    self.add(user.uid, user.cookie)
+                    need -= 1
+
+            logger.debug(f"[鸣潮] 公共ck池刷新完成, 数量: {len(self._entries)}")
+            return len(self._entries)
+
+    def revalidate_in_background(self, api: "WavesApi") -> asyncio.Task:
+        """启动复查/补充任务，已有任务进行中时直接返回该任务"""
+        if self._revalidating is not None and not self._revalidating.done():
+            return self._revalidating
+        task = asyncio.create_task(self.revalidate(api))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self._revalidating = task
+        return task
+
+    async def wait_pick(self, api: "WavesApi") -> Optional[str]:
+        """
+        池为空时加入正在进行的补充任务 (没有则启动一个)，
+        第一个ck入池或补充结束后再选取，不另外逐个校验
+        """
+        if ck := self.pick():
+            return ck
+        self._added.clear()
+        task = self.revalidate_in_background(api)
+        added = asyncio.ensure_future(self._added.wait())
+        try:
+            await asyncio.wait({task, added}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            added.cancel()
+        return self.pick()
+
+
+public_cookie_pool = PublicCookiePool()
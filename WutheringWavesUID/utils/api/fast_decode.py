@@ -0,0 +1,69 @@
+from typing import Any, Dict, Optional, Tuple, Type
+
+import msgspec
+from msgspec import Raw, Struct
+
+from gsuid_core.logger import logger
+
+from .api import ROLE_DATA_URL, ROLE_DETAIL_URL
+from .model import RoleDetailStruct, RoleList
+
+# 直接解码为类型对象的接口
+TYPED_ENDPOINTS: Dict[str, Type] = {
+    ROLE_DATA_URL: RoleList,
+    ROLE_DETAIL_URL: RoleDetailStruct,
+}
+
+
+class KuroEnvelope(Struct):
+    """库洛接口外层结构，data 延迟解码"""
+
+    code: int = 0
+    msg: Optional[str] = ""
+    data: Raw = Raw(b"null")
+
+
+_envelope_decoder = msgspec.json.Decoder(KuroEnvelope)
+_any_decoder = msgspec.json.Decoder()
+_str_decoder = msgspec.json.Decoder(str)
+_typed_decoders: Dict[Type, msgspec.json.Decoder] = {}
+
+
+def _get_decoder(data_type: Type) -> msgspec.json.Decoder:
+    decoder = _typed_decoders.get(data_type)
+    if decoder is None:
+        decoder = msgspec.json.Decoder(data_type)
+        _typed_decoders[data_type] = decoder
+    return decoder
+
+
+def _decode_data(raw: bytes, data_type: Optional[Type], url: str) -> Any:
+    if data_type is not None:
+        try:
+            return _get_decoder(data_type).decode(raw)
+        except msgspec.ValidationError as e:
+            # 结构变动时退回普通解码，由调用方决定如何处理
+            logger.warning(f"url:[{url}] 数据结构校验失败: {e}")
+    return _any_decoder.decode(raw)
+
+
+def decode_kuro_resp(body: bytes, url: str) -> Tuple[int, str, Any]:
+    """
+    一次解码库洛接口响应 (含 akiBox 接口中 json 字符串形式的 data)
+    返回 (code, msg, data)，body 不是 json 对象时抛出 msgspec.DecodeError
+    """
+    envelope = _envelope_decoder.decode(body)
+    data_type = TYPED_ENDPOINTS.get(url)
+    raw = bytes(envelope.data)
+
+    if raw[:1] == b'"':
+        text = _str_decoder.decode(raw)
+        try:
+            data = _decode_data(text.encode(), data_type, url)
+        except msgspec.DecodeError:
+            # 普通字符串，不是嵌套的 json
+            data = text
+    else:
+        data = _decode_data(raw, data_type, url)
+
+    return envelope.code, envelope.msg or "", data
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Any, Dict, Tuple
+
+import aiohttp
+
+from gsuid_core.logger import logger
+
+# 空闲连接保持时间(秒)
+KEEPALIVE_TIMEOUT = 30
+# DNS 缓存时间(秒)
+DNS_CACHE_TTL = 300
+
+
+def get_pool_limit() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("HttpPoolLimit").data or 100
+
+
+def get_pool_limit_per_host() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("HttpPoolLimitPerHost").data or 0
+
+
+class PoolStats:
+    def __init__(self):
+        self.requests = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, wait: float):
+        self.wait_count += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+
+class HttpPool:
+    """
+    插件共享的 aiohttp 连接池
+    按 key 区分 session (如不同代理)，统一管理连接数、DNS缓存、keep-alive 与关闭
+    session 与事件循环绑定，任务分发器线程中的调用会拿到该线程自己的 session
+    """
+
+    def __init__(self):
+        self._sessions: Dict[Tuple[asyncio.AbstractEventLoop, str], aiohttp.ClientSession] = {}
+        self._locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+        self._stats: Dict[str, PoolStats] = {}
+
+    async def get_session(
+        self, key: str = "default", ssl: bool = True
+    ) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get((loop, key))
+        if session and not session.closed:
+            return session
+
+        if loop not in self._locks:
+            self._locks[loop] = asyncio.Lock()
+
+        async with self._locks[loop]:
+            session = self._sessions.get((loop, key))
+            if session and not session.closed:
+                return session
+
+            connector = aiohttp.TCPConnector(
+                ssl=ssl,
+                limit=get_pool_limit(),
+                limit_per_host=get_pool_limit_per_host(),
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            stats = self._stats.setdefault(key, PoolStats())
+            session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[self._trace_config(stats)],
+            )
+            self._sessions[(loop, key)] = session
+            return session
+
+    def _trace_config(self, stats: PoolStats) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            stats.requests += 1
+
+        async def on_queued_start(session, ctx, params):
+            ctx.queued_at = time.monotonic()
+
+        async def on_queued_end(session, ctx, params):
+            stats.record_wait(time.monotonic() - ctx.queued_at)
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        return trace_config
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各连接池的活跃/空闲连接数与排队等待时间"""
+        result: Dict[str, Dict[str, Any]] = {}
+        for key, stats in self._stats.items():
+            active = idle = 0
+            for (_, session_key), session in self._sessions.items():
+                if session_key != key or session.closed:
+                    continue
+                connector = session.connector
+                active += len(getattr(connector, "_acquired", ()))
+                idle += sum(len(v) for v in getattr(connector, "_conns", {}).values())
+            result[key] = {
+                "active": active,
+                "idle": idle,
+                "requests": stats.requests,
+                "wait_count": stats.wait_count,
+                "wait_avg": (
+                    stats.wait_total / stats.wait_count if stats.wait_count else 0.0
+                ),
+                "wait_max": stats.wait_max,
+            }
+        return result
+
+    async def close(self):
+        """关闭当前事件循环下的所有 session"""
+        loop = asyncio.get_running_loop()
+        for session_key in [k for k in self._sessions if k[0] is loop]:
+            session = self._sessions.pop(session_key)
+            if session.closed:
+                continue
+            try:
+                await session.close()
+            except Exception as e:
+                logger.warning(f"[鸣潮] 关闭连接池失败: {e}")
+        self._locks.pop(loop, None)
+
+
+http_pool = HttpPool()
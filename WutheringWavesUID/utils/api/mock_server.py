@@ -0,0 +1,574 @@
+"""
+库洛接口模拟服务 (离线压测用)
+
+覆盖 WavesApi 使用的主要接口: 角色列表、角色详情、基础信息、深塔/冥海、
+抽卡记录、wiki、公告等，返回结构合法的随机数据。
+
+用法:
+    python mock_server.py --port 9870 --latency 80 --jitter 40 \\
+        --error 220=0.01 --error 10903=0.01 --error 270=0.005 \\
+        --error geetest=0.01 --rps 200
+
+然后将配置【库洛接口模拟服务地址】设置为 http://127.0.0.1:9870 并重启，
+所有库洛接口(含抽卡记录)都会请求到该服务。
+
+本文件不依赖 gsuid_core，可以单独运行。
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+MAP_PATH = Path(__file__).parents[1] / "map" / "detail_json"
+
+SKILL_TYPES = ["常态攻击", "共鸣技能", "共鸣回路", "共鸣解放", "变奏技能", "延奏技能"]
+PROPS = ["攻击", "生命", "防御", "暴击", "暴击伤害", "共鸣效率", "普攻伤害加成"]
+ICON = "https://web-static.kurobbs.com/mock.png"
+
+
+def _load_json_dir(name: str) -> Dict[str, Dict[str, Any]]:
+    path = MAP_PATH / name
+    if not path.exists():
+        return {}
+    result = {}
+    for file in path.glob("*.json"):
+        try:
+            result[file.stem] = json.loads(file.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+    return result
+
+
+class MockData:
+    """根据 uid 生成稳定的随机数据"""
+
+    def __init__(self):
+        self.chars = {
+            int(k): v for k, v in _load_json_dir("char").items() if k.isdigit()
+        } or {
+            1102: {"name": "散华", "attributeId": 1, "weaponTypeId": 2, "starLevel": 4}
+        }
+        self.weapons = {
+            int(k): v for k, v in _load_json_dir("weapon").items() if k.isdigit()
+        }
+        self.echoes = {
+            int(k): v for k, v in _load_json_dir("echo").items() if k.isdigit()
+        }
+        self.sonatas = list(_load_json_dir("sonata").keys()) or ["凝夜白霜"]
+
+    def rng(self, *seed: Any) -> random.Random:
+        return random.Random("_".join(str(i) for i in seed))
+
+    def owned_chars(self, uid: str) -> List[int]:
+        rng = self.rng(uid, "chars")
+        char_ids = sorted(self.chars.keys())
+        return sorted(rng.sample(char_ids, k=min(len(char_ids), rng.randint(20, 45))))
+
+    def role(self, uid: str, char_id: int) -> Dict[str, Any]:
+        char = self.chars.get(char_id, {})
+        rng = self.rng(uid, char_id, "role")
+        return {
+            "roleId": char_id,
+            "level": 90,
+            "breach": 6,
+            "roleName": char.get("name", f"角色{char_id}"),
+            "roleIconUrl": ICON,
+            "rolePicUrl": ICON,
+            "starLevel": char.get("starLevel", 5),
+            "attributeId": char.get("attributeId", 1),
+            "attributeName": None,
+            "weaponTypeId": char.get("weaponTypeId", 1),
+            "weaponTypeName": None,
+            "acronym": "mock",
+            "chainUnlockNum": rng.randint(0, 6),
+        }
+
+    def role_list(self, uid: str) -> Dict[str, Any]:
+        return {
+            "roleList": [self.role(uid, i) for i in self.owned_chars(uid)],
+            "showRoleIdList": None,
+            "showToGuest": True,
+        }
+
+    def base_info(self, uid: str) -> Dict[str, Any]:
+        rng = self.rng(uid, "base")
+        return {
+            "name": f"漂泊者{uid[-4:]}",
+            "id": int(uid),
+            "creatTime": 1716000000000,
+            "activeDays": rng.randint(1, 600),
+            "level": rng.randint(40, 80),
+            "worldLevel": rng.randint(5, 8),
+            "roleNum": len(self.owned_chars(uid)),
+            "bigCount": rng.randint(0, 200),
+            "smallCount": rng.randint(0, 300),
+            "achievementCount": rng.randint(0, 800),
+            "achievementStar": rng.randint(0, 400),
+            "boxList": [{"boxName": "朴素奇藏箱", "num": rng.randint(0, 500)}],
+            "weeklyInstCount": 3,
+            "weeklyInstCountLimit": 3,
+            "storeEnergy": rng.randint(0, 480),
+            "storeEnergyLimit": 480,
+        }
+
+    def _weapon(self, rng: random.Random, weapon_type: int) -> Dict[str, Any]:
+        candidates = [
+            (k, v) for k, v in self.weapons.items() if v.get("type") == weapon_type
+        ] or [(21010011, {"name": "教学长刃", "starLevel": 1, "type": weapon_type})]
+        weapon_id, weapon = rng.choice(candidates)
+        return {
+            "weapon": {
+                "weaponId": weapon_id,
+                "weaponName": weapon.get("name", ""),
+                "weaponType": weapon_type,
+                "weaponStarLevel": weapon.get("starLevel", 5),
+                "weaponIcon": ICON,
+                "weaponEffectName": weapon.get("effectName"),
+            },
+            "level": 90,
+            "breach": 6,
+            "resonLevel": rng.randint(1, 5),
+        }
+
+    def _phantom(self, rng: random.Random, sonata: str, cost: int) -> Dict[str, Any]:
+        echo_id = rng.choice(list(self.echoes.keys())) if self.echoes else 390070051
+        echo = self.echoes.get(echo_id, {})
+        return {
+            "phantomProp": {
+                "phantomPropId": echo_id,
+                "name": echo.get("name", "声骸"),
+                "phantomId": echo_id,
+                "quality": 5,
+                "cost": cost,
+                "iconUrl": ICON,
+                "skillDescription": "",
+            },
+            "cost": cost,
+            "quality": 5,
+            "level": 25,
+            "fetterDetail": {
+                "groupId": 1,
+                "name": sonata,
+                "iconUrl": ICON,
+                "num": 5,
+                "firstDescription": "",
+                "secondDescription": "",
+            },
+            "mainProps": [
+                {"attributeName": rng.choice(PROPS), "attributeValue": "33%"},
+                {"attributeName": "攻击", "attributeValue": "150"},
+            ],
+            "subProps": [
+                {
+                    "attributeName": name,
+                    "attributeValue": f"{rng.uniform(6, 21):.1f}%",
+                }
+                for name in rng.sample(PROPS, k=5)
+            ],
+        }
+
+    def role_detail(self, uid: str, char_id: int) -> Optional[Dict[str, Any]]:
+        if char_id not in self.owned_chars(uid):
+            return None
+        rng = self.rng(uid, char_id, "detail")
+        role = self.role(uid, char_id)
+        char = self.chars.get(char_id, {})
+        sonata = rng.choice(self.sonatas)
+        skills = []
+        for index, (key, value) in enumerate((char.get("skillTree") or {}).items()):
+            skill = value.get("skill", {}) if isinstance(value, dict) else {}
+            if skill.get("type") not in SKILL_TYPES:
+                continue
+            skills.append(
+                {
+                    "skill": {
+                        "id": int(key) if str(key).isdigit() else index,
+                        "type": skill["type"],
+                        "name": skill.get("name", ""),
+                        "description": "",
+                        "iconUrl": ICON,
+                    },
+                    "level": rng.randint(6, 10),
+                }
+            )
+        chains = [
+            {
+                "name": f"共鸣链{i}",
+                "order": i,
+                "description": "",
+                "iconUrl": ICON,
+                "unlocked": i <= role["chainUnlockNum"],
+            }
+            for i in range(1, 7)
+        ]
+        return {
+            "role": role,
+            "level": 90,
+            "chainList": chains,
+            "weaponData": self._weapon(rng, role["weaponTypeId"]),
+            "phantomData": {
+                "cost": 12,
+                "equipPhantomList": [
+                    self._phantom(rng, sonata, cost) for cost in (4, 3, 3, 1, 1)
+                ],
+            },
+            "skillList": skills,
+        }
+
+    def abyss(self, uid: str) -> Dict[str, Any]:
+        rng = self.rng(uid, "abyss")
+        owned = self.owned_chars(uid)
+        areas = []
+        for area_id, area_name in enumerate(["残响之塔", "深境之塔", "回音之塔"], 1):
+            floors = [
+                {
+                    "floor": floor,
+                    "picUrl": ICON,
+                    "star": rng.randint(0, 3),
+                    "roleList": [
+                        {"roleId": i, "iconUrl": ICON} for i in rng.sample(owned, 3)
+                    ],
+                }
+                for floor in range(1, 5)
+            ]
+            areas.append(
+                {
+                    "areaId": area_id,
+                    "areaName": area_name,
+                    "star": sum(f["star"] for f in floors),
+                    "maxStar": 12,
+                    "floorList": floors,
+                }
+            )
+        return {
+            "isUnlock": True,
+            "seasonEndTime": int(time.time()) + 7 * 86400,
+            "difficultyList": [
+                {"difficulty": 1, "difficultyName": "深境区", "towerAreaList": areas}
+            ],
+        }
+
+    def slash(self, uid: str) -> Dict[str, Any]:
+        rng = self.rng(uid, "slash")
+        owned = self.owned_chars(uid)
+        challenges = []
+        for challenge_id in range(1, 13):
+            halves = [
+                {
+                    "buffDescription": "",
+                    "buffIcon": ICON,
+                    "buffName": "信物",
+                    "buffQuality": 5,
+                    "roleList": [
+                        {"iconUrl": ICON, "roleId": i} for i in rng.sample(owned, 3)
+                    ],
+                    "score": rng.randint(10000, 30000),
+                }
+                for _ in range(2)
+            ]
+            challenges.append(
+                {
+                    "challengeId": challenge_id,
+                    "challengeName": f"冥歌海墟{challenge_id}",
+                    "halfList": halves,
+                    "rank": rng.choice(["S", "SS", "SSS"]),
+                    "score": sum(h["score"] for h in halves),
+                }
+            )
+        return {
+            "isUnlock": True,
+            "seasonEndTime": int(time.time()) + 14 * 86400,
+            "difficultyList": [
+                {
+                    "allScore": sum(c["score"] for c in challenges),
+                    "challengeList": challenges,
+                    "difficulty": 2,
+                    "difficultyName": "无尽深渊",
+                    "homePageBG": ICON,
+                    "maxScore": 60000,
+                    "teamIcon": ICON,
+                }
+            ],
+        }
+
+    def gacha_log(self, uid: str, pool_type: str) -> List[Dict[str, Any]]:
+        rng = self.rng(uid, pool_type, "gacha")
+        chars = list(self.chars.items())
+        logs = []
+        now = int(time.time())
+        for i in range(rng.randint(0, 200)):
+            char_id, char = rng.choice(chars)
+            quality = 5 if rng.random() < 0.02 else (4 if rng.random() < 0.1 else 3)
+            logs.append(
+                {
+                    "cardPoolType": pool_type,
+                    "resourceId": char_id,
+                    "qualityLevel": quality,
+                    "resourceType": "角色",
+                    "name": char.get("name", ""),
+                    "count": 1,
+                    "time": time.strftime(
+                        "%Y-%m-%d %H:%M:%S", time.localtime(now - i * 3600)
+                    ),
+                }
+            )
+        return logs
+
+    def ann_list(self, event_type: str, page_size: int) -> Dict[str, Any]:
+        now = int(time.time() * 1000)
+        return {
+            "list": [
+                {
+                    "id": f"{event_type}{i:05d}",
+                    "postId": f"{event_type}{i:05d}",
+                    "postTitle": f"公告{event_type}-{i}",
+                    "eventType": int(event_type or 1),
+                    "coverUrl": ICON,
+                    "publishTime": now - i * 86400000,
+                    "startTime": now - i * 86400000,
+                    "endTime": now + 86400000,
+                }
+                for i in range(page_size)
+            ]
+        }
+
+
+class MockServer:
+    def __init__(
+        self,
+        latency: float = 0,
+        jitter: float = 0,
+        errors: Optional[Dict[str, float]] = None,
+        rps: int = 0,
+    ):
+        # 毫秒
+        self.latency = latency
+        self.jitter = jitter
+        # 错误码 -> 概率，geetest 表示返回验证码
+        self.errors = errors or {}
+        self.rps = rps
+        self._tokens = float(rps)
+        self._last_refill = time.monotonic()
+        self.data = MockData()
+        self.requests = 0
+
+    def _take_token(self) -> bool:
+        if self.rps <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.rps), self._tokens + (now - self._last_refill) * self.rps
+        )
+        self._last_refill = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _inject_error(self, form: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for code, rate in self.errors.items():
+            if random.random() >= rate:
+                continue
+            if code == "geetest":
+                if form.get("geeTestData"):
+                    continue
+                return {"code": 200, "msg": "请求成功", "data": {"geeTest": True}}
+            messages = {
+                "220": "登录已过期，请重新登录",
+                "10903": "数据令牌已失效",
+                "270": "当前环境存在风险无法进行操作，请切换网络环境后重试",
+            }
+            return {
+                "code": int(code),
+                "msg": messages.get(code, "mock error"),
+                "data": None,
+                "success": False,
+            }
+        return None
+
+    @staticmethod
+    def ok(data: Any, nested: bool = False) -> Dict[str, Any]:
+        # akiBox 系列接口的 data 是 json 字符串
+        return {
+            "code": 200,
+            "msg": "请求成功",
+            "data": json.dumps(data, ensure_ascii=False) if nested else data,
+            "success": True,
+        }
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if request.content_type == "application/json":
+            form: Dict[str, Any] = await request.json()
+        else:
+            form = dict(await request.post())
+
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if not self._take_token():
+            return web.json_response(
+                {"code": 500, "msg": "系统繁忙，请稍后再试", "data": None}
+            )
+
+        if error := self._inject_error(form):
+            return web.json_response(error)
+
+        path = request.path
+        uid = str(form.get("roleId") or form.get("playerId") or "100000001")
+        data = self.data
+
+        if path.endswith("/gacha/record/query"):
+            return web.json_response(
+                {
+                    "code": 0,
+                    "message": "success",
+                    "data": data.gacha_log(uid, str(form.get("cardPoolType", "1"))),
+                }
+            )
+
+        routes = {
+            "/user/login/log": lambda: self.ok({}),
+            "/user/sdkLogin": lambda: self.ok(
+                {"token": f"mock_token_{form.get('mobile', '')}", "userId": 1}
+            ),
+            "/aki/roleBox/requestToken": lambda: self.ok(
+                {"accessToken": f"mock_bat_{uid}"}
+            ),
+            "/gamer/role/list": lambda: self.ok(
+                [
+                    {
+                        "id": 1,
+                        "userId": 1,
+                        "gameId": 3,
+                        "serverId": "76402e5b20be2c39f095a152090afddc",
+                        "roleId": uid,
+                        "roleName": f"漂泊者{uid[-4:]}",
+                    }
+                ]
+            ),
+            "/aki/roleBox/akiBox/refreshData": lambda: self.ok(True),
+            "/gamer/widget/game3/refresh": lambda: self.ok({}),
+            "/aki/roleBox/akiBox/baseData": lambda: self.ok(
+                data.base_info(uid), nested=True
+            ),
+            "/aki/roleBox/akiBox/roleData": lambda: self.ok(
+                data.role_list(uid), nested=True
+            ),
+            "/aki/roleBox/akiBox/getRoleDetail": lambda: self.ok(
+                data.role_detail(uid, int(form.get("id", 0))), nested=True
+            ),
+            "/aki/roleBox/akiBox/towerIndex": lambda: self.ok(
+                data.abyss(uid), nested=True
+            ),
+            "/aki/roleBox/akiBox/towerDataDetail": lambda: self.ok(
+                data.abyss(uid), nested=True
+            ),
+            "/aki/roleBox/akiBox/slashIndex": lambda: self.ok(
+                data.slash(uid), nested=True
+            ),
+            "/aki/roleBox/akiBox/slashDetail": lambda: self.ok(
+                data.slash(uid), nested=True
+            ),
+            "/aki/roleBox/akiBox/calabashData": lambda: self.ok(
+                {
+                    "level": 10,
+                    "baseCatch": "50%",
+                    "strengthenCatch": "100%",
+                    "catchQuality": 5,
+                    "cost": 12,
+                    "maxCount": 200,
+                    "unlockCount": 150,
+                    "isUnlock": True,
+                },
+                nested=True,
+            ),
+            "/aki/roleBox/akiBox/exploreIndex": lambda: self.ok(
+                {"exploreList": [], "open": True}, nested=True
+            ),
+            "/aki/roleBox/akiBox/challengeDetails": lambda: self.ok(
+                {"challengeInfo": {}, "open": True, "isUnlock": False}, nested=True
+            ),
+            "/aki/roleBox/akiBox/moreActivity": lambda: self.ok(
+                {}, nested=True
+            ),
+            "/wiki/core/catalogue/config/getTree": lambda: self.ok([]),
+            "/wiki/core/homepage/getPage": lambda: self.ok(
+                {"contentJson": {"sideModules": [], "mainModules": []}}
+            ),
+            "/wiki/core/catalogue/item/getPage": lambda: self.ok(
+                {"results": {"records": [], "total": 0}}
+            ),
+            "/wiki/core/catalogue/item/getEntryDetail": lambda: self.ok(
+                {"id": form.get("id"), "name": "mock", "content": {"modules": []}}
+            ),
+            "/forum/companyEvent/findEventList": lambda: self.ok(
+                data.ann_list(
+                    str(form.get("eventType", "1")), int(form.get("pageSize", 5))
+                )
+            ),
+            "/forum/getPostDetail": lambda: self.ok(
+                {
+                    "postDetail": {
+                        "id": form.get("postId"),
+                        "postTitle": "mock",
+                        "postTime": "2024-01-01 00:00",
+                        "postContent": [],
+                    }
+                }
+            ),
+        }
+
+        for suffix, func in routes.items():
+            if path.endswith(suffix):
+                return web.json_response(func())
+
+        return web.json_response({"code": 404, "msg": "mock not found", "data": None})
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        return app
+
+
+def parse_errors(items: List[str]) -> Dict[str, float]:
+    errors = {}
+    for item in items:
+        code, _, rate = item.partition("=")
+        errors[code.strip().lower()] = float(rate or 0)
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="库洛接口模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9870)
+    parser.add_argument("--latency", type=float, default=0, help="平均延迟(ms)")
+    parser.add_argument("--jitter", type=float, default=0, help="延迟抖动(ms)")
+    parser.add_argument(
+        "--error",
+        action="append",
+        default=[],
+        help="错误注入, 如 220=0.01 / 10903=0.01 / 270=0.005 / geetest=0.01",
+    )
+    parser.add_argument("--rps", type=int, default=0, help="每秒请求上限(0为不限制)")
+    args = parser.parse_args()
+
+    server = MockServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        errors=parse_errors(args.error),
+        rps=args.rps,
+    )
+    web.run_app(server.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from typing import Dict, List, Union, Literal, Optional
 
+import msgspec
 from msgspec import UNSET, Struct, UnsetType, field
 from pydantic import Field, BaseModel, RootModel, model_validator
 
@@ -75,10 +76,130 @@ class Role(BaseModel):
     # mapRoleId: int | None
 
 
-class RoleList(BaseModel):
-    roleList: List[Role]
+class RoleListItem(Struct):
+    """共鸣者列表中的角色 (msgspec 直接解码)"""
+
+    roleId: int
+    level: int
+    roleName: str
+    starLevel: int
+    attributeId: int
+    weaponTypeId: int
+    acronym: str = ""
+    breach: Optional[int] = None
+    roleIconUrl: Optional[str] = None
+    rolePicUrl: Optional[str] = None
+    attributeName: Optional[str] = None
+    weaponTypeName: Optional[str] = None
+    chainUnlockNum: Optional[int] = None
+
+
+class RoleList(Struct):
+    """共鸣者列表 (msgspec 直接解码)"""
+
+    roleList: List[RoleListItem]
     showRoleIdList: Optional[List[int]] = None
-    showToGuest: bool
+    showToGuest: bool = False
+
+    @classmethod
+    def parse(cls, data) -> "RoleList":
+        if isinstance(data, cls):
+            return data
+        return msgspec.convert(data, cls)
+
+
+class ChainStruct(Struct):
+    order: int
+    unlocked: bool
+    name: Optional[str] = None
+    description: Optional[str] = None
+    iconUrl: Optional[str] = None
+
+
+class WeaponStruct(Struct):
+    weaponId: int
+    weaponName: str
+    weaponType: int
+    weaponStarLevel: int
+    weaponIcon: Optional[str] = None
+    weaponEffectName: Optional[str] = None
+
+
+class WeaponDataStruct(Struct):
+    weapon: WeaponStruct
+    level: int
+    breach: Optional[int] = None
+    resonLevel: Optional[int] = None
+
+
+class PhantomPropStruct(Struct):
+    phantomPropId: int
+    name: str
+    phantomId: int
+    quality: int
+    cost: int
+    iconUrl: str
+    skillDescription: Optional[str] = None
+
+
+class FetterDetailStruct(Struct):
+    groupId: int
+    name: str
+    num: int
+    iconUrl: Optional[str] = None
+    firstDescription: Optional[str] = None
+    secondDescription: Optional[str] = None
+
+
+class PropsStruct(Struct):
+    attributeName: str
+    attributeValue: str
+    iconUrl: Optional[str] = None
+
+
+class EquipPhantomStruct(Struct):
+    phantomProp: PhantomPropStruct
+    cost: int
+    quality: int
+    level: int
+    fetterDetail: FetterDetailStruct
+    mainProps: Optional[List[PropsStruct]] = None
+    subProps: Optional[List[PropsStruct]] = None
+
+
+class EquipPhantomDataStruct(Struct):
+    cost: int
+    equipPhantomList: Optional[List[Optional[EquipPhantomStruct]]] = None
+
+
+class SkillStruct(Struct):
+    id: int
+    type: str
+    name: str
+    description: str
+    iconUrl: str
+
+
+class SkillDataStruct(Struct):
+    skill: SkillStruct
+    level: int
+
+
+class RoleDetailStruct(Struct):
+    """
+    角色详情 (msgspec 直接解码)，字段与 RoleDetailData 一致
+    刷新面板需要可修改的 dict 时用 to_dict 转换，不再经过 json 与 pydantic
+    """
+
+    role: RoleListItem
+    level: int
+    chainList: List[ChainStruct]
+    weaponData: WeaponDataStruct
+    skillList: List[SkillDataStruct]
+    phantomData: Optional[EquipPhantomDataStruct] = None
+
+    def to_dict(self) -> Dict:
+        return msgspec.to_builtins(self)
 
 
 class Box(BaseModel):
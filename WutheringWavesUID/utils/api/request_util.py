@@ -130,6 +130,12 @@ class KuroApiResp(BaseModel, Generic[T]):
     def err(cls, msg: str, code: int = RespCode.BAD_REQUEST) -> "KuroApiResp[T]":
         return cls(code=code, msg=msg, data=None)
 
+    @classmethod
+    def from_decoded(cls, code: int, msg: str, data: Any) -> "KuroApiResp[T]":
+        """由已解码的响应构造，跳过字段校验"""
+        resp = cls.model_construct(code=code, msg=msg, data=data)
+        return resp._post_validate()
+
     @property
     def is_token_invalid(self) -> bool:
         if self.code == RespCode.TOKEN_INVALID.value:
@@ -155,6 +161,11 @@ class KuroApiResp(BaseModel, Generic[T]):
         if not self.is_token_invalid:
             return
         from ...utils.database.models import WavesUser
+        from .cookie_pool import public_cookie_pool
+        from .token_cache import token_valid_cache
+
+        token_valid_cache.invalidate(uid=uid, cookie=cookie)
+        public_cookie_pool.remove(cookie=cookie)
 
         await WavesUser.mark_cookie_invalid(uid, cookie, "无效")
 
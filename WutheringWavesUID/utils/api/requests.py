@@ -1,11 +1,11 @@
 import asyncio
-import inspect
 import json
 import random
-from typing import Any, Dict, List, Literal, Mapping, Optional, Union
+from typing import Any, Dict, List, Literal, Mapping, Optional, Tuple, Union
 
 import aiohttp
-from aiohttp import ClientTimeout, ContentTypeError
+import msgspec
+from aiohttp import ClientTimeout
 
 from gsuid_core.logger import logger
 
@@ -60,12 +60,116 @@ from .api import (
 from .captcha import get_solver
 from .captcha.base import CaptchaResult
 from .captcha.errors import CaptchaError
+from .circuit_breaker import CircuitBreakerRegistry, backoff_delay
+from .cookie_pool import get_pool_size, public_cookie_pool
+from .fast_decode import decode_kuro_resp
+from .http_pool import http_pool
+from .model import RoleDetailStruct
 from .request_util import (
     KURO_VERSION,
     KuroApiResp,
+    RespCode,
+    ThrowMsg,
     get_base_header,
     get_community_header,
 )
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight, make_request_key
+from .token_cache import TokenState, token_valid_cache
+
+
+# 接口 -> 方法名，对应配置 NeedProxyFunc 中的选项
+ENDPOINT_FUNC_MAP: Dict[str, str] = {
+    ROLE_LIST_URL: "get_kuro_role_list",
+    MR_REFRESH_URL: "get_daily_info",
+    REFRESH_URL: "refresh_data",
+    LOGIN_LOG_URL: "login_log",
+    BASE_DATA_URL: "get_base_info",
+    ROLE_DATA_URL: "get_role_info",
+    WIKI_TREE_URL: "get_tree",
+    WIKI_DETAIL_URL: "get_wiki",
+    ROLE_DETAIL_URL: "get_role_detail_info",
+    CALABASH_DATA_URL: "get_calabash_data",
+    EXPLORE_DATA_URL: "get_explore_data",
+    CHALLENGE_DATA_URL: "get_challenge_data",
+    TOWER_DETAIL_URL: "get_abyss_data",
+    TOWER_INDEX_URL: "get_abyss_index",
+    SLASH_INDEX_URL: "get_slash_index",
+    SLASH_DETAIL_URL: "get_slash_detail",
+    MORE_ACTIVITY_URL: "get_more_activity",
+    REQUEST_TOKEN: "get_request_token",
+    CALCULATOR_REFRESH_DATA_URL: "calculator_refresh_data",
+    ONLINE_LIST_ROLE: "get_online_list_role",
+    ONLINE_LIST_WEAPON: "get_online_list_weapon",
+    ONLINE_LIST_PHANTOM: "get_online_list_phantom",
+    QUERY_OWNED_ROLE: "get_owned_role",
+    ROLE_CULTIVATE_STATUS: "get_develop_role_cultivate_status",
+    BATCH_ROLE_COST: "get_batch_role_cost",
+    PERIOD_LIST_URL: "get_period_list",
+    MONTH_LIST_URL: "get_period_detail",
+    WEEK_LIST_URL: "get_period_detail",
+    VERSION_LIST_URL: "get_period_detail",
+    GACHA_LOG_URL: "get_gacha_log",
+    GACHA_NET_LOG_URL: "get_gacha_log",
+    ANN_LIST_URL: "get_ann_list_by_type",
+    ANN_CONTENT_URL: "get_ann_detail",
+    WIKI_HOME_URL: "get_wiki_home",
+    WIKI_ENTRY_DETAIL_URL: "get_entry_detail",
+    LOGIN_URL: "login",
+}
+
+# 只读接口，相同的并发请求合并为一次
+SINGLE_FLIGHT_ENDPOINTS = frozenset(
+    {
+        REFRESH_URL,
+        LOGIN_LOG_URL,
+        BASE_DATA_URL,
+        ROLE_DATA_URL,
+        ROLE_DETAIL_URL,
+        CALABASH_DATA_URL,
+        EXPLORE_DATA_URL,
+        CHALLENGE_DATA_URL,
+        TOWER_DETAIL_URL,
+        TOWER_INDEX_URL,
+        SLASH_INDEX_URL,
+        SLASH_DETAIL_URL,
+        MORE_ACTIVITY_URL,
+        QUERY_OWNED_ROLE,
+        PERIOD_LIST_URL,
+        MONTH_LIST_URL,
+        WEEK_LIST_URL,
+        VERSION_LIST_URL,
+        GACHA_LOG_URL,
+        GACHA_NET_LOG_URL,
+        WIKI_TREE_URL,
+        WIKI_DETAIL_URL,
+        WIKI_HOME_URL,
+        WIKI_ENTRY_DETAIL_URL,
+        ANN_LIST_URL,
+        ANN_CONTENT_URL,
+    }
+)
+
+# 接口响应缓存: 接口 -> (缓存时间, 过期后仍可返回旧数据的时间) 单位秒
+RESPONSE_CACHE_TTL: Dict[str, Tuple[int, int]] = {
+    BASE_DATA_URL: (60, 600),
+    ROLE_DATA_URL: (60, 600),
+    EXPLORE_DATA_URL: (300, 1800),
+    CALABASH_DATA_URL: (300, 1800),
+    CHALLENGE_DATA_URL: (300, 1800),
+    MORE_ACTIVITY_URL: (300, 1800),
+}
+
+
+def is_response_cache_enabled() -> bool:
+    return WutheringWavesConfig.get_config("WavesApiCache").data
+
+
+def is_retryable_resp(resp: KuroApiResp) -> bool:
+    """服务端繁忙类的业务错误可以重试，登录失效等业务错误不重试"""
+    if resp.code == RespCode.SERVER_ERROR.value:
+        return True
+    return isinstance(resp.msg, str) and "系统繁忙" in resp.msg
 
 
 class WavesApi:
@@ -76,8 +180,14 @@ class WavesApi:
 
     entry_detail_map = {}
 
-    _sessions: Dict[str, aiohttp.ClientSession] = {}
-    _session_lock = asyncio.Lock()
+    _single_flight = SingleFlight()
+    _response_cache = ResponseCache()
+    _circuit_breakers = CircuitBreakerRegistry()
+
+    # 代理路由表: 接口 -> 代理地址，配置变更时重建
+    _proxy_routes: Dict[str, Optional[str]] = {}
+    _proxy_default: Optional[str] = None
+    _proxy_routes_key: Optional[tuple] = None
 
     def __init__(self):
         self.captcha_solver = get_solver()
@@ -86,20 +196,26 @@ class WavesApi:
 
     async def get_session(self, proxy: Optional[str] = None) -> aiohttp.ClientSession:
         key = f"{proxy or 'no_proxy'}"
+        return await http_pool.get_session(key, ssl=self.ssl_verify)
 
-        if key in self._sessions and not self._sessions[key].closed:
-            return self._sessions[key]
+    def get_proxy_url(self, url: str) -> Optional[str]:
+        proxy_func = get_need_proxy_func()
+        proxy_url = get_local_proxy_url()
 
-        async with self._session_lock:
-            if key in self._sessions and not self._sessions[key].closed:
-                return self._sessions[key]
+        routes_key = (tuple(proxy_func), proxy_url)
+        if routes_key != self._proxy_routes_key:
+            self._build_proxy_routes(proxy_func, proxy_url)
+            WavesApi._proxy_routes_key = routes_key
 
-            session = aiohttp.ClientSession(
-                connector=aiohttp.TCPConnector(ssl=self.ssl_verify),
-            )
+        return self._proxy_routes.get(url, self._proxy_default)
 
-            self._sessions[key] = session
-            return session
+    def _build_proxy_routes(self, proxy_func: List[str], proxy_url: Optional[str]):
+        need_all = "all" in proxy_func
+        WavesApi._proxy_default = proxy_url if need_all else None
+        WavesApi._proxy_routes = {
+            endpoint: proxy_url if need_all or func_name in proxy_func else None
+            for endpoint, func_name in ENDPOINT_FUNC_MAP.items()
+        }
 
     def is_net(self, roleId):
         _temp = int(roleId)
@@ -172,27 +288,46 @@ class WavesApi:
         if waves_user.status == "无效":
             return ""
 
-        data = await self.login_log(uid, waves_user.cookie)
+        state = token_valid_cache.get_state(uid, waves_user.cookie)
+        if state == TokenState.VALID:
+            return waves_user.cookie
+        if state == TokenState.STALE:
+            token_valid_cache.refresh_in_background(
+                uid, waves_user.cookie, self.validate_waves_user(uid, waves_user)
+            )
+            return waves_user.cookie
+
+        return await self.validate_waves_user(uid, waves_user)
+
+    async def validate_waves_user(self, uid: str, waves_user: WavesUser) -> str:
+        """校验ck，返回空串表示已失效"""
+        cookie = waves_user.cookie
+        data = await self.login_log(uid, cookie)
         if not data.success:
-            await data.mark_cookie_invalid(uid, waves_user.cookie)
+            await data.mark_cookie_invalid(uid, cookie)
             return ""
 
-        data = await self.refresh_data(uid, waves_user.cookie)
+        data = await self.refresh_data(uid, cookie)
         if not data.success:
             if data.is_bat_token_invalid:
                 if waves_user := await self.refresh_bat_token(waves_user):
                     return waves_user.cookie
             else:
-                await data.mark_cookie_invalid(uid, waves_user.cookie)
+                await data.mark_cookie_invalid(uid, cookie)
             return ""
 
-        return waves_user.cookie
+        token_valid_cache.set_valid(uid, cookie)
+        return cookie
 
     async def get_waves_random_cookie(self, uid: str, user_id: str) -> Optional[str]:
         if WutheringWavesConfig.get_config("WavesOnlySelfCk").data:
             return None
 
-        # 公共ck 随机一个
+        # 从预校验的公共ck池中选取，池为空时等待正在进行的补充
+        if get_pool_size() > 0:
+            return await public_cookie_pool.wait_pick(self)
+
+        # ck池关闭时逐个校验，公共ck 随机一个
         user_list = await WavesUser.get_waves_all_user()
         random.shuffle(user_list)
         ck_list = []
@@ -287,7 +422,11 @@ class WavesApi:
         return await self._waves_request(LOGIN_LOG_URL, "POST", header, data=data)
 
     async def get_base_info(
-        self, roleId: str, token: str, serverId: Optional[str] = None
+        self,
+        roleId: str,
+        token: str,
+        serverId: Optional[str] = None,
+        use_cache: bool = True,
     ):
         header = await get_base_header()
         used_headers = await self.get_used_headers(cookie=token, uid=roleId)
@@ -298,10 +437,16 @@ class WavesApi:
             "serverId": self.get_server_id(roleId, serverId),
             "roleId": roleId,
         }
-        return await self._waves_request(BASE_DATA_URL, "POST", header, data=data)
+        return await self._waves_request(
+            BASE_DATA_URL, "POST", header, data=data, use_cache=use_cache
+        )
 
     async def get_role_info(
-        self, roleId: str, token: str, serverId: Optional[str] = None
+        self,
+        roleId: str,
+        token: str,
+        serverId: Optional[str] = None,
+        use_cache: bool = True,
     ):
         header = await get_base_header()
         used_headers = await self.get_used_headers(cookie=token, uid=roleId)
@@ -312,7 +457,9 @@ class WavesApi:
             "serverId": self.get_server_id(roleId, serverId),
             "roleId": roleId,
         }
-        return await self._waves_request(ROLE_DATA_URL, "POST", header, data=data)
+        return await self._waves_request(
+            ROLE_DATA_URL, "POST", header, data=data, use_cache=use_cache
+        )
 
     async def get_tree(self):
         header = await get_community_header()
@@ -341,7 +488,11 @@ class WavesApi:
             "countryCode": "1",
             "id": charId,
         }
-        return await self._waves_request(ROLE_DETAIL_URL, "POST", header, data=data)
+        resp = await self._waves_request(ROLE_DETAIL_URL, "POST", header, data=data)
+        # 已按 RoleDetailStruct 解码校验，调用方需要修改数据，转换为 dict
+        if isinstance(resp.data, RoleDetailStruct):
+            resp.data = resp.data.to_dict()
+        return resp
 
     async def get_calabash_data(
         self, roleId: str, token: str, serverId: Optional[str] = None
@@ -755,15 +906,69 @@ class WavesApi:
         data: Optional[Dict[str, Any]] = None,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        use_cache: bool = True,
     ) -> KuroApiResp[Union[str, Dict[str, Any], List[Any]]]:
         if header is None:
             header = await get_base_header()
 
-        proxy_func = get_need_proxy_func()
-        if inspect.stack()[1].function in proxy_func or "all" in proxy_func:
-            proxy_url = get_local_proxy_url()
-        else:
-            proxy_url = None
+        async def request():
+            return await self._do_waves_request(
+                url,
+                method,
+                header,
+                params,
+                json_data,
+                data,
+                max_retries,
+                retry_delay,
+            )
+
+        if url not in SINGLE_FLIGHT_ENDPOINTS:
+            return await request()
+
+        key = make_request_key(
+            method,
+            url,
+            params,
+            data,
+            json_data,
+            header.get("token"),
+            header.get("b-at"),
+        )
+
+        def copy_resp(r: KuroApiResp) -> KuroApiResp:
+            return r.model_copy(deep=True)
+
+        # 同一ck对同一接口的相同请求，在进行中时共享结果
+        async def single_flight_request():
+            return await self._single_flight.do(key, request, copy=copy_resp)
+
+        cache_ttl = RESPONSE_CACHE_TTL.get(url)
+        if not use_cache or not cache_ttl or not is_response_cache_enabled():
+            return await single_flight_request()
+
+        ttl, stale = cache_ttl
+        return await self._response_cache.get_or_fetch(
+            key,
+            single_flight_request,
+            ttl,
+            stale,
+            cacheable=lambda r: r.success,
+            copy=copy_resp,
+        )
+
+    async def _do_waves_request(
+        self,
+        url: str,
+        method: Literal["GET", "POST"],
+        header: Mapping[str, str],
+        params: Optional[Dict[str, Any]],
+        json_data: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        max_retries: int,
+        retry_delay: float,
+    ) -> KuroApiResp[Union[str, Dict[str, Any], List[Any]]]:
+        proxy_url = self.get_proxy_url(url)
 
         async def do_request(
             req_data, client_session: aiohttp.ClientSession
@@ -778,23 +983,20 @@ class WavesApi:
                 proxy=proxy_url,
                 timeout=ClientTimeout(total=10),
             ) as resp:
-                try:
-                    raw_data = await resp.json()
-                except ContentTypeError:
-                    _raw_data = await resp.text()
-                    raw_data = {"code": WAVES_CODE_999, "data": _raw_data}
-
-                if isinstance(raw_data, dict):
-                    try:
-                        raw_data["data"] = json.loads(raw_data.get("data", ""))
-                    except Exception:
-                        pass
-
-                logger.debug(
-                    f"url:[{url}] params:[{params}] headers:[{header}] data:[{req_data}] raw_data:{raw_data}"
-                )
-                # 统一解析为 KuroApiResp
-                return KuroApiResp[Any].model_validate(raw_data)
+                body = await resp.read()
+
+            try:
+                # msgspec 一次解码外层与嵌套的 data
+                code, msg, res_data = decode_kuro_resp(body, url)
+            except msgspec.MsgspecError:
+                code, msg = WAVES_CODE_999, ""
+                res_data = body.decode("utf-8", errors="replace")
+
+            logger.debug(
+                f"url:[{url}] params:[{params}] headers:[{header}] data:[{req_data}] code:{code} msg:{msg} data:{res_data}"
+            )
+            # 已由 msgspec 解码，直接构造 KuroApiResp，不再经过 pydantic 校验
+            return KuroApiResp[Any].from_decoded(code, msg, res_data)
 
         async def solve_captcha():
             if not self.captcha_solver:
@@ -807,44 +1009,74 @@ class WavesApi:
 
             return {"code": WAVES_CODE_999, "data": "验证码破解失败"}
 
-        for attempt in range(max_retries):
-            try:
-                client = await self.get_session(proxy=proxy_url)
-                if not client:
-                    logger.warning(f"url:[{url}] 获取session失败")
-                    continue
-
-                response = await do_request(data, client)
-
-                res_data = response.data or {}
-                if (
-                    self.captcha_solver
-                    and isinstance(res_data, dict)
-                    and res_data.get("geeTest") is True
-                ):
-                    seccode_data = await solve_captcha()
-                    if isinstance(seccode_data, CaptchaResult):
-                        seccode_data = seccode_data.model_dump_json()
-
-                    if isinstance(seccode_data, dict):
-                        seccode_data = json.dumps(seccode_data)
-
-                    # 重试数据准备
-                    retry_data = data.copy() if data else {}
-                    retry_data["geeTestData"] = seccode_data
-                    return await do_request(retry_data, client)
-
-                return response
-
-            except aiohttp.ClientError as e:
-                logger.warning(f"url:[{url}] 网络请求失败, 尝试次数 {attempt + 1}", e)
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
-            except Exception as e:
-                logger.warning(f"url:[{url}] 发生未知错误, 尝试次数 {attempt + 1}", e)
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
-
-        return KuroApiResp[Any].err(
-            "请求服务器失败，已达最大重试次数", code=WAVES_CODE_999
-        )
+        breaker = self._circuit_breakers.get(url)
+        if not breaker.allow_request():
+            logger.warning(f"url:[{url}] 接口熔断中, 直接返回失败")
+            return KuroApiResp[Any].err(ThrowMsg.SERVER_ERROR, code=WAVES_CODE_999)
+
+        try:
+            for attempt in range(max_retries):
+                try:
+                    client = await self.get_session(proxy=proxy_url)
+                    if not client:
+                        logger.warning(f"url:[{url}] 获取session失败")
+                        continue
+
+                    response = await do_request(data, client)
+                    if response.is_token_invalid or response.is_bat_token_invalid:
+                        req_data = data or json_data or {}
+                        token_valid_cache.invalidate(
+                            uid=req_data.get("roleId"), cookie=header.get("token")
+                        )
+                        public_cookie_pool.report_error(header.get("token"))
+
+                    if is_retryable_resp(response):
+                        logger.warning(
+                            f"url:[{url}] 服务器繁忙, 尝试次数 {attempt + 1}: {response.msg}"
+                        )
+                        if attempt < max_retries - 1:
+                            await asyncio.sleep(backoff_delay(attempt, retry_delay))
+                            continue
+                        breaker.record_failure()
+                        return response
+
+                    breaker.record_success()
+
+                    res_data = response.data or {}
+                    if (
+                        self.captcha_solver
+                        and isinstance(res_data, dict)
+                        and res_data.get("geeTest") is True
+                    ):
+                        seccode_data = await solve_captcha()
+                        if isinstance(seccode_data, CaptchaResult):
+                            seccode_data = seccode_data.model_dump_json()
+
+                        if isinstance(seccode_data, dict):
+                            seccode_data = json.dumps(seccode_data)
+
+                        # 重试数据准备
+                        retry_data = data.copy() if data else {}
+                        retry_data["geeTestData"] = seccode_data
+                        return await do_request(retry_data, client)
+
+                    return response
+
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.warning(f"url:[{url}] 网络请求失败, 尝试次数 {attempt + 1}", e)
+                    if attempt < max_retries - 1:
+                        await asyncio.sleep(backoff_delay(attempt, retry_delay))
+                except Exception as e:
+                    # 非网络错误重试也无济于事
+                    logger.exception(f"url:[{url}] 发生未知错误", e)
+                    breaker.record_failure()
+                    return KuroApiResp[Any].err(ThrowMsg.SYSTEM_BUSY, code=WAVES_CODE_999)
+
+            breaker.record_failure()
+            return KuroApiResp[Any].err(
+                "请求服务器失败，已达最大重试次数", code=WAVES_CODE_999
+            )
+        except asyncio.CancelledError:
+            # 请求被取消 (调用方超时等) 时，半开状态的探测按失败处理，避免熔断无法恢复
+            breaker.record_cancelled()
+            raise
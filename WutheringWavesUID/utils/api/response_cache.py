@@ -0,0 +1,96 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Set, Tuple
+
+from gsuid_core.logger import logger
+
+
+class ResponseCache:
+    """
+    接口响应缓存 (LRU + TTL)
+    过期后在 stale 时间内仍返回旧数据，同时后台刷新
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        # key -> (value, fresh_until, stale_until)
+        self._cache: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def set(self, key: str, value: Any, ttl: float, stale: float):
+        now = time.time()
+        self._cache[key] = (value, now + ttl, now + ttl + stale)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def delete(self, key: str):
+        self._cache.pop(key, None)
+
+    def clear(self):
+        self._cache.clear()
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale: float,
+        cacheable: Callable[[Any], bool],
+        copy: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        _copy = copy or (lambda x: x)
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            now = time.time()
+            if now < fresh_until:
+                self._cache.move_to_end(key)
+                return _copy(value)
+            if now < stale_until:
+                self._cache.move_to_end(key)
+                self._revalidate(key, fetch, ttl, stale, cacheable, _copy)
+                return _copy(value)
+            del self._cache[key]
+
+        value = await fetch()
+        if cacheable(value):
+            # 缓存副本，调用方可以随意修改返回值
+            self.set(key, _copy(value), ttl, stale)
+        return value
+
+    def _revalidate(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale: float,
+        cacheable: Callable[[Any], bool],
+        copy: Callable[[Any], Any],
+    ):
+        if key in self._refreshing:
+            return
+
+        async def _run():
+            try:
+                value = await fetch()
+                if cacheable(value):
+                    self.set(key, copy(value), ttl, stale)
+                else:
+                    # 错误响应不缓存，旧数据也一并丢弃
+                    self.delete(key)
+            except Exception as e:
+                logger.warning(f"[鸣潮] 接口缓存后台刷新失败: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        self._refreshing.add(key)
+        task = asyncio.create_task(_run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,46 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def make_request_key(*parts: Any) -> str:
+    """将请求参数序列化为稳定的key"""
+    return json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class SingleFlight:
+    """
+    合并相同的并发请求
+    同一个key同时只会有一个请求在进行，其他调用方共享结果，请求结束即释放
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[T]],
+        copy: Optional[Callable[[T], T]] = None,
+    ) -> T:
+        task = self._inflight.get(key)
+        if task is not None:
+            # 跟随者拿到结果的副本，避免调用方之间互相修改数据
+            result = await asyncio.shield(task)
+            return copy(result) if copy else result
+
+        task = asyncio.ensure_future(func())
+        self._inflight[key] = task
+
+        def _release(t: asyncio.Task):
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+
+        task.add_done_callback(_release)
+        # shield: 发起方被取消时不影响其他等待中的调用方
+        return await asyncio.shield(task)
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from enum import Enum
+from typing import Any, Coroutine, Dict, Optional, Set, Tuple
+
+from gsuid_core.logger import logger
+
+
+def get_token_valid_ttl() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("TokenValidCacheTTL").data or 0
+
+
+class TokenState(Enum):
+    UNKNOWN = 0
+    VALID = 1
+    # 仍在有效期内，但临近过期，需要后台刷新
+    STALE = 2
+
+
+class TokenValidCache:
+    """
+    (uid, cookie) -> 最近一次校验通过的时间
+    校验通过后 TTL 内不再请求 login_log / refresh_data
+    """
+
+    # 剩余时间低于该比例时后台刷新
+    REFRESH_RATIO = 0.2
+    MAX_SIZE = 10000
+
+    def __init__(self):
+        self._cache: Dict[Tuple[str, str], float] = {}
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def get_state(self, uid: str, cookie: str) -> TokenState:
+        ttl = get_token_valid_ttl()
+        if ttl <= 0:
+            return TokenState.UNKNOWN
+
+        checked_at = self._cache.get((uid, cookie))
+        if checked_at is None:
+            return TokenState.UNKNOWN
+
+        remain = checked_at + ttl - time.time()
+        if remain <= 0:
+            self._cache.pop((uid, cookie), None)
+            return TokenState.UNKNOWN
+        if remain < ttl * self.REFRESH_RATIO:
+            return TokenState.STALE
+        return TokenState.VALID
+
+    def set_valid(self, uid: str, cookie: str):
+        if get_token_valid_ttl() <= 0:
+            return
+        if len(self._cache) >= self.MAX_SIZE:
+            self._clean_up()
+        self._cache[(uid, cookie)] = time.time()
+
+    def invalidate(self, uid: Optional[str] = None, cookie: Optional[str] = None):
+        if not uid and not cookie:
+            return
+        keys = [
+            k
+            for k in self._cache
+            if (uid and k[0] == uid) or (cookie and k[1] == cookie)
+        ]
+        for k in keys:
+            del self._cache[k]
+
+    def refresh_in_background(
+        self, uid: str, cookie: str, coro: Coroutine[Any, Any, Any]
+    ):
+        key = (uid, cookie)
+        if key in self._refreshing:
+            coro.close()
+            return
+
+        async def _run():
+            try:
+                await coro
+            except Exception as e:
+                logger.warning(f"[鸣潮] token后台校验失败 uid:{uid} {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        self._refreshing.add(key)
+        task = asyncio.create_task(_run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _clean_up(self):
+        ttl = get_token_valid_ttl()
+        expire_before = time.time() - ttl
+        for k in [k for k, v in self._cache.items() if v <= expire_before]:
+            del self._cache[k]
+
+        # 仍然超限则丢弃最早校验的一半
+        if len(self._cache) >= self.MAX_SIZE:
+            ordered = sorted(self._cache.items(), key=lambda x: x[1])
+            for k, _ in ordered[: len(ordered) // 2]:
+                del self._cache[k]
+
+
+token_valid_cache = TokenValidCache()
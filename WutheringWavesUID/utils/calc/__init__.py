@@ -444,9 +444,46 @@ class WuWaCalc(object):
 
 
     @staticmethod
-    async def calc_role_scores_and_damages(waves_data: List[Dict]) -> tuple[Dict[str, float], Dict[str, float]]:
+    def get_rank_display(
+        role_detail: RoleDetailData,
+        score: float,
+        phantom_card: Optional[Dict] = None,
+        calc_temp: Optional[Dict] = None,
+    ) -> Dict[str, Any]:
+        """排行榜展示用的字段 (评分背景、5件套合鸣、武器、等级、共鸣链)"""
+        from ..calculate import get_total_score_bg
+
+        score_bg = "c"
+        if score > 0:
+            score_bg = get_total_score_bg(role_detail.role.roleName, score, calc_temp)
+
+        sonata_name = ""
+        ph_detail = (phantom_card or {}).get("ph_detail", [])
+        if isinstance(ph_detail, list):
+            for ph in ph_detail:
+                if ph.get("ph_num") == 5:
+                    sonata_name = ph.get("ph_name", "")
+                    break
+                if ph.get("isFull") and not sonata_name:
+                    sonata_name = ph.get("ph_name", "")
+
+        weapon_data = role_detail.weaponData
+        return {
+            "score_bg": score_bg,
+            "sonata_name": sonata_name,
+            "role_level": role_detail.role.level,
+            "chain_name": role_detail.get_chain_name(),
+            "weapon_id": weapon_data.weapon.weaponId,
+            "weapon_level": weapon_data.level,
+            "weapon_reson": weapon_data.resonLevel or 0,
+        }
+
+    @staticmethod
+    async def calc_role_scores_and_damages(
+        waves_data: List[Dict],
+    ) -> tuple[Dict[str, float], Dict[str, float], Dict[str, Dict[str, Any]]]:
         """
-        计算所有角色的评分和伤害
+        计算所有角色的评分、伤害和排行展示字段
         """
         from ...utils.api.model import RoleDetailData
         from ..calculate import calc_phantom_score, get_calc_map
@@ -454,6 +491,7 @@ class WuWaCalc(object):
 
         scores_map: Dict[str, float] = {}
         damage_map: Dict[str, float] = {}
+        display_map: Dict[str, Dict[str, Any]] = {}
 
         for role_data in waves_data:
             role_id = str(role_data.get("role", {}).get("roleId", ""))
@@ -468,6 +506,7 @@ class WuWaCalc(object):
                 ):
                     scores_map[role_id] = 0.0
                     damage_map[role_id] = 0.0
+                    display_map[role_id] = WuWaCalc.get_rank_display(role_detail, 0.0)
                     continue
 
                 # 评分/属性计算上下文
@@ -495,6 +534,12 @@ class WuWaCalc(object):
                         )
                         phantom_score += _score
                 scores_map[role_id] = round(phantom_score, 2)
+                display_map[role_id] = WuWaCalc.get_rank_display(
+                    role_detail,
+                    scores_map[role_id],
+                    calc.phantom_card,
+                    calc.calc_temp,
+                )
 
                 # 期望伤害
                 rankDetail = DamageRankRegister.find_class(role_id)
@@ -514,5 +559,13 @@ class WuWaCalc(object):
                 )
                 scores_map[role_id] = 0.0
                 damage_map[role_id] = 0.0
+                # 评分失败时仍保存不依赖模板的展示字段，排行渲染无需重新计算
+                if role_id not in display_map:
+                    try:
+                        display_map[role_id] = WuWaCalc.get_rank_display(
+                            RoleDetailData(**role_data), 0.0
+                        )
+                    except Exception:
+                        pass
 
-        return scores_map, damage_map
+        return scores_map, damage_map, display_map
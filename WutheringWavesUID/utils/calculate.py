@@ -1,6 +1,6 @@
 import math
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 from msgspec import json as msgjson
 
@@ -8,7 +8,7 @@ from gsuid_core.logger import logger
 
 from ..utils.api.model import Props
 from ..utils.ascension.char import get_char_model
-from .expression_evaluator import find_first_matching_expression
+from .expression_evaluator import compile_expressions, find_first_matching_compiled
 from .image import SPECIAL_GOLD, WAVES_MOLTEN, WAVES_SIERRA, WAVES_VOID
 from .map.calc_score_script import phantom_sub_value_map as ph_sub_map
 from .resource.constant import ATTRIBUTE_NAME_SET, ID_FULL_CHAR_NAME
@@ -19,30 +19,105 @@ score_interval = ["c", "b", "a", "s", "ss", "sss"]
 fix_max_score = 50
 
 
+# 条件文件按优先级: 先检查用户条件，然后是默认条件
+CONDITION_FILES = ("condition-user.json", "condition.json")
+
+
+class CalcMapCache:
+    """
+    评分模板缓存
+    启动时预加载 map/character 下每个角色的全部模板与编译后的条件，
+    get_calc_map 只做内存查找；按目录内文件的 mtime 检查热重载
+    """
+
+    def __init__(self):
+        self.ready = False
+        # 目录名 -> {"dir", "conditions": [编译后的条件 | None], "templates": {文件名: 模板}}
+        self._chars: Dict[str, Dict[str, Any]] = {}
+        # 目录名 -> 目录内文件的最大 mtime
+        self._mtimes: Dict[str, float] = {}
+
+    @staticmethod
+    def _get_mtime(char_path: Path) -> float:
+        return max(
+            [char_path.stat().st_mtime]
+            + [f.stat().st_mtime for f in char_path.glob("*.json")]
+        )
+
+    @staticmethod
+    def _load_char(char_path: Path) -> Dict[str, Any]:
+        templates: Dict[str, Any] = {}
+        for path in char_path.glob("*.json"):
+            with open(path, "r", encoding="utf-8") as f:
+                templates[path.name] = msgjson.decode(f.read())
+        conditions = [
+            compile_expressions(templates.pop(name)) if name in templates else None
+            for name in CONDITION_FILES
+        ]
+        return {
+            "dir": char_path.name,
+            "conditions": conditions,
+            "templates": templates,
+        }
+
+    def reload(self, force: bool = False) -> List[str]:
+        """重新加载有变化的角色目录，返回重新加载的目录名"""
+        reloaded = []
+        exists = set()
+        for char_path in MAP_PATH.iterdir():
+            if not char_path.is_dir():
+                continue
+            name = char_path.name
+            exists.add(name)
+            try:
+                mtime = self._get_mtime(char_path)
+                if not force and self._mtimes.get(name) == mtime:
+                    continue
+                self._chars[name] = self._load_char(char_path)
+                self._mtimes[name] = mtime
+                reloaded.append(name)
+            except Exception as e:
+                logger.exception(f"[鸣潮] 加载评分模板失败 {name}: {e}")
+
+        for name in set(self._chars) - exists:
+            self._chars.pop(name, None)
+            self._mtimes.pop(name, None)
+            reloaded.append(name)
+        self.ready = True
+        return reloaded
+
+    def _load_one(self, name: str) -> Optional[Dict[str, Any]]:
+        char_path = MAP_PATH / name
+        if not char_path.is_dir():
+            return None
+        self._mtimes[name] = self._get_mtime(char_path)
+        self._chars[name] = self._load_char(char_path)
+        return self._chars[name]
+
+    def get(self, char_name: str) -> Dict[str, Any]:
+        char = self._chars.get(char_name)
+        if char is None and not self.ready:
+            # 预加载未完成时只加载用到的目录，不在请求中扫描全部模板
+            char = self._load_one(char_name) or self._chars.get("default")
+            return char or self._load_one("default")
+        return char or self._chars["default"]
+
+
+calc_map_cache = CalcMapCache()
+
+
 def get_calc_map(ctx: Dict, char_name: str, char_id: Union[int, str]):
     if str(char_id) in ID_FULL_CHAR_NAME:
         char_name = ID_FULL_CHAR_NAME[str(char_id)]
-    char_path = MAP_PATH / char_name
-    if not char_path.is_dir():
-        char_path = MAP_PATH / "default"
-
-    def check_conditions(file_name):
-        condition_path = char_path / file_name
-        if condition_path.exists():
-            with open(condition_path, "r", encoding="utf-8") as f:
-                expressions = msgjson.decode(f.read())
-            return find_first_matching_expression(ctx, expressions)
-        return None
-
-    # 先检查用户条件，然后是默认条件
-    calc_json_path = (
-        check_conditions("condition-user.json")
-        or check_conditions("condition.json")
-        or "calc.json"
-    )
-    logger.debug(f"{char_name} [匹配文件]: {char_path.name}/{calc_json_path}")
-    with open(char_path / calc_json_path, "r", encoding="utf-8") as f:
-        return msgjson.decode(f.read())
+    char_cache = calc_map_cache.get(char_name)
+
+    calc_json_path = "calc.json"
+    for compiled in char_cache["conditions"]:
+        if compiled is not None:
+            calc_json_path = find_first_matching_compiled(ctx, compiled)
+            break
+    logger.debug(f"{char_name} [匹配文件]: {char_cache['dir']}/{calc_json_path}")
+    return char_cache["templates"][calc_json_path]
 
 
 def calc_phantom_entry(index, prop, cost: int, calc_map, char_attr: str):
@@ -28,10 +28,11 @@ async def get_all_role_detail_info_list(
                 return None
     else:
         try:
-            role_data_list = await WavesRoleData.get_role_data_by_uid(uid)
-            for role_data in role_data_list:
-                if role_data.data:
-                    result.append(RoleDetailData.model_validate(role_data.data))
+            # 按角色ID读取，合并写入尚未提交的数据同样可见
+            role_data_map = await WavesRoleData.get_role_data_map_by_uid(uid)
+            for data in role_data_map.values():
+                if data:
+                    result.append(RoleDetailData.model_validate(data))
         except Exception as e:
             logger.error(f"查询数据库角色数据失败: {e}")
             return None
@@ -0,0 +1,81 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class BindIndex:
+    """
+    绑定关系反查索引
+    uid -> 绑定该uid的用户，(user_id, uid) -> 是否有有效CK
+    启动时加载一次，绑定/CK变动时按用户或按uid更新，排行不再全表扫描
+    """
+
+    def __init__(self):
+        self.ready = False
+        # (user_id, bot_id) -> 绑定的uid列表
+        self._binds: Dict[Tuple[str, str], List[str]] = {}
+        # uid -> 绑定该uid的用户 (按绑定先后，后绑定的在后)
+        self._uid_users: Dict[str, Dict[Tuple[str, str], None]] = {}
+        # uid -> 拥有该uid有效CK的user_id
+        self._token_users: Dict[str, Set[str]] = {}
+
+    def rebuild(
+        self,
+        binds: Iterable[Tuple[str, str, Optional[str]]],
+        tokens: Iterable[Tuple[str, str]],
+    ):
+        """binds: (user_id, bot_id, uid串)，tokens: 有效CK的 (user_id, uid)"""
+        self._binds = {}
+        self._uid_users = {}
+        self._token_users = {}
+        for user_id, bot_id, uid_str in binds:
+            self.set_user_uids(user_id, bot_id, uid_str)
+        for user_id, uid in tokens:
+            if uid:
+                self._token_users.setdefault(str(uid), set()).add(str(user_id))
+        self.ready = True
+
+    def set_user_uids(self, user_id: str, bot_id: str, uid_str: Optional[str]):
+        """更新某个用户的绑定 (uid_str 为 '_' 拼接的uid串)"""
+        key = (str(user_id), str(bot_id))
+        for uid in self._binds.pop(key, []):
+            users = self._uid_users.get(uid)
+            if users is None:
+                continue
+            users.pop(key, None)
+            if not users:
+                del self._uid_users[uid]
+
+        uids = [i for i in (uid_str or "").split("_") if i]
+        if not uids:
+            return
+        self._binds[key] = uids
+        for uid in uids:
+            self._uid_users.setdefault(uid, {})[key] = None
+
+    def set_uid_tokens(self, uid: str, user_ids: Iterable[str]):
+        """更新某个uid的有效CK用户"""
+        users = {str(i) for i in user_ids}
+        if users:
+            self._token_users[str(uid)] = users
+        else:
+            self._token_users.pop(str(uid), None)
+
+    def get_user_id(self, uid: str) -> Optional[str]:
+        """uid 对应的用户 (多人绑定时取最后绑定的)"""
+        users = self._uid_users.get(str(uid))
+        if not users:
+            return None
+        return list(users)[-1][0]
+
+    def get_uid_to_user_id(self, uids: Iterable[str]) -> Dict[str, str]:
+        result = {}
+        for uid in uids:
+            user_id = self.get_user_id(uid)
+            if user_id:
+                result[str(uid)] = user_id
+        return result
+
+    def has_token(self, user_id: str, uid: str) -> bool:
+        return str(user_id) in self._token_users.get(str(uid), ())
+
+
+bind_index = BindIndex()
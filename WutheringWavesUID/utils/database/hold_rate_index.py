@@ -0,0 +1,211 @@
+import heapq
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 活跃用户: 最近30天内更新过账号信息
+ACTIVE_SECONDS = 30 * 24 * 60 * 60
+
+
+class CharHoldRateIndex:
+    """
+    角色持有率计数 (增量维护)
+    统计口径与 WavesCharHoldRate.update_all_hold_rates 一致: CK有效 且 活跃 的UID
+    所有用户的角色链数另存一份，用户进入/退出统计范围时直接加减计数
+    """
+
+    def __init__(self):
+        self.ready = False
+        # uid -> role_id -> 链数
+        self._chains: Dict[str, Dict[str, int]] = {}
+        self._names: Dict[str, str] = {}
+        self._valid_uids: Set[str] = set()
+        # uid -> 最后更新账号信息的时间
+        self._active_time: Dict[str, int] = {}
+        # 过期检查堆 (活跃时间, uid)，过时的条目在弹出时忽略
+        self._expire_heap: List[Tuple[int, str]] = []
+        # 计入统计的UID
+        self._counted: Set[str] = set()
+        # role_id -> 链数 -> 人数
+        self._chain_count: Dict[str, Dict[int, int]] = {}
+
+    def rebuild(
+        self,
+        rows: Iterable[Tuple[str, str, str, int]],
+        valid_uids: Iterable[str],
+        active_rows: Iterable[Tuple[str, int]],
+    ):
+        """从数据表重建，rows: (uid, role_id, role_name, chain_num)，active_rows: (uid, 更新时间)"""
+        self._chains = {}
+        self._names = {}
+        self._valid_uids = {str(uid) for uid in valid_uids}
+        self._active_time = {str(uid): int(t or 0) for uid, t in active_rows}
+        self._expire_heap = [(t, uid) for uid, t in self._active_time.items()]
+        heapq.heapify(self._expire_heap)
+        self._counted = set()
+        self._chain_count = {}
+
+        for uid, role_id, role_name, chain_num in rows:
+            uid, role_id = str(uid), str(role_id)
+            self._chains.setdefault(uid, {})[role_id] = int(chain_num or 0)
+            if role_name:
+                self._names[role_id] = role_name
+
+        threshold = int(time.time()) - ACTIVE_SECONDS
+        for uid in self._valid_uids:
+            if self._active_time.get(uid, 0) >= threshold:
+                self._add(uid)
+        self.ready = True
+
+    def _apply(self, chains: Dict[str, int], delta: int):
+        for role_id, chain_num in chains.items():
+            counter = self._chain_count.setdefault(role_id, {})
+            counter[chain_num] = counter.get(chain_num, 0) + delta
+            if counter[chain_num] <= 0:
+                del counter[chain_num]
+            if not counter:
+                del self._chain_count[role_id]
+
+    def _add(self, uid: str):
+        self._counted.add(uid)
+        self._apply(self._chains.get(uid, {}), 1)
+
+    def _discard(self, uid: str):
+        self._counted.discard(uid)
+        self._apply(self._chains.get(uid, {}), -1)
+
+    def _refresh(self, uid: str, now: Optional[int] = None):
+        """重新判断该UID是否计入统计"""
+        now = now or int(time.time())
+        should_count = (
+            uid in self._valid_uids
+            and self._active_time.get(uid, 0) >= now - ACTIVE_SECONDS
+        )
+        if should_count and uid not in self._counted:
+            self._add(uid)
+        elif not should_count and uid in self._counted:
+            self._discard(uid)
+
+    def update_user(self, uid: str, role_map: Dict[str, Tuple[int, str]]):
+        """全量替换某个用户的角色链数，role_map: role_id -> (链数, 角色名)"""
+        uid = str(uid)
+        old = self._chains.get(uid, {})
+        new = {str(k): int(v[0] or 0) for k, v in role_map.items()}
+        for role_id, (_, role_name) in role_map.items():
+            if role_name:
+                self._names[str(role_id)] = role_name
+
+        if uid in self._counted:
+            self._apply({k: v for k, v in old.items() if new.get(k) != v}, -1)
+            self._apply({k: v for k, v in new.items() if old.get(k) != v}, 1)
+
+        if new:
+            self._chains[uid] = new
+        else:
+            self._chains.pop(uid, None)
+
+    def set_uid_valid(self, uid: str, valid: bool):
+        """CK失效/恢复"""
+        uid = str(uid)
+        if valid:
+            self._valid_uids.add(uid)
+        else:
+            self._valid_uids.discard(uid)
+        self._refresh(uid)
+
+    def touch(self, uid: str, active_time: int):
+        """账号信息更新，刷新活跃时间"""
+        uid = str(uid)
+        self._active_time[uid] = int(active_time or 0)
+        heapq.heappush(self._expire_heap, (self._active_time[uid], uid))
+        self._refresh(uid)
+
+    def expire(self, now: Optional[int] = None):
+        """移出超过30天未活跃的UID"""
+        now = now or int(time.time())
+        threshold = now - ACTIVE_SECONDS
+        while self._expire_heap and self._expire_heap[0][0] < threshold:
+            active_time, uid = heapq.heappop(self._expire_heap)
+            if self._active_time.get(uid) == active_time:
+                self._refresh(uid, now)
+
+    def snapshot(self) -> Tuple[int, List[Dict]]:
+        """
+        当前持有率，返回 (总玩家数, 各角色统计)
+        各角色统计字段与 WavesCharHoldRate 一致
+        """
+        self.expire()
+        total = len(self._counted)
+        if total == 0:
+            return 0, []
+
+        result = []
+        for role_id, counter in self._chain_count.items():
+            hold_count = sum(counter.values())
+            result.append(
+                {
+                    "char_id": role_id,
+                    "char_name": self._names.get(role_id, ""),
+                    "hold_count": hold_count,
+                    "hold_rate": round(hold_count / total * 100, 2),
+                    "chain_distribution": {
+                        str(chain): round(count / hold_count * 100, 2)
+                        for chain, count in sorted(counter.items())
+                    },
+                }
+            )
+        result.sort(key=lambda x: x["hold_rate"], reverse=True)
+        return total, result
+
+    def hold_counts(self) -> Dict[str, int]:
+        """各角色持有人数 (用于与全量统计比对)"""
+        self.expire()
+        return {k: sum(v.values()) for k, v in self._chain_count.items()}
+
+
+char_hold_rate_index = CharHoldRateIndex()
+
+
+class GroupHoldRateCache:
+    """
+    群组持有率结果缓存
+    以群内UID集合作为校验，绑定列表变化时自动失效；成员角色数据变化时按UID失效
+    """
+
+    def __init__(self):
+        # group_id -> (UID集合, 结果)
+        self._cache: Dict[str, Tuple[frozenset, Dict]] = {}
+        # uid -> 缓存中包含该UID的群
+        self._uid_groups: Dict[str, Set[str]] = {}
+
+    def get(self, group_id: str, uids: Iterable[str]) -> Optional[Dict]:
+        entry = self._cache.get(group_id)
+        if entry is None or entry[0] != frozenset(uids):
+            return None
+        return entry[1]
+
+    def set(self, group_id: str, uids: Iterable[str], data: Dict):
+        self.invalidate_group(group_id)
+        members = frozenset(uids)
+        self._cache[group_id] = (members, data)
+        for uid in members:
+            self._uid_groups.setdefault(uid, set()).add(group_id)
+
+    def invalidate_group(self, group_id: str):
+        entry = self._cache.pop(group_id, None)
+        if entry is None:
+            return
+        for uid in entry[0]:
+            groups = self._uid_groups.get(uid)
+            if groups is None:
+                continue
+            groups.discard(group_id)
+            if not groups:
+                del self._uid_groups[uid]
+
+    def invalidate_uid(self, uid: str):
+        """成员角色数据变化"""
+        for group_id in list(self._uid_groups.get(str(uid), ())):
+            self.invalidate_group(group_id)
+
+
+group_hold_rate_cache = GroupHoldRateCache()
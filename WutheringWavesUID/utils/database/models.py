@@ -1,9 +1,16 @@
+import asyncio
+import hashlib
+import json
 import time
 from collections import defaultdict
-from typing import Any, Dict, List, Optional, Type, TypeVar, Tuple
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar, Tuple
 
-from sqlalchemy import delete, null, update, Column, JSON, UniqueConstraint, Index, func, case, select
+from sqlalchemy import delete, null, update, bindparam, Column, JSON, UniqueConstraint, Index, func, case, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 from sqlalchemy.sql import and_, or_
 from sqlmodel import Field, col
 
@@ -16,11 +23,33 @@ from gsuid_core.utils.database.base_models import (
 )
 from gsuid_core.utils.database.startup import exec_list
 from gsuid_core.webconsole.mount_app import GsAdminModel, PageSchema, site
-from ..api.model import RoleDetailData
+from .bind_index import bind_index
+from .hold_rate_index import char_hold_rate_index, group_hold_rate_cache
+from .rank_index import role_rank_index
+from .role_codec import RoleDataType
+from .role_write_buffer import (
+    RolePayload,
+    is_write_behind_enabled,
+    role_write_buffer,
+)
+from .unit_of_work import (
+    run_after_commit,
+    run_after_session_commit,
+    with_uow_session,
+)
 
 # --- 数据库迁移补充 ---
 exec_list.extend(
-    []
+    [
+        "ALTER TABLE wavesroledata ADD COLUMN data_hash VARCHAR(32) DEFAULT ''",
+        "ALTER TABLE wavesroledata ADD COLUMN score_bg VARCHAR(8) DEFAULT ''",
+        "ALTER TABLE wavesroledata ADD COLUMN sonata_name VARCHAR(32) DEFAULT ''",
+        "ALTER TABLE wavesroledata ADD COLUMN role_level INTEGER DEFAULT 0",
+        "ALTER TABLE wavesroledata ADD COLUMN chain_name VARCHAR(8) DEFAULT ''",
+        "ALTER TABLE wavesroledata ADD COLUMN weapon_id INTEGER DEFAULT 0",
+        "ALTER TABLE wavesroledata ADD COLUMN weapon_level INTEGER DEFAULT 0",
+        "ALTER TABLE wavesroledata ADD COLUMN weapon_reson INTEGER DEFAULT 0",
+    ]
 )
 
 T_WavesBind = TypeVar("T_WavesBind", bound="WavesBind")
@@ -38,10 +67,38 @@ class WavesBind(Bind, table=True):
     ):
         """根据传入`group_id`获取该群号下所有绑定`uid`列表"""
         result = await session.scalars(
-            select(cls).where(col(cls.group_id).contains(group_id))
+            select(cls)
+            .join(
+                WavesBindGroup,
+                and_(
+                    WavesBindGroup.user_id == cls.user_id,
+                    WavesBindGroup.bot_id == cls.bot_id,
+                ),
+            )
+            .where(WavesBindGroup.group_id == group_id)
         )
         return result.all()
 
+    @classmethod
+    @with_session
+    async def get_group_user_uids(
+        cls, session: AsyncSession, group_id: str
+    ) -> List[Tuple[str, str]]:
+        """群内所有绑定的 (user_id, uid)，走关联表索引"""
+        stmt = (
+            select(WavesBindUid.user_id, WavesBindUid.uid)
+            .join(
+                WavesBindGroup,
+                and_(
+                    WavesBindGroup.user_id == WavesBindUid.user_id,
+                    WavesBindGroup.bot_id == WavesBindUid.bot_id,
+                ),
+            )
+            .where(WavesBindGroup.group_id == group_id)
+            .order_by(WavesBindUid.id)
+        )
+        return [(r[0], r[1]) for r in (await session.execute(stmt)).all()]
+
     @classmethod
     @with_session
     async def get_all_bind(
@@ -79,6 +136,7 @@ class WavesBind(Bind, table=True):
                 bot_id=bot_id,
                 **{"uid": uid, "group_id": group_id},
             )
+            await cls._sync_bind_index(user_id, bot_id)
             return code
 
         result = await cls.select_data(user_id, bot_id)
@@ -113,6 +171,167 @@ class WavesBind(Bind, table=True):
             )
         return res
 
+    @classmethod
+    async def update_data(cls, user_id: str, bot_id: str, **data) -> int:
+        code = await super().update_data(user_id, bot_id, **data)
+        await cls._sync_bind_index(user_id, bot_id)
+        return code
+
+    @classmethod
+    async def delete_uid(cls, user_id: str, bot_id: str, *args, **kwargs) -> int:
+        code = await super().delete_uid(user_id, bot_id, *args, **kwargs)
+        await cls._sync_bind_index(user_id, bot_id)
+        return code
+
+    @classmethod
+    async def switch_uid_by_game(
+        cls, user_id: str, bot_id: str, *args, **kwargs
+    ) -> int:
+        code = await super().switch_uid_by_game(user_id, bot_id, *args, **kwargs)
+        await cls._sync_bind_index(user_id, bot_id)
+        return code
+
+    @classmethod
+    async def get_uid_to_user_id(cls, uids: List[str]) -> Dict[str, str]:
+        """uid -> user_id (用于排行头像)"""
+        if not bind_index.ready:
+            await cls.rebuild_bind_index()
+        return bind_index.get_uid_to_user_id(uids)
+
+    @classmethod
+    async def has_valid_token(cls, user_id: str, uid: str) -> bool:
+        """该用户是否拥有该uid的有效CK"""
+        if not bind_index.ready:
+            await cls.rebuild_bind_index()
+        return bind_index.has_token(user_id, uid)
+
+    @classmethod
+    async def _sync_bind_index(cls, user_id: str, bot_id: str):
+        """绑定变动后从库表同步该用户的反查索引与关联表"""
+        data = await cls.select_data(user_id, bot_id)
+        uid_str = data.uid if data else None
+        group_str = data.group_id if data else None
+        bind_index.set_user_uids(user_id, bot_id, uid_str)
+        await cls._sync_bind_tables(user_id, bot_id, uid_str, group_str)
+
+    @staticmethod
+    def _split(value: Optional[str]) -> List[str]:
+        result = []
+        for i in (value or "").split("_"):
+            if i and i not in result:
+                result.append(i)
+        return result
+
+    @classmethod
+    @with_session
+    async def _sync_bind_tables(
+        cls,
+        session: AsyncSession,
+        user_id: str,
+        bot_id: str,
+        uid_str: Optional[str],
+        group_str: Optional[str],
+    ):
+        """按 WavesBind 的拼接字段重写该用户的 user-uid / user-group 关联"""
+        for model in (WavesBindUid, WavesBindGroup):
+            await session.execute(
+                delete(model).where(
+                    col(model.user_id) == user_id, col(model.bot_id) == bot_id
+                )
+            )
+        session.add_all(
+            [
+                WavesBindUid(user_id=user_id, bot_id=bot_id, uid=uid)
+                for uid in cls._split(uid_str)
+            ]
+            + [
+                WavesBindGroup(user_id=user_id, bot_id=bot_id, group_id=group_id)
+                for group_id in cls._split(group_str)
+            ]
+        )
+        await session.commit()
+
+    @classmethod
+    @with_session
+    async def rebuild_bind_index(cls, session: AsyncSession) -> int:
+        """从库表重建绑定反查索引，关联表为空时从拼接字段迁移"""
+        binds = (
+            await session.execute(
+                select(cls.user_id, cls.bot_id, cls.uid, cls.group_id)
+            )
+        ).all()
+        migrated = (
+            await session.execute(select(func.count()).select_from(WavesBindUid))
+        ).scalar()
+        if not migrated:
+            for user_id, bot_id, uid_str, group_str in binds:
+                session.add_all(
+                    [
+                        WavesBindUid(user_id=user_id, bot_id=bot_id, uid=uid)
+                        for uid in cls._split(uid_str)
+                    ]
+                    + [
+                        WavesBindGroup(
+                            user_id=user_id, bot_id=bot_id, group_id=group_id
+                        )
+                        for group_id in cls._split(group_str)
+                    ]
+                )
+            await session.commit()
+        tokens = (
+            await session.execute(
+                select(WavesUser.user_id, WavesUser.uid).where(
+                    or_(WavesUser.status == null(), WavesUser.status == ""),
+                    WavesUser.cookie != null(),
+                    WavesUser.cookie != "",
+                )
+            )
+        ).all()
+        bind_index.rebuild([b[:3] for b in binds], tokens)
+        return len(binds)
+
+
+class WavesBindUid(BaseIDModel, table=True):
+    """绑定关联表: 用户 -> UID"""
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "bot_id", "uid", name="uq_waves_bind_uid"),
+        Index("ix_waves_bind_uid_user", "user_id", "bot_id"),
+        {"extend_existing": True},
+    )
+    user_id: str = Field(title="用户ID")
+    bot_id: str = Field(title="平台")
+    uid: str = Field(index=True, title="鸣潮UID")
+
+
+class WavesBindGroup(BaseIDModel, table=True):
+    """绑定关联表: 用户 -> 群"""
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "bot_id", "group_id", name="uq_waves_bind_group"
+        ),
+        Index("ix_waves_bind_group_user", "user_id", "bot_id"),
+        {"extend_existing": True},
+    )
+    user_id: str = Field(title="用户ID")
+    bot_id: str = Field(title="平台")
+    group_id: str = Field(index=True, title="群号")
+
+
+async def _query_uid_token_users(session: AsyncSession, uid: str) -> List[str]:
+    """拥有该UID有效CK (Status空 + Cookie非空) 的 user_id"""
+    sql = (
+        select(WavesUser.user_id)
+        .where(
+            WavesUser.uid == uid,
+            or_(WavesUser.status == null(), WavesUser.status == ""),
+            WavesUser.cookie != null(),
+            WavesUser.cookie != "",
+        )
+    )
+    return list((await session.execute(sql)).scalars().all())
+
 
 class WavesUser(User, table=True):
     __table_args__: Dict[str, Any] = {"extend_existing": True}
@@ -137,8 +356,15 @@ class WavesUser(User, table=True):
             .values(status=mark)
         )
         await session.execute(sql)
+        await WavesValidUid.sync_uid(session, uid)
         return True
 
+    @classmethod
+    @with_session
+    async def sync_valid_uid(cls, session: AsyncSession, uid: str):
+        """CK变动后同步有效UID表"""
+        await WavesValidUid.sync_uid(session, uid)
+
     @classmethod
     @with_session
     async def select_cookie(
@@ -158,7 +384,7 @@ class WavesUser(User, table=True):
         return data[0].cookie if data else None
 
     @classmethod
-    @with_session
+    @with_uow_session
     async def select_waves_user(
         cls: Type[T_WavesUser],
         session: AsyncSession,
@@ -252,10 +478,15 @@ class WavesUser(User, table=True):
     @with_session
     async def delete_all_invalid_cookie(cls, session: AsyncSession):
         """删除所有无效缓存"""
-        sql = delete(cls).where(
-            or_(col(cls.status) == "无效", col(cls.cookie) == ""),
-        )
+        condition = or_(col(cls.status) == "无效", col(cls.cookie) == "")
+        uids = (
+            await session.execute(select(cls.uid).where(condition).distinct())
+        ).scalars().all()
+        sql = delete(cls).where(condition)
         result = await session.execute(sql)
+        for uid in uids:
+            if uid:
+                await WavesValidUid.sync_uid(session, uid)
         return result.rowcount
 
     @classmethod
@@ -275,9 +506,59 @@ class WavesUser(User, table=True):
             )
         )
         result = await session.execute(sql)
+        await WavesValidUid.sync_uid(session, uid)
         return result.rowcount
 
 
+class WavesValidUid(BaseIDModel, table=True):
+    """有效CK的UID (物化表)，供排行/持有率查询直接关联"""
+
+    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    uid: str = Field(unique=True, index=True, title="鸣潮UID")
+
+    @classmethod
+    async def sync_uid(cls, session: AsyncSession, uid: str) -> bool:
+        """根据 WavesUser 重新判断该UID是否有效 (不提交)，提交后同步排行索引"""
+        token_users = await _query_uid_token_users(session, uid)
+        valid = bool(token_users)
+        exists = (
+            await session.execute(select(cls.id).where(cls.uid == uid))
+        ).first()
+        if valid and not exists:
+            session.add(cls(uid=uid))
+        elif not valid and exists:
+            await session.execute(delete(cls).where(col(cls.uid) == uid))
+
+        def update_indexes():
+            role_rank_index.set_uid_valid(uid, valid)
+            char_hold_rate_index.set_uid_valid(uid, valid)
+            bind_index.set_uid_tokens(uid, token_users)
+
+        # 调用方的会话提交成功后再更新内存索引
+        run_after_session_commit(session, update_indexes)
+        return valid
+
+    @classmethod
+    @with_session
+    async def rebuild(cls, session: AsyncSession) -> int:
+        """从 WavesUser 全量重建"""
+        uids = (
+            await session.execute(
+                select(WavesUser.uid)
+                .where(
+                    or_(WavesUser.status == null(), WavesUser.status == ""),
+                    WavesUser.cookie != null(),
+                    WavesUser.cookie != "",
+                )
+                .distinct()
+            )
+        ).scalars().all()
+        await session.execute(delete(cls))
+        session.add_all([cls(uid=uid) for uid in uids if uid])
+        await session.commit()
+        return len(uids)
+
+
 class WavesPush(Push, table=True):
     __table_args__: Dict[str, Any] = {"extend_existing": True}
     bot_id: str = Field(title="平台")
@@ -301,7 +582,7 @@ class WavesAccountInfo(BaseIDModel, table=True):
     create_time: int = Field(default=0, title="创建时间")  # 在此用作最后更新时间
 
     @classmethod
-    @with_session
+    @with_uow_session
     async def save_account_info(
         cls,
         session: AsyncSession,
@@ -334,6 +615,7 @@ class WavesAccountInfo(BaseIDModel, table=True):
                 create_time=create_time
             ))
         await session.commit()
+        run_after_commit(lambda: char_hold_rate_index.touch(uid, create_time))
 
     @classmethod
     @with_session
@@ -407,14 +689,9 @@ class WavesCharHoldRate(BaseIDModel, table=True):
         # 条件: (CK状态正常) AND (有CK) AND (账号信息最近30天更新过)
         # 结果去重 (distinct)
         valid_active_uids_stmt = (
-            select(WavesUser.uid)
-            .join(WavesAccountInfo, WavesAccountInfo.uid == WavesUser.uid)
-            .where(
-                or_(WavesUser.status == null(), WavesUser.status == ""),
-                WavesUser.cookie != null(),
-                WavesUser.cookie != "",
-                WavesAccountInfo.create_time >= active_threshold
-            )
+            select(WavesValidUid.uid)
+            .join(WavesAccountInfo, WavesAccountInfo.uid == WavesValidUid.uid)
+            .where(WavesAccountInfo.create_time >= active_threshold)
             .distinct()
         )
 
@@ -507,6 +784,58 @@ class WavesCharHoldRate(BaseIDModel, table=True):
         await session.commit()
         return updated_count
 
+    @classmethod
+    @with_session
+    async def rebuild_hold_rate_index(cls, session: AsyncSession) -> int:
+        """从数据表重建持有率计数"""
+        rows = (
+            await session.execute(
+                select(
+                    WavesRoleData.uid,
+                    WavesRoleData.role_id,
+                    WavesRoleData.role_name,
+                    WavesRoleData.chain_num,
+                )
+            )
+        ).all()
+        valid_uids = (
+            await session.execute(select(WavesValidUid.uid))
+        ).scalars().all()
+        active_rows = (
+            await session.execute(
+                select(WavesAccountInfo.uid, WavesAccountInfo.create_time)
+            )
+        ).all()
+        char_hold_rate_index.rebuild(rows, valid_uids, active_rows)
+        return len(rows)
+
+    @classmethod
+    @with_session
+    async def check_hold_rate_index(cls, session: AsyncSession) -> List[str]:
+        """
+        与全量统计结果比对持有人数，不一致时重建计数
+        返回不一致的角色ID
+        """
+        # 只比对最近一次全量统计写入的记录
+        latest = select(func.max(cls.update_time)).scalar_subquery()
+        records = (
+            await session.execute(
+                select(cls.char_id, cls.hold_count).where(cls.update_time == latest)
+            )
+        ).all()
+        if not records:
+            return []
+        expected = {r.char_id: r.hold_count for r in records}
+        current = char_hold_rate_index.hold_counts()
+        drift = [
+            char_id
+            for char_id in set(expected) | set(current)
+            if expected.get(char_id, 0) != current.get(char_id, 0)
+        ]
+        if drift:
+            await cls.rebuild_hold_rate_index()
+        return drift
+
     @classmethod
     @with_session
     async def get_last_update_time(
@@ -520,6 +849,19 @@ class WavesCharHoldRate(BaseIDModel, table=True):
         return result.scalar()
 
 
+# 排行展示字段及默认值
+RANK_DISPLAY_DEFAULT: Dict[str, Any] = {
+    "score_bg": "",
+    "sonata_name": "",
+    "role_level": 0,
+    "chain_name": "",
+    "weapon_id": 0,
+    "weapon_level": 0,
+    "weapon_reson": 0,
+}
+RANK_DISPLAY_COLS = list(RANK_DISPLAY_DEFAULT.keys())
+
+
 class WavesRoleData(BaseIDModel, table=True):
     __table_args__ = (
         UniqueConstraint('uid', 'role_id', name='uq_waves_role_uid_role'),
@@ -534,91 +876,270 @@ class WavesRoleData(BaseIDModel, table=True):
     chain_num: int = Field(default=0, index=True, title="链数")
     score: float = Field(default=0.0, index=True, title="评分")
     damage: float = Field(default=0.0, index=True, title="伤害")
-    data: Dict = Field(default={}, sa_column=Column(JSON))
+    data: Dict = Field(default={}, sa_column=Column(RoleDataType))
+    data_hash: str = Field(default="", title="数据hash")
+    # 排行展示字段，保存时预先计算
+    score_bg: str = Field(default="", title="评分背景")
+    sonata_name: str = Field(default="", title="合鸣效果")
+    role_level: int = Field(default=0, title="角色等级")
+    chain_name: str = Field(default="", title="共鸣链")
+    weapon_id: int = Field(default=0, title="武器ID")
+    weapon_level: int = Field(default=0, title="武器等级")
+    weapon_reson: int = Field(default=0, title="武器谐振")
 
     @staticmethod
-    def _get_valid_uids_stmt():
-        """
-        获取去重后的有效用户UID子查询 (Status空 + Cookie非空)
-        """
-        return (
-            select(WavesUser.uid)
-            .where(
-                or_(WavesUser.status == null(), WavesUser.status == ""),
-                WavesUser.cookie != null(),
-                WavesUser.cookie != ""
+    def _hash_role_data(item: Dict) -> str:
+        return hashlib.md5(
+            json.dumps(item, sort_keys=True, ensure_ascii=False).encode()
+        ).hexdigest()
+
+    @staticmethod
+    def _upsert_stmt(session: AsyncSession, values: List[Dict]):
+        """按数据库方言生成 INSERT ... ON CONFLICT(uid, role_id) DO UPDATE"""
+        update_cols = [
+            "role_name",
+            "chain_num",
+            "score",
+            "damage",
+            "data",
+            "data_hash",
+            *RANK_DISPLAY_COLS,
+        ]
+        dialect = session.bind.dialect.name if session.bind else "sqlite"
+        if dialect == "mysql":
+            stmt = mysql_insert(WavesRoleData).values(values)
+            return stmt.on_duplicate_key_update(
+                {c: getattr(stmt.inserted, c) for c in update_cols}
             )
-            .distinct()
+
+        _insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = _insert(WavesRoleData).values(values)
+        return stmt.on_conflict_do_update(
+            index_elements=["uid", "role_id"],
+            set_={c: getattr(stmt.excluded, c) for c in update_cols},
         )
 
     @classmethod
-    @with_session
     async def save_role_data(
-        cls, 
-        session: AsyncSession, 
-        uid: str, 
-        final_role_list: List[Dict], 
-        scores_map: Dict[str, float], 
-        damage_map: Dict[str, float]
+        cls,
+        uid: str,
+        final_role_list: List[Dict],
+        scores_map: Dict[str, float],
+        damage_map: Dict[str, float],
+        display_map: Optional[Dict[str, Dict[str, Any]]] = None,
     ):
         """
         数据层：全量同步角色数据。
+        开启合并写入时放入缓冲，由后台任务批量提交
         """
         if not final_role_list:
             return
+        if is_write_behind_enabled():
+            role_write_buffer.put(
+                uid, final_role_list, scores_map, damage_map, display_map
+            )
+            return
+        await cls._save_role_data(
+            uid, final_role_list, scores_map, damage_map, display_map
+        )
 
-        stmt = select(cls).where(cls.uid == uid)
-        result = await session.execute(stmt)
-        # 建立 角色ID -> 数据库对象 的映射
-        db_map = {r.role_id: r for r in result.scalars().all()}
-        # 记录本次要保留的ID集合
-        incoming_ids = set()
-        
-        to_add = []
+    @classmethod
+    @with_uow_session
+    async def _save_role_data(
+        cls,
+        session: AsyncSession,
+        uid: str,
+        final_role_list: List[Dict],
+        scores_map: Dict[str, float],
+        damage_map: Dict[str, float],
+        display_map: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        update_indexes = await cls._write_role_data(
+            session, uid, final_role_list, scores_map, damage_map, display_map
+        )
+        if update_indexes is None:
+            return
+        await session.commit()
+        # 处于工作单元内时，真正提交后再更新内存索引
+        run_after_commit(update_indexes)
 
+    @classmethod
+    @with_session
+    async def save_role_data_batch(
+        cls, session: AsyncSession, batch: Dict[str, RolePayload]
+    ):
+        """多个用户的角色数据在一个事务内提交 (合并写入)"""
+        callbacks = []
+        for uid, payload in batch.items():
+            update_indexes = await cls._write_role_data(session, uid, *payload)
+            if update_indexes is not None:
+                callbacks.append(update_indexes)
+        if not callbacks:
+            return
+        await session.commit()
+        for update_indexes in callbacks:
+            update_indexes()
+
+    @classmethod
+    async def _write_role_data(
+        cls,
+        session: AsyncSession,
+        uid: str,
+        final_role_list: List[Dict],
+        scores_map: Dict[str, float],
+        damage_map: Dict[str, float],
+        display_map: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Optional[Callable[[], None]]:
+        """
+        写入 (不提交) 一个用户的角色数据，返回提交后更新内存索引的回调；无变化返回 None
+        只写入内容、分数或展示字段有变化的角色 (一条 upsert)，剔除的角色一条 delete
+        """
+        if not final_role_list:
+            return None
+        display_map = display_map or {}
+
+        display_cols = [getattr(cls, c) for c in RANK_DISPLAY_COLS]
+        stmt = select(
+            cls.role_id, cls.data_hash, cls.score, cls.damage, *display_cols
+        ).where(cls.uid == uid)
+        # 角色ID -> (内容hash, 评分, 伤害, 展示字段...)
+        db_map = {r[0]: tuple(r[1:]) for r in (await session.execute(stmt)).all()}
+
+        incoming: Dict[str, Tuple[float, float]] = {}
+        # 角色ID -> (链数, 角色名)，用于持有率计数
+        chains: Dict[str, Tuple[int, str]] = {}
+        changed = []
         for item in final_role_list:
             role_id = str(item["role"]["roleId"])
-            incoming_ids.add(role_id)
-            
-            role_detail = RoleDetailData(**item) 
-            chain_num = role_detail.get_chain_num()
             score = scores_map.get(role_id, 0.0)
             damage = damage_map.get(role_id, 0.0)
-            name = item["role"]["roleName"]
-
-            if role_id in db_map:
-                # --- Update: 存在则更新 ---
-                obj = db_map[role_id]
-                obj.role_name = name
-                obj.data = item
-                obj.score = score
-                obj.damage = damage
-                obj.chain_num = chain_num
-                session.add(obj)
-            else:
-                # --- Insert: 不存在则新增 ---
-                new_obj = cls(
-                    uid=uid,
-                    role_id=role_id,
-                    role_name=name,
-                    score=score,
-                    damage=damage,
-                    data=item,
-                    chain_num=chain_num,
-                )
-                to_add.append(new_obj)
+            incoming[role_id] = (score, damage)
+            chain_num = sum(
+                1 for c in item.get("chainList") or [] if c.get("unlocked")
+            )
+            chains[role_id] = (chain_num, item["role"]["roleName"])
+
+            data_hash = cls._hash_role_data(item)
+            display = display_map.get(role_id, {})
+            display_values = tuple(
+                display.get(c, RANK_DISPLAY_DEFAULT[c]) for c in RANK_DISPLAY_COLS
+            )
+            if db_map.get(role_id) == (data_hash, score, damage, *display_values):
+                continue
+
+            changed.append(
+                {
+                    "uid": uid,
+                    "role_id": role_id,
+                    "role_name": item["role"]["roleName"],
+                    "chain_num": chain_num,
+                    "score": score,
+                    "damage": damage,
+                    "data": item,
+                    "data_hash": data_hash,
+                    **dict(zip(RANK_DISPLAY_COLS, display_values)),
+                }
+            )
+
+        # 分批写入，避免超出 SQLite 单条语句的参数上限
+        for i in range(0, len(changed), 100):
+            await session.execute(cls._upsert_stmt(session, changed[i : i + 100]))
 
         # 数据库里有，但传入列表里没有的，说明是需要剔除的脏数据（例如旧的漂泊者）
-        for role_id, obj in db_map.items():
-            if role_id not in incoming_ids:
-                await session.delete(obj)
-        # 4. 批量新增
-        if to_add:
-            session.add_all(to_add) 
+        stale_ids = [role_id for role_id in db_map if role_id not in incoming]
+        if stale_ids:
+            await session.execute(
+                delete(cls).where(
+                    col(cls.uid) == uid, col(cls.role_id).in_(stale_ids)
+                )
+            )
+
+        if not changed and not stale_ids:
+            return None
+        await WavesRoleTotal.save_totals(
+            session,
+            uid,
+            [(k, chains[k][1], v[0]) for k, v in incoming.items()],
+        )
+
+        def update_indexes():
+            role_rank_index.update_user(uid, incoming)
+            char_hold_rate_index.update_user(uid, chains)
+            group_hold_rate_cache.invalidate_uid(uid)
+
+        return update_indexes
+
+    @classmethod
+    @with_session
+    async def sample_role_data(
+        cls, session: AsyncSession, limit: int = 1000
+    ) -> List[Dict]:
+        """随机抽取角色面板数据 (用于训练压缩字典)"""
+        stmt = select(cls.data).order_by(func.random()).limit(limit)
+        return [r for r in (await session.execute(stmt)).scalars().all() if r]
+
+    @classmethod
+    @with_session
+    async def _compress_batch(
+        cls, session: AsyncSession, last_id: int, batch: int
+    ) -> Tuple[int, int]:
+        if not session.bind or session.bind.dialect.name != "sqlite":
+            return last_id, 0
+        stmt = (
+            select(cls.id, cls.data, cls.data_hash)
+            .where(cls.id > last_id, func.typeof(cls.data) == "text")
+            .order_by(cls.id)
+            .limit(batch)
+        )
+        rows = (await session.execute(stmt)).all()
+        if not rows:
+            return last_id, 0
+        # 重新写入即按压缩格式编码；读取后被刷新面板改写过的行跳过，避免写回旧数据
+        table = cls.__table__
+        stmt = (
+            table.update()
+            .where(
+                table.c.id == bindparam("b_id"),
+                table.c.data_hash == bindparam("b_hash"),
+                func.typeof(table.c.data) == "text",
+            )
+            .values(data=bindparam("b_data", type_=table.c.data.type))
+        )
+        await session.execute(
+            stmt,
+            [{"b_id": r.id, "b_hash": r.data_hash, "b_data": r.data} for r in rows],
+        )
         await session.commit()
-        
+        return rows[-1].id, len(rows)
+
+    @classmethod
+    async def compress_legacy_data(cls, batch: int = 200) -> int:
+        """分批将旧的 JSON 文本数据转换为压缩格式 (仅 SQLite)"""
+        last_id, total = 0, 0
+        while True:
+            last_id, num = await cls._compress_batch(last_id, batch)
+            if not num:
+                return total
+            total += num
+            await asyncio.sleep(0)
+
     @classmethod
     @with_session
+    async def rebuild_rank_index(cls, session: AsyncSession) -> int:
+        """从数据表重建单角色排行索引"""
+        rows = (
+            await session.execute(
+                select(cls.uid, cls.role_id, cls.score, cls.damage)
+            )
+        ).all()
+        valid_uids = (
+            await session.execute(select(WavesValidUid.uid))
+        ).scalars().all()
+        role_rank_index.rebuild(rows, valid_uids)
+        return len(rows)
+        
+    @classmethod
+    @with_uow_session
     async def get_role_data_by_uid(
         cls, session: AsyncSession, uid: str
     ) -> List["WavesRoleData"]:
@@ -628,9 +1149,61 @@ class WavesRoleData(BaseIDModel, table=True):
 
     @classmethod
     @with_session
+    async def get_display_missing(
+        cls, session: AsyncSession, last_id: int, batch: int
+    ) -> List[Any]:
+        """没有预计算排行展示字段的旧数据 (id, uid, role_id, score, data)"""
+        stmt = (
+            select(cls.id, cls.uid, cls.role_id, cls.score, cls.data)
+            .where(cls.id > last_id, cls.score_bg == "")
+            .order_by(cls.id)
+            .limit(batch)
+        )
+        return list((await session.execute(stmt)).all())
+
+    @classmethod
+    @with_session
+    async def save_rank_display(
+        cls,
+        session: AsyncSession,
+        displays: Dict[Tuple[str, str], Dict[str, Any]],
+    ):
+        """回填排行展示字段 (uid, role_id) -> 展示字段，不改动面板数据与hash"""
+        for (uid, role_id), display in displays.items():
+            await session.execute(
+                update(cls)
+                .where(cls.uid == uid, cls.role_id == role_id, cls.score_bg == "")
+                .values(
+                    **{
+                        c: display.get(c, RANK_DISPLAY_DEFAULT[c])
+                        for c in RANK_DISPLAY_COLS
+                    }
+                )
+            )
+        await session.commit()
+
+    @classmethod
+    @with_session
+    async def get_role_data(
+        cls, session: AsyncSession, uid: str, role_id: str
+    ) -> Optional[Dict]:
+        pending = role_write_buffer.get_role_map(uid)
+        if pending is not None:
+            return pending.get(str(role_id))
+        result = await session.execute(
+            select(cls.data).where(cls.uid == uid, cls.role_id == role_id)
+        )
+        return result.scalars().first()
+
+    @classmethod
+    @with_uow_session
     async def get_role_data_map_by_uid(
         cls, session: AsyncSession, uid: str
     ) -> Dict[str, Dict]:
+        # 合并写入尚未提交时以缓冲为准
+        pending = role_write_buffer.get_role_map(uid)
+        if pending is not None:
+            return pending
         result = await session.execute(select(cls).where(cls.uid == uid))
         rows = result.scalars().all()
         return {str(r.role_id): (r.data or {}) for r in rows}
@@ -645,9 +1218,9 @@ class WavesRoleData(BaseIDModel, table=True):
         rank_type: str = "score",  # "score" 或 "damage"
     ) -> List["WavesRoleData"]:
         """
-        获取群内该角色所有数据，直接在数据库层完成排序
+        获取群内该角色所有数据，直接在数据库层完成排序 (不读取面板数据)
         """
-        stmt = select(cls).where(
+        stmt = select(cls).options(defer(cls.data)).where(
             cls.uid.in_(uid_list),
             cls.role_id == role_id
         )
@@ -659,6 +1232,36 @@ class WavesRoleData(BaseIDModel, table=True):
         result = await session.execute(stmt)
         return list(result.scalars().all())
 
+    @classmethod
+    @with_session
+    async def get_hold_rate_stats(
+        cls,
+        session: AsyncSession,
+        uid_list: List[str],
+    ) -> Tuple[int, List[Tuple[str, int, int]]]:
+        """
+        在数据库层统计一组UID的角色持有情况
+        返回 (有角色数据的玩家数, [(角色ID, 链数, 人数)])
+        """
+        if not uid_list:
+            return 0, []
+        total = (
+            await session.execute(
+                select(func.count(func.distinct(cls.uid))).where(
+                    cls.uid.in_(uid_list)
+                )
+            )
+        ).scalar() or 0
+        if not total:
+            return 0, []
+        stmt = (
+            select(cls.role_id, cls.chain_num, func.count(cls.uid))
+            .where(cls.uid.in_(uid_list))
+            .group_by(cls.role_id, cls.chain_num)
+        )
+        rows = [(r[0], r[1], r[2]) for r in (await session.execute(stmt)).all()]
+        return total, rows
+
     @classmethod
     @with_session
     async def get_role_rank_data(
@@ -672,17 +1275,20 @@ class WavesRoleData(BaseIDModel, table=True):
         """
         获取单角色排行数据 (Top N + 指定用户的排名信息)
         """
-        valid_uids_subquery = cls._get_valid_uids_stmt()
-        base_where = [
-            cls.role_id == role_id,
-            cls.uid.in_(valid_uids_subquery)
-        ]
+        if role_rank_index.ready:
+            return await cls._get_role_rank_data_by_index(
+                session, role_id, rank_type, limit, target_uid
+            )
+
+        base_where = [cls.role_id == role_id]
         if rank_type == "damage":
             order_criteria = [cls.damage.desc(), cls.score.desc()]
         else:
             order_criteria = [cls.score.desc(), cls.damage.desc()]
         list_stmt = (
             select(cls)
+            .options(defer(cls.data))
+            .join(WavesValidUid, WavesValidUid.uid == cls.uid)
             .where(*base_where)
             .order_by(*order_criteria)
             .limit(limit)
@@ -699,7 +1305,7 @@ class WavesRoleData(BaseIDModel, table=True):
                     }
                     break
             if not self_info:
-                self_data_stmt = select(cls).where(
+                self_data_stmt = select(cls).options(defer(cls.data)).where(
                     cls.uid == target_uid,
                     cls.role_id == role_id
                 )
@@ -720,6 +1326,7 @@ class WavesRoleData(BaseIDModel, table=True):
                     rank_count_stmt = (
                         select(func.count())
                         .select_from(cls)
+                        .join(WavesValidUid, WavesValidUid.uid == cls.uid)
                         .where(*base_where, better_condition)
                     )
                     rank_pos = (await session.execute(rank_count_stmt)).scalar() or 0
@@ -734,6 +1341,44 @@ class WavesRoleData(BaseIDModel, table=True):
             "self_info": self_info
         }
 
+    @classmethod
+    async def _get_role_rank_data_by_index(
+        cls,
+        session: AsyncSession,
+        role_id: str,
+        rank_type: str,
+        limit: int,
+        target_uid: Optional[str],
+    ) -> Dict:
+        """通过排行索引获取 Top N 与个人名次，只回表读取需要展示的行"""
+        top_uids = role_rank_index.top(role_id, rank_type, limit)
+        need_uids = list(top_uids)
+        if target_uid and str(target_uid) not in top_uids:
+            need_uids.append(str(target_uid))
+
+        rows_map: Dict[str, "WavesRoleData"] = {}
+        if need_uids:
+            stmt = (
+                select(cls)
+                .options(defer(cls.data))
+                .where(cls.role_id == role_id, cls.uid.in_(need_uids))
+            )
+            rows_map = {
+                str(r.uid): r for r in (await session.execute(stmt)).scalars().all()
+            }
+
+        rank_rows = [rows_map[uid] for uid in top_uids if uid in rows_map]
+        self_info = None
+        if target_uid and str(target_uid) in rows_map:
+            rank = role_rank_index.get_rank(str(target_uid), role_id, rank_type)
+            if rank is not None:
+                self_info = {"rank": rank, "data": rows_map[str(target_uid)]}
+
+        return {
+            "list": rank_rows,
+            "self_info": self_info
+        }
+
     @classmethod
     @with_session
     async def get_role_rank_position(
@@ -744,6 +1389,11 @@ class WavesRoleData(BaseIDModel, table=True):
         rank_type: str = "score"
     ) -> Optional[int]:
         """获取某个角色在总排行榜中的位置（只在有效CK用户中排名）"""
+        if role_rank_index.ready:
+            if not role_rank_index.is_valid(uid):
+                return None
+            return role_rank_index.get_position(uid, role_id, rank_type)
+
         stmt = select(cls).where(cls.uid == uid, cls.role_id == role_id)
         result = await session.execute(stmt)
         role_data = result.scalars().first()
@@ -751,11 +1401,8 @@ class WavesRoleData(BaseIDModel, table=True):
         if not role_data:
             return None
 
-        valid_check_stmt = select(func.count()).select_from(WavesUser).where(
-            WavesUser.uid == uid,
-            or_(WavesUser.status == null(), WavesUser.status == ""),
-            WavesUser.cookie != null(),
-            WavesUser.cookie != ""
+        valid_check_stmt = select(func.count()).select_from(WavesValidUid).where(
+            WavesValidUid.uid == uid
         )
         is_valid = (await session.execute(valid_check_stmt)).scalar() or 0
         
@@ -764,12 +1411,14 @@ class WavesRoleData(BaseIDModel, table=True):
         target_value = role_data.score if rank_type == "score" else role_data.damage
         compare_col = cls.damage if rank_type == "damage" else cls.score
 
-        valid_uids_subquery = cls._get_valid_uids_stmt()
-
-        count_stmt = select(func.count()).select_from(cls).where(
-            cls.role_id == role_id,
-            compare_col > target_value,
-            cls.uid.in_(valid_uids_subquery)
+        count_stmt = (
+            select(func.count())
+            .select_from(cls)
+            .join(WavesValidUid, WavesValidUid.uid == cls.uid)
+            .where(
+                cls.role_id == role_id,
+                compare_col > target_value,
+            )
         )
 
         higher_count = (await session.execute(count_stmt)).scalar() or 0
@@ -787,7 +1436,9 @@ class WavesRoleData(BaseIDModel, table=True):
         """
         获取练度排行 (Top N + 个人信息)，不统计总人数
         """
-        valid_uids_subquery = cls._get_valid_uids_stmt()
+        if min_score == TOTAL_RANK_MIN_SCORE:
+            return await cls._get_rank_data_by_total(session, limit, target_uid)
+
         # 计算每个用户的总分 (subquery)
         subquery = (
             select(
@@ -805,10 +1456,8 @@ class WavesRoleData(BaseIDModel, table=True):
                     )
                 ).label("char_count")
             )
-            .where(
-                cls.score >= min_score,
-                cls.uid.in_(valid_uids_subquery)
-            )
+            .join(WavesValidUid, WavesValidUid.uid == cls.uid)
+            .where(cls.score >= min_score)
             .group_by(cls.uid)
             .subquery()
         )
@@ -916,6 +1565,152 @@ class WavesRoleData(BaseIDModel, table=True):
             "list": result_list,
             "self_rank": self_rank_info
         }
+
+    @classmethod
+    async def _get_rank_data_by_total(
+        cls,
+        session: AsyncSession,
+        limit: int,
+        target_uid: Optional[str],
+    ) -> Dict:
+        """从预计算的总分表获取练度排行 (索引排序 + 索引计数)"""
+
+        def to_info(rank: int, row: "WavesRoleTotal") -> Dict:
+            return {
+                "rank": rank,
+                "uid": row.uid,
+                "total_score": float(row.total_score or 0),
+                "char_count": int(row.char_count or 0),
+                "char_scores": list(row.top_chars or []),
+            }
+
+        valid_total = (
+            select(WavesRoleTotal)
+            .join(WavesValidUid, WavesValidUid.uid == WavesRoleTotal.uid)
+            .where(WavesRoleTotal.char_count > 0)
+        )
+        rank_rows = (
+            await session.execute(
+                valid_total.order_by(WavesRoleTotal.total_score.desc()).limit(limit)
+            )
+        ).scalars().all()
+        result_list = [to_info(idx + 1, row) for idx, row in enumerate(rank_rows)]
+
+        self_rank_info = None
+        if target_uid:
+            for info in result_list:
+                if str(info["uid"]) == str(target_uid):
+                    self_rank_info = info
+                    break
+            else:
+                user_row = (
+                    await session.execute(
+                        valid_total.where(WavesRoleTotal.uid == target_uid)
+                    )
+                ).scalars().first()
+                if user_row and user_row.total_score > 0:
+                    higher_count = (
+                        await session.execute(
+                            select(func.count())
+                            .select_from(WavesRoleTotal)
+                            .join(
+                                WavesValidUid,
+                                WavesValidUid.uid == WavesRoleTotal.uid,
+                            )
+                            .where(WavesRoleTotal.total_score > user_row.total_score)
+                        )
+                    ).scalar_one()
+                    self_rank_info = to_info(higher_count + 1, user_row)
+
+        return {"list": result_list, "self_rank": self_rank_info}
+
+
+# 练度总排行统计的最低单角色评分及展示角色数
+TOTAL_RANK_MIN_SCORE = 175.0
+TOTAL_RANK_TOP_CHARS = 10
+
+
+class WavesRoleTotal(BaseIDModel, table=True):
+    """练度总排行 (每个UID一行)，保存角色数据时同步更新"""
+
+    __table_args__ = (
+        Index("ix_role_total_score", "total_score"),
+        {"extend_existing": True},
+    )
+
+    uid: str = Field(unique=True, index=True, title="鸣潮UID")
+    total_score: float = Field(default=0.0, title="总分")
+    char_count: int = Field(default=0, title="达标角色数")
+    top_chars: List[Dict] = Field(
+        default_factory=list, sa_column=Column(JSON), title="最高分角色"
+    )
+
+    @staticmethod
+    def calc_totals(roles: List[Tuple[str, str, float]]) -> Dict[str, Any]:
+        """roles: (role_id, role_name, score)"""
+        qualified = sorted(
+            (r for r in roles if r[2] >= TOTAL_RANK_MIN_SCORE),
+            key=lambda r: r[2],
+            reverse=True,
+        )
+        return {
+            "total_score": float(sum(r[2] for r in qualified)),
+            "char_count": len(qualified),
+            "top_chars": [
+                {"role_id": r[0], "role_name": r[1], "score": r[2]}
+                for r in qualified[:TOTAL_RANK_TOP_CHARS]
+            ],
+        }
+
+    @classmethod
+    async def save_totals(
+        cls,
+        session: AsyncSession,
+        uid: str,
+        roles: List[Tuple[str, str, float]],
+    ):
+        """在调用方的事务中更新该UID的总分 (不提交)"""
+        totals = cls.calc_totals(roles)
+        obj = (
+            await session.execute(select(cls).where(cls.uid == uid))
+        ).scalars().first()
+        if obj:
+            for key, value in totals.items():
+                setattr(obj, key, value)
+            session.add(obj)
+        else:
+            session.add(cls(uid=uid, **totals))
+
+    @classmethod
+    @with_session
+    async def init_totals(cls, session: AsyncSession) -> int:
+        """总分表为空时从角色数据回填"""
+        exists = (await session.execute(select(cls.id).limit(1))).first()
+        if exists:
+            return 0
+        rows = (
+            await session.execute(
+                select(
+                    WavesRoleData.uid,
+                    WavesRoleData.role_id,
+                    WavesRoleData.role_name,
+                    WavesRoleData.score,
+                )
+            )
+        ).all()
+        roles_by_uid = defaultdict(list)
+        for r in rows:
+            roles_by_uid[r.uid].append((r.role_id, r.role_name, r.score))
+        session.add_all(
+            [
+                cls(uid=uid, **cls.calc_totals(roles))
+                for uid, roles in roles_by_uid.items()
+            ]
+        )
+        await session.commit()
+        return len(roles_by_uid)
+
+
 @site.register_admin
 class WavesBindAdmin(GsAdminModel):
     pk_name = "id"
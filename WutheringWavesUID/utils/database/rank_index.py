@@ -0,0 +1,135 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 排行键: (-主排序值, -次排序值, uid)，升序即为排名顺序
+RankKey = Tuple[float, float, str]
+
+RANK_TYPES = ("score", "damage")
+
+
+def _make_key(rank_type: str, uid: str, score: float, damage: float) -> RankKey:
+    if rank_type == "damage":
+        return (-damage, -score, uid)
+    return (-score, -damage, uid)
+
+
+class RoleRankIndex:
+    """
+    单角色排行索引 (评分 / 伤害)
+    每个角色维护一个有序列表，只包含有效CK用户；所有用户的分数另存一份，
+    用于CK失效/恢复时快速移出/放回排行，以及计算无效用户的名次
+    """
+
+    def __init__(self):
+        self.ready = False
+        # (role_id, rank_type) -> 有序排行键
+        self._boards: Dict[Tuple[str, str], List[RankKey]] = {}
+        # uid -> role_id -> (score, damage)
+        self._entries: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self._valid_uids: Set[str] = set()
+
+    def rebuild(
+        self,
+        rows: Iterable[Tuple[str, str, float, float]],
+        valid_uids: Iterable[str],
+    ):
+        """从数据表重建，rows: (uid, role_id, score, damage)"""
+        self._entries = {}
+        self._valid_uids = {str(uid) for uid in valid_uids}
+        boards: Dict[Tuple[str, str], List[RankKey]] = {}
+
+        for uid, role_id, score, damage in rows:
+            uid, role_id = str(uid), str(role_id)
+            score, damage = float(score or 0), float(damage or 0)
+            self._entries.setdefault(uid, {})[role_id] = (score, damage)
+            if uid not in self._valid_uids:
+                continue
+            for rank_type in RANK_TYPES:
+                boards.setdefault((role_id, rank_type), []).append(
+                    _make_key(rank_type, uid, score, damage)
+                )
+
+        for board in boards.values():
+            board.sort()
+        self._boards = boards
+        self.ready = True
+
+    def _insert(self, uid: str, role_id: str, score: float, damage: float):
+        for rank_type in RANK_TYPES:
+            board = self._boards.setdefault((role_id, rank_type), [])
+            insort(board, _make_key(rank_type, uid, score, damage))
+
+    def _remove(self, uid: str, role_id: str, score: float, damage: float):
+        for rank_type in RANK_TYPES:
+            board = self._boards.get((role_id, rank_type))
+            if not board:
+                continue
+            key = _make_key(rank_type, uid, score, damage)
+            pos = bisect_left(board, key)
+            if pos < len(board) and board[pos] == key:
+                del board[pos]
+
+    def update_user(self, uid: str, role_map: Dict[str, Tuple[float, float]]):
+        """全量替换某个用户的角色分数 (与 save_role_data 的同步语义一致)"""
+        uid = str(uid)
+        old = self._entries.get(uid, {})
+        new = {str(k): (float(v[0] or 0), float(v[1] or 0)) for k, v in role_map.items()}
+
+        if uid in self._valid_uids:
+            for role_id, value in old.items():
+                if new.get(role_id) != value:
+                    self._remove(uid, role_id, *value)
+            for role_id, value in new.items():
+                if old.get(role_id) != value:
+                    self._insert(uid, role_id, *value)
+
+        if new:
+            self._entries[uid] = new
+        else:
+            self._entries.pop(uid, None)
+
+    def set_uid_valid(self, uid: str, valid: bool):
+        """CK失效/恢复时移出/放回排行"""
+        uid = str(uid)
+        if valid == (uid in self._valid_uids):
+            return
+        if valid:
+            self._valid_uids.add(uid)
+            for role_id, value in self._entries.get(uid, {}).items():
+                self._insert(uid, role_id, *value)
+        else:
+            self._valid_uids.discard(uid)
+            for role_id, value in self._entries.get(uid, {}).items():
+                self._remove(uid, role_id, *value)
+
+    def is_valid(self, uid: str) -> bool:
+        return str(uid) in self._valid_uids
+
+    def top(self, role_id: str, rank_type: str = "score", limit: int = 20) -> List[str]:
+        board = self._boards.get((str(role_id), rank_type), [])
+        return [key[2] for key in board[:limit]]
+
+    def get_rank(
+        self, uid: str, role_id: str, rank_type: str = "score"
+    ) -> Optional[int]:
+        """排序值(主+次)严格更高的有效用户数 + 1，用户本身可以不在排行中"""
+        value = self._entries.get(str(uid), {}).get(str(role_id))
+        if value is None:
+            return None
+        key = _make_key(rank_type, "", *value)
+        board = self._boards.get((str(role_id), rank_type), [])
+        return bisect_left(board, key) + 1
+
+    def get_position(
+        self, uid: str, role_id: str, rank_type: str = "score"
+    ) -> Optional[int]:
+        """只比较主排序值，主排序值严格更高的有效用户数 + 1"""
+        value = self._entries.get(str(uid), {}).get(str(role_id))
+        if value is None:
+            return None
+        primary = value[1] if rank_type == "damage" else value[0]
+        board = self._boards.get((str(role_id), rank_type), [])
+        return bisect_left(board, (-primary,)) + 1
+
+
+role_rank_index = RoleRankIndex()
@@ -0,0 +1,157 @@
+import json
+import struct
+from typing import Any, Dict, List, Optional
+
+import msgspec
+from sqlalchemy import JSON, LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from gsuid_core.logger import logger
+
+from ..resource.RESOURCE_PATH import ZSTD_DICT_PATH
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 存储格式: 版本(1B) + 字典ID(4B) + zstd(msgpack)
+CODEC_VERSION = 1
+HEADER = struct.Struct(">BI")
+ZSTD_LEVEL = 6
+# 训练字典大小与最少样本数
+DICT_SIZE = 64 * 1024
+MIN_TRAIN_SAMPLES = 200
+
+
+def is_compress_enabled() -> bool:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    if zstandard is None:
+        return False
+    return WutheringWavesConfig.get_config("RoleDataCompress").data
+
+
+class RoleDataCodec:
+    """角色面板数据编解码 (msgpack + zstd 共享字典)"""
+
+    def __init__(self):
+        self._dicts: Dict[int, Any] = {}
+        self.current_dict_id = 0
+
+    def load_dicts(self) -> int:
+        if zstandard is None:
+            return 0
+        files = sorted(
+            ZSTD_DICT_PATH.glob("role_data_*.dict"), key=lambda f: f.stat().st_mtime
+        )
+        for file in files:
+            self._add_dict(zstandard.ZstdCompressionDict(file.read_bytes()))
+        return len(files)
+
+    def _add_dict(self, zstd_dict):
+        zstd_dict.precompute_compress(level=ZSTD_LEVEL)
+        self._dicts[zstd_dict.dict_id()] = zstd_dict
+        # 最新的字典用于压缩，旧字典保留用于解压
+        self.current_dict_id = zstd_dict.dict_id()
+
+    def train(self, samples: List[Dict]) -> Optional[int]:
+        """用已有的角色面板数据训练共享字典"""
+        if zstandard is None or len(samples) < MIN_TRAIN_SAMPLES:
+            return None
+        payloads = [msgspec.msgpack.encode(i) for i in samples]
+        zstd_dict = zstandard.train_dictionary(DICT_SIZE, payloads, level=ZSTD_LEVEL)
+        path = ZSTD_DICT_PATH / f"role_data_{zstd_dict.dict_id()}.dict"
+        path.write_bytes(zstd_dict.as_bytes())
+        self._add_dict(zstd_dict)
+        return zstd_dict.dict_id()
+
+    def encode(self, data: Any) -> bytes:
+        assert zstandard is not None
+        dict_id = self.current_dict_id
+        zstd_dict = self._dicts.get(dict_id)
+        if zstd_dict is not None:
+            compressor = zstandard.ZstdCompressor(dict_data=zstd_dict)
+        else:
+            compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        return HEADER.pack(CODEC_VERSION, dict_id) + compressor.compress(
+            msgspec.msgpack.encode(data)
+        )
+
+    def decode(self, value: bytes) -> Any:
+        if zstandard is None:
+            raise RuntimeError("角色面板数据为压缩格式，请安装 zstandard")
+        version, dict_id = HEADER.unpack_from(value)
+        if version != CODEC_VERSION:
+            raise ValueError(f"未知的角色面板数据格式版本: {version}")
+        if dict_id:
+            decompressor = zstandard.ZstdDecompressor(dict_data=self._dicts[dict_id])
+        else:
+            decompressor = zstandard.ZstdDecompressor()
+        return msgspec.msgpack.decode(decompressor.decompress(value[HEADER.size :]))
+
+
+role_data_codec = RoleDataCodec()
+
+
+class _RawBlob(LargeBinary):
+    """不转换读写的值: 压缩数据存为 BLOB，JSON 仍存为文本"""
+
+    def bind_processor(self, dialect):
+        return None
+
+    def result_processor(self, dialect, coltype):
+        return None
+
+
+class RoleDataType(TypeDecorator):
+    """
+    WavesRoleData.data 列类型
+    SQLite 下开启压缩时写入二进制格式，读取时兼容旧 JSON 文本，无需迁移表结构
+    其他数据库仍按 JSON 存储
+
+    解码在读取 data 列时进行，而不是返回延迟解码的对象: 调用方会把结果当作
+    普通 dict 比较、修改并交给 pydantic 校验，包装对象会改变这些行为。
+    排行、索引等只需要部分字段的查询不读取 data 列，因此不会解码
+    """
+
+    impl = JSON
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(_RawBlob())
+        return dialect.type_descriptor(JSON())
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name != "sqlite" or value is None:
+            return value
+        if is_compress_enabled():
+            return role_data_codec.encode(value)
+        return json.dumps(value, ensure_ascii=False)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, memoryview):
+            value = bytes(value)
+        if isinstance(value, bytes):
+            if value[:1] == bytes([CODEC_VERSION]):
+                return role_data_codec.decode(value)
+            value = value.decode()
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+
+def init_role_data_codec() -> bool:
+    """加载已训练的字典，返回是否启用压缩"""
+    if zstandard is None:
+        from ...wutheringwaves_config import WutheringWavesConfig
+
+        if WutheringWavesConfig.get_config("RoleDataCompress").data:
+            logger.warning("[鸣潮] 角色面板压缩存储需要安装 zstandard，已按 JSON 存储")
+        return False
+    num = role_data_codec.load_dicts()
+    logger.debug(f"[鸣潮] 角色面板压缩字典: {num}")
+    return is_compress_enabled()
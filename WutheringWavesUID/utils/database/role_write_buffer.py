@@ -0,0 +1,110 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from gsuid_core.logger import logger
+
+# uid -> (final_role_list, scores_map, damage_map, display_map)
+RolePayload = Tuple[
+    List[Dict],
+    Dict[str, float],
+    Dict[str, float],
+    Optional[Dict[str, Dict[str, Any]]],
+]
+
+
+def is_write_behind_enabled() -> bool:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return WutheringWavesConfig.get_config("RoleDataWriteBehind").data
+
+
+def _get_interval() -> float:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return max(WutheringWavesConfig.get_config("RoleDataWriteInterval").data, 10) / 1000
+
+
+def _get_batch() -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return max(WutheringWavesConfig.get_config("RoleDataWriteBatch").data, 1)
+
+
+class RoleWriteBuffer:
+    """
+    角色面板数据合并写入 (write-behind)
+    刷新面板只把最终角色列表放入缓冲，后台任务每隔一段时间或攒够一批用户后
+    在一个事务内提交；同一用户多次刷新只保留最后一次。
+    提交前读取该用户的角色数据直接从缓冲返回，保证刷新后立即可见
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, RolePayload] = {}
+        # 正在提交的一批，提交完成前同样可读
+        self._flushing: Dict[str, RolePayload] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def put(
+        self,
+        uid: str,
+        final_role_list: List[Dict],
+        scores_map: Dict[str, float],
+        damage_map: Dict[str, float],
+        display_map: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        self._pending[uid] = (final_role_list, scores_map, damage_map, display_map)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._writer())
+        if len(self._pending) >= _get_batch():
+            self._wakeup.set()
+
+    def get_role_map(self, uid: str) -> Optional[Dict[str, Dict]]:
+        """尚未提交的角色数据 (角色ID -> 面板数据)，没有则返回 None"""
+        payload = self._pending.get(uid) or self._flushing.get(uid)
+        if payload is None:
+            return None
+        return {str(item["role"]["roleId"]): item for item in payload[0]}
+
+    async def _writer(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), _get_interval())
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """立即提交缓冲中的全部数据，返回提交的用户数"""
+        from .models import WavesRoleData
+
+        async with self._lock:
+            if not self._pending:
+                return 0
+            self._flushing, self._pending = self._pending, {}
+            batch = self._flushing
+            try:
+                await WavesRoleData.save_role_data_batch(batch)
+            except Exception as e:
+                # 整批失败时逐个用户提交，避免一条坏数据拖累整批
+                logger.warning(f"[鸣潮] 角色数据合并写入失败，改为逐个提交: {e}")
+                for uid, payload in batch.items():
+                    try:
+                        await WavesRoleData.save_role_data_batch({uid: payload})
+                    except Exception as e:
+                        logger.exception(f"保存角色数据到数据库失败 uid={uid}: {e}")
+            finally:
+                self._flushing = {}
+            return len(batch)
+
+    async def close(self) -> int:
+        """关闭时提交剩余数据"""
+        self._wakeup.set()
+        if self._task is not None and not self._task.done():
+            await self._task
+        return await self.flush()
+
+
+role_write_buffer = RoleWriteBuffer()
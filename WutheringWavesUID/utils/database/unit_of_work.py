@@ -0,0 +1,131 @@
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gsuid_core.utils.database.base_models import async_maker
+
+_current_uow: ContextVar[Optional["UnitOfWork"]] = ContextVar(
+    "waves_unit_of_work", default=None
+)
+
+
+class _UowSession:
+    """
+    工作单元内共享的会话
+    方法内的 commit 只 flush，统一在工作单元结束时提交一次
+    """
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def commit(self):
+        await self._session.flush()
+
+    async def rollback(self):
+        # 由 with_uow_session 的保存点回滚本方法的写入，不影响工作单元内的其他写入
+        pass
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+class UnitOfWork:
+    """
+    多次写入共享一个数据库会话，结束时提交一次；
+    提交后的回调 (内存索引等) 在真正提交成功后才执行
+
+    注意: SQLite 下工作单元从第一次访问数据库起持有写锁直到结束，
+    只能包住集中写入的一小段代码，网络请求、计算与绘图必须放在外面
+    """
+
+    def __init__(self):
+        self.session: Optional[AsyncSession] = None
+        self._after_commit: List[Callable[[], Any]] = []
+        self._token = None
+        self._begun = False
+
+    async def begin(self):
+        """
+        首次使用会话时开启事务
+        SQLite 驱动不会在 SAVEPOINT 前自动 BEGIN，最外层保存点释放即提交；
+        显式 BEGIN IMMEDIATE 使保存点只在工作单元的事务内生效，
+        并且一开始就取得写锁，避免先读后写时升级写锁失败 (database is locked)
+        """
+        if self._begun:
+            return
+        assert self.session is not None
+        self._begun = True
+        conn = await self.session.connection()
+        if conn.dialect.name == "sqlite":
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self.session = async_maker()
+        self._token = _current_uow.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        _current_uow.reset(self._token)
+        assert self.session is not None
+        try:
+            if exc_type is None:
+                await self.session.commit()
+                for callback in self._after_commit:
+                    callback()
+            else:
+                await self.session.rollback()
+        finally:
+            self._after_commit.clear()
+            await self.session.close()
+
+
+def get_unit_of_work() -> Optional[UnitOfWork]:
+    return _current_uow.get()
+
+
+def run_after_commit(callback: Callable[[], Any]):
+    """处于工作单元内时，提交后再执行；否则立即执行"""
+    uow = _current_uow.get()
+    if uow is None:
+        callback()
+    else:
+        uow._after_commit.append(callback)
+
+
+def run_after_session_commit(session: AsyncSession, callback: Callable[[], Any]):
+    """
+    会话由外层 (如 with_session) 负责提交时使用: 该会话提交成功后再执行，
+    提交失败或回滚则不执行
+    """
+    event.listen(
+        session.sync_session, "after_commit", lambda _: callback(), once=True
+    )
+
+
+def with_uow_session(func):
+    """
+    与 with_session 相同，但处于工作单元内时复用其会话
+    每次调用包在一个保存点内: 方法出错只回滚该方法的写入，异常照常抛出，
+    之前已写入的数据仍在工作单元结束时提交
+    """
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        uow = _current_uow.get()
+        if uow is None or uow.session is None:
+            async with async_maker() as session:
+                return await func(self, session, *args, **kwargs)
+        await uow.begin()
+        callbacks = len(uow._after_commit)
+        try:
+            async with uow.session.begin_nested():
+                return await func(self, _UowSession(uow.session), *args, **kwargs)
+        except Exception:
+            # 该方法的写入已回滚，其提交后回调也一并丢弃
+            del uow._after_commit[callbacks:]
+            raise
+
+    return wrapper
@@ -67,49 +67,51 @@ class ExpressionFunc:
         return a not in b
 
 
-class ExpressionEvaluator:
-    def __init__(self, ctx):
-        self.ctx = ctx
-
-    def evaluate(self, expression):
-        return self._evaluate_expression(expression["op"], expression)
-
-    def _evaluate_expression(self, op, expression):
-        if op in {"&&", "||", "!"}:
-            return self._evaluate_logical(op, expression["sub"])
-        else:
-            return self._evaluate_comparison(expression)
-
-    def _evaluate_logical(self, op, childs):
-        operations = {
-            "&&": all,
-            "||": any,
-            "!": lambda v: not list(v)[0],
-        }
-        operation = operations[op]
-        return operation(self.evaluate(child) for child in childs)
-
-    def _evaluate_comparison(self, expression):
-        operations = {
-            "=": ExpressionFunc.func_equal,
-            "!=": ExpressionFunc.func_not_equal,
-            "<": ExpressionFunc.func_less_than,
-            ">": ExpressionFunc.func_greater_than,
-            "<=": ExpressionFunc.func_less_than_or_equal,
-            ">=": ExpressionFunc.func_greater_than_or_equal,
-            "in": ExpressionFunc.func_in,
-            "!in": ExpressionFunc.func_not_in,
-        }
-        key, op, value = expression["key"], expression["op"], expression["value"]
-        return operations[op](self.ctx.get(key), value)
-
-
-def find_first_matching_expression(ctx, expressions, default="calc.json"):
-    evaluator = ExpressionEvaluator(ctx)
+COMPARISON_FUNCS = {
+    "=": ExpressionFunc.func_equal,
+    "!=": ExpressionFunc.func_not_equal,
+    "<": ExpressionFunc.func_less_than,
+    ">": ExpressionFunc.func_greater_than,
+    "<=": ExpressionFunc.func_less_than_or_equal,
+    ">=": ExpressionFunc.func_greater_than_or_equal,
+    "in": ExpressionFunc.func_in,
+    "!in": ExpressionFunc.func_not_in,
+}
+
+
+def compile_expression(expression):
+    """将条件表达式编译为 ctx -> bool 的函数，加载时完成解析"""
+    op = expression["op"]
+    if op in {"&&", "||"}:
+        childs = [compile_expression(child) for child in expression["sub"]]
+        if op == "&&":
+            return lambda ctx: all(child(ctx) for child in childs)
+        return lambda ctx: any(child(ctx) for child in childs)
+    if op == "!":
+        child = compile_expression(expression["sub"][0])
+        return lambda ctx: not child(ctx)
+
+    func = COMPARISON_FUNCS[op]
+    key, value = expression["key"], expression["value"]
+    return lambda ctx: func(ctx.get(key), value)
+
+
+def compile_expressions(expressions):
+    """编译条件列表: [(匹配函数, 选择的模板文件)]，无法编译的条件跳过"""
+    compiled = []
     for expr in expressions:
         try:
-            if evaluator.evaluate(expr):
-                return expr["choose"]
+            compiled.append((compile_expression(expr), expr["choose"]))
+        except Exception as e:
+            logger.exception(e)
+    return compiled
+
+
+def find_first_matching_compiled(ctx, compiled, default="calc.json"):
+    for matcher, choose in compiled:
+        try:
+            if matcher(ctx):
+                return choose
         except Exception as e:
             logger.exception(e)
     return default
@@ -1,9 +1,10 @@
 from typing import Any
 
-import httpx
+import aiohttp
 
 from gsuid_core.logger import logger
 
+from ..api.http_pool import http_pool
 from ..api.wwapi import (
     UPLOAD_ABYSS_RECORD_URL,
     UPLOAD_SLASH_RECORD_URL,
@@ -26,21 +27,22 @@ async def send_score_rank(item: Any):
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传面板结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传面板失败: {res.text if res else ''} {e}")
+    client = await http_pool.get_session()
+    text = ""
+    try:
+        async with client.post(
+            UPLOAD_URL,
+            json=item,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as res:
+            text = await res.text()
+            logger.info(f"上传面板结果: {res.status} - {text}")
+    except Exception as e:
+        logger.exception(f"上传面板失败: {text} {e}")
 
 
 @event_handler(QUEUE_ABYSS_RECORD)
@@ -56,21 +58,22 @@ async def send_abyss_record(item: Any):
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_ABYSS_RECORD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传深渊结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传深渊失败: {res.text if res else ''} {e}")
+    client = await http_pool.get_session()
+    text = ""
+    try:
+        async with client.post(
+            UPLOAD_ABYSS_RECORD_URL,
+            json=item,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as res:
+            text = await res.text()
+            logger.info(f"上传深渊结果: {res.status} - {text}")
+    except Exception as e:
+        logger.exception(f"上传深渊失败: {text} {e}")
 
 
 @event_handler(QUEUE_SLASH_RECORD)
@@ -86,21 +89,22 @@ async def send_slash_record(item: Any):
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_SLASH_RECORD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传冥海结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传冥海失败: {res.text if res else ''} {e}")
+    client = await http_pool.get_session()
+    text = ""
+    try:
+        async with client.post(
+            UPLOAD_SLASH_RECORD_URL,
+            json=item,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as res:
+            text = await res.text()
+            logger.info(f"上传冥海结果: {res.status} - {text}")
+    except Exception as e:
+        logger.exception(f"上传冥海失败: {text} {e}")
 
 
 def init_queues():
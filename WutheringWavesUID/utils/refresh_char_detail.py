@@ -1,6 +1,7 @@
 import asyncio
 import json
-from typing import Dict, List, Optional, Union
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Union
 
 import aiofiles
 
@@ -8,7 +9,8 @@ from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
 from ..utils.api.model import AccountBaseInfo, RoleList, RoleDetailData
-from ..utils.error_reply import WAVES_CODE_101, WAVES_CODE_102
+from ..utils.api.request_util import KuroApiResp, RespCode
+from ..utils.error_reply import WAVES_CODE_101, WAVES_CODE_102, WAVES_CODE_999
 from ..utils.expression_ctx import WavesCharRank, get_waves_char_rank
 from ..utils.hint import error_reply
 from ..utils.queues.const import QUEUE_SCORE_RANK
@@ -30,31 +32,95 @@ def get_refresh_card_concurrency() -> int:
     return WutheringWavesConfig.get_config("RefreshCardConcurrency").data or 2
 
 
-class SemaphoreManager:
+class AdaptiveConcurrency:
+    """
+    AIMD 并发控制器
+    上游响应良好时线性增加并发，出现限流/风控/超时时并发减半
+    RefreshCardConcurrency 作为并发上限
+    """
+
+    MIN_LIMIT = 1.0
+    INITIAL_LIMIT = 2.0
+    # 单次请求耗时低于该值(秒)才增加并发
+    TARGET_LATENCY = 3.0
+    DECREASE_FACTOR = 0.5
+    # 两次减半的最小间隔(秒)，避免同一批失败把并发直接打到底
+    DECREASE_COOLDOWN = 2.0
+
     def __init__(self):
-        self._last_config: int = get_refresh_card_concurrency()
-        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(value=self._last_config)
-        self._semaphore_lock = asyncio.Lock()
+        self.limit: float = self.INITIAL_LIMIT
+        self._last_decrease = 0.0
+
+    def current_limit(self) -> int:
+        max_limit = max(get_refresh_card_concurrency(), 1)
+        return max(min(int(self.limit), max_limit), 1)
+
+    @staticmethod
+    def is_throttled(resp: Optional[KuroApiResp]) -> bool:
+        if resp is None:
+            return True
+        if resp.code in (RespCode.DANGER_ENV.value, WAVES_CODE_999):
+            return True
+        return isinstance(resp.msg, str) and "系统繁忙" in resp.msg
+
+    def on_result(self, resp: Optional[KuroApiResp], latency: float):
+        if self.is_throttled(resp):
+            now = time.monotonic()
+            if now - self._last_decrease < self.DECREASE_COOLDOWN:
+                return
+            self._last_decrease = now
+            self.limit = max(self.MIN_LIMIT, self.limit * self.DECREASE_FACTOR)
+            logger.debug(f"[鸣潮] 刷新面板并发下调至 {self.current_limit()}")
+            return
 
-    async def get_semaphore(self) -> asyncio.Semaphore:
-        current_config = get_refresh_card_concurrency()
+        if resp is not None and resp.success and latency < self.TARGET_LATENCY:
+            max_limit = max(get_refresh_card_concurrency(), 1)
+            # 每完成约 limit 个请求并发 +1
+            self.limit = min(float(max_limit), self.limit + 1 / self.limit)
 
-        if is_use_global_semaphore():
-            return await self._get_semaphore(current_config)  # 全局模式
-        else:
-            return asyncio.Semaphore(value=current_config)  # 独立模式
 
-    async def _get_semaphore(self, current_config: int) -> asyncio.Semaphore:
-        if self._last_config != current_config:
-            async with self._semaphore_lock:
-                if self._last_config != current_config:
-                    self._semaphore = asyncio.Semaphore(value=current_config)
-                    self._last_config = current_config
+class AdaptiveLimiter:
+    """按控制器给出的并发上限放行请求，并回报结果"""
 
-        return self._semaphore
+    def __init__(self, controller: AdaptiveConcurrency):
+        self.controller = controller
+        self._inflight = 0
+        self._cond = asyncio.Condition()
 
+    async def run(
+        self, func: Callable[..., Awaitable[KuroApiResp]], *args
+    ) -> KuroApiResp:
+        async with self._cond:
+            await self._cond.wait_for(
+                lambda: self._inflight < self.controller.current_limit()
+            )
+            self._inflight += 1
 
-semaphore_manager = SemaphoreManager()
+        resp: Optional[KuroApiResp] = None
+        start = time.monotonic()
+        try:
+            resp = await func(*args)
+            return resp
+        finally:
+            self.controller.on_result(resp, time.monotonic() - start)
+            async with self._cond:
+                self._inflight -= 1
+                self._cond.notify_all()
+
+
+class ConcurrencyManager:
+    def __init__(self):
+        # 上游状态是全局的，所有刷新共享同一个控制器
+        self.controller = AdaptiveConcurrency()
+        self._global_limiter = AdaptiveLimiter(self.controller)
+
+    def get_limiter(self) -> AdaptiveLimiter:
+        if is_use_global_semaphore():
+            return self._global_limiter  # 全局模式
+        return AdaptiveLimiter(self.controller)  # 独立模式
+
+
+concurrency_manager = ConcurrencyManager()
 
 
 async def send_card(
@@ -88,7 +154,7 @@ async def send_card(
                 f"角色数量不一致，role_info.roleNum:{len(role_info.roleList)} != waves_char_rank:{len(save_data)}"
             )
             return
-        account_info = await waves_api.get_base_info(uid, token=token)
+        account_info = await waves_api.get_base_info(uid, token=token, use_cache=False)
         if not account_info.success:
             return account_info.throw_msg()
         account_info = AccountBaseInfo.model_validate(account_info.data)
@@ -150,14 +216,17 @@ async def save_card_info(
     # 生成/发送图片
     await send_card(uid, user_id, final_save_data, is_self_ck, token, role_info, waves_data)
 
-    scores_map, damage_map = await WuWaCalc.calc_role_scores_and_damages(final_save_data)
+    scores_map, damage_map, display_map = await WuWaCalc.calc_role_scores_and_damages(
+        final_save_data
+    )
 
     try:
         await WavesRoleData.save_role_data(
             uid=uid,
             final_role_list=final_save_data,
             scores_map=scores_map,
-            damage_map=damage_map
+            damage_map=damage_map,
+            display_map=display_map,
         )
         logger.info(f"角色数据同步完成: uid={uid}, 角色总数={len(final_save_data)}")
     except Exception as e:
@@ -183,22 +252,21 @@ async def refresh_char(
     if not ck:
         return error_reply(WAVES_CODE_102)
     # 共鸣者信息
-    role_info = await waves_api.get_role_info(uid, ck)
+    role_info = await waves_api.get_role_info(uid, ck, use_cache=False)
     if not role_info.success:
         return role_info.throw_msg()
 
     try:
-        role_info = RoleList.model_validate(role_info.data)
+        role_info = RoleList.parse(role_info.data)
     except Exception as e:
         logger.exception(f"{uid} 角色信息解析失败", e)
         msg = f"鸣潮特征码[{uid}]获取数据失败\n1.是否注册过库街区\n2.库街区能否查询当前鸣潮特征码数据"
         return msg
 
-    semaphore = await semaphore_manager.get_semaphore()
+    limiter = concurrency_manager.get_limiter()
 
     async def limited_get_role_detail_info(role_id, uid, ck):
-        async with semaphore:
-            return await waves_api.get_role_detail_info(role_id, uid, ck)
+        return await limiter.run(waves_api.get_role_detail_info, role_id, uid, ck)
 
     if is_self_ck:
         tasks = [
@@ -55,6 +55,9 @@ ANN_CARD_PATH = OTHER_PATH / "ann_card"
 POKER_PATH = OTHER_PATH / "poker"
 
 
+# 角色面板数据压缩字典
+ZSTD_DICT_PATH = MAIN_PATH / "zstd_dict"
+
 # 别名
 ALIAS_PATH = MAIN_PATH / "alias"
 CUSTOM_CHAR_ALIAS_PATH = ALIAS_PATH / "char_alias.json"
@@ -90,6 +93,7 @@ def init_dir():
         ANN_CARD_PATH,
         ALIAS_PATH,
         CUSTOM_MR_CARD_PATH,
+        ZSTD_DICT_PATH,
     ]:
         i.mkdir(parents=True, exist_ok=True)
 
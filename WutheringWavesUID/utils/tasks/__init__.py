@@ -1,4 +1,9 @@
 """定时任务模块"""
 from .update_hold_rate import update_char_hold_rate_cache, manual_update_hold_rate
+from .refresh_cookie_pool import refresh_public_cookie_pool
 
-__all__ = ["update_char_hold_rate_cache", "manual_update_hold_rate"]
+__all__ = [
+    "update_char_hold_rate_cache",
+    "manual_update_hold_rate",
+    "refresh_public_cookie_pool",
+]
@@ -0,0 +1,31 @@
+"""
+定时刷新公共ck池
+"""
+from gsuid_core.aps import scheduler
+from gsuid_core.logger import logger
+
+from ..api.cookie_pool import public_cookie_pool
+from ...wutheringwaves_config import WutheringWavesConfig
+
+
+def get_refresh_minute() -> int:
+    """获取公共ck池刷新间隔（分钟）"""
+    minute = WutheringWavesConfig.get_config("PublicCookieRefreshMinute").data
+    if not isinstance(minute, int) or minute <= 0:
+        return 30
+    return minute
+
+
+@scheduler.scheduled_job("interval", minutes=get_refresh_minute())
+async def refresh_public_cookie_pool():
+    """定时复查并补充公共ck池"""
+    if WutheringWavesConfig.get_config("WavesOnlySelfCk").data:
+        return
+
+    from ..waves_api import waves_api
+
+    try:
+        count = await public_cookie_pool.revalidate(waves_api)
+        logger.info(f"[鸣潮] 公共ck池刷新完成，当前数量: {count}")
+    except Exception as e:
+        logger.exception(f"[鸣潮] 公共ck池刷新失败: {e}")
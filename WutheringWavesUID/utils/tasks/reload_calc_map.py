@@ -0,0 +1,27 @@
+"""
+评分模板热重载任务
+"""
+import asyncio
+
+from gsuid_core.aps import scheduler
+from gsuid_core.logger import logger
+
+from ..calculate import calc_map_cache
+
+
+@scheduler.scheduled_job("interval", minutes=1)
+async def check_calc_map_reload():
+    """检查 map/character 下的模板文件是否有修改，文件读取放到线程中执行"""
+    reloaded = await asyncio.to_thread(calc_map_cache.reload)
+    if reloaded:
+        logger.info(f"[鸣潮] 评分模板已重新加载: {reloaded}")
+
+
+async def manual_reload_calc_map() -> str:
+    """手动重载全部评分模板（供命令调用）"""
+    try:
+        reloaded = await asyncio.to_thread(calc_map_cache.reload, True)
+        return f"评分模板重载成功，共加载 {len(reloaded)} 个角色"
+    except Exception as e:
+        logger.exception(f"[鸣潮] 评分模板重载失败: {e}")
+        return f"评分模板重载失败: {str(e)}"
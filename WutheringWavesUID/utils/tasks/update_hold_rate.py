@@ -36,6 +36,10 @@ async def update_char_hold_rate_cache():
     try:
         updated_count = await WavesCharHoldRate.update_all_hold_rates()
         logger.info(f"[鸣潮持有率] 角色持有率缓存更新成功，共更新 {updated_count} 个角色")
+        # 全量统计作为实时计数的一致性校验
+        drift = await WavesCharHoldRate.check_hold_rate_index()
+        if drift:
+            logger.warning(f"[鸣潮持有率] 实时计数与全量统计不一致，已重建: {drift}")
     except Exception as e:
         logger.exception(f"[鸣潮持有率] 角色持有率缓存更新失败: {e}")
 
@@ -6,7 +6,7 @@ import time
 from functools import wraps
 from typing import Any, Callable, Coroutine, Dict, List, TypeVar, overload
 
-import httpx
+import aiohttp
 
 from gsuid_core.subscribe import gs_subscribe
 
@@ -122,28 +122,33 @@ def async_func_lock(
 # 使用示例
 @timed_async_cache(86400)
 async def get_public_ip(host="127.127.127.127"):
+    from .api.http_pool import http_pool
+
+    client = await http_pool.get_session()
+    timeout = aiohttp.ClientTimeout(total=4)
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.get("https://event.kurobbs.com/event/ip", timeout=4)
-            ip = r.text
+        async with client.get(
+            "https://event.kurobbs.com/event/ip", timeout=timeout
+        ) as r:
+            ip = await r.text()
             return ip
     except:  # noqa:E722, B001
         pass
 
     # 尝试从 ipify 获取 IP 地址
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.get("https://api.ipify.org/?format=json", timeout=4)
-            ip = r.json()["ip"]
+        async with client.get(
+            "https://api.ipify.org/?format=json", timeout=timeout
+        ) as r:
+            ip = (await r.json(content_type=None))["ip"]
             return ip
     except:  # noqa:E722, B001
         pass
 
     # 尝试从 httpbin.org 获取 IP 地址
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.get("https://httpbin.org/ip", timeout=4)
-            ip = r.json()["origin"]
+        async with client.get("https://httpbin.org/ip", timeout=timeout) as r:
+            ip = (await r.json(content_type=None))["origin"]
             return ip
     except:  # noqa:E722, B001
         pass
@@ -100,7 +100,7 @@ async def draw_abyss_img(ev: Event, uid: str, user_id: str) -> Union[bytes, str]
     if not role_info.success:
         return role_info.throw_msg()
 
-    role_info = RoleList.model_validate(role_info.data)
+    role_info = RoleList.parse(role_info.data)
 
     # 深渊
     abyss_data = await get_abyss_data(uid, ck, is_self_ck)
@@ -68,7 +68,7 @@ async def draw_challenge_img(ev: Event, uid: str, user_id: str) -> Union[bytes,
     if not role_info.success:
         return role_info.throw_msg()
 
-    role_info = RoleList.model_validate(role_info.data)
+    role_info = RoleList.parse(role_info.data)
 
     num = len(challenge_data.challengeInfo)
     a = num // 2 + (0 if num % 2 == 0 else 1)
@@ -5,6 +5,7 @@ from typing import List, Union
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
 
 from gsuid_core.bot import Bot
+from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
@@ -13,7 +14,7 @@ from ..utils.api.model import AccountBaseInfo, RoleDetailData
 from ..utils.button import WavesButton
 from ..utils.cache import TimedCache
 from ..utils.char_info_utils import get_all_role_detail_info_list
-from ..utils.database.models import WavesBind
+from ..utils.database.models import WavesAccountInfo, WavesBind
 from ..utils.error_reply import WAVES_CODE_102
 from ..utils.expression_ctx import WavesCharRank, get_waves_char_rank
 from ..utils.fonts.waves_fonts import (
@@ -176,7 +177,6 @@ async def draw_refresh_char_detail_img(
 
     # 保存账号基础信息到数据库
     try:
-        from ..utils.database.models import WavesAccountInfo
         await WavesAccountInfo.save_account_info(
             uid=uid,
             name=account_info.name,
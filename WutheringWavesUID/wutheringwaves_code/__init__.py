@@ -3,13 +3,15 @@ import re
 import time
 from datetime import datetime
 
-import httpx
+import aiohttp
 
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.sv import SV
 
+from ..utils.api.http_pool import http_pool
+
 sv_waves_code = SV("鸣潮兑换码")
 
 invalid_code_list = ("MINGCHAO",)
@@ -45,9 +47,12 @@ async def get_code_list():
         time_string = f"{now.year - 1900}{now.month - 1}{now.day}{now.hour}{now.minute}"
         now_time = int(time.time() * 1000)
         new_url = url.format(time_string, now_time)
-        async with httpx.AsyncClient(timeout=None) as client:
-            res = await client.get(new_url, timeout=10)
-            json_data = res.text.split("=", 1)[1].strip().rstrip(";")
+        client = await http_pool.get_session()
+        async with client.get(
+            new_url, timeout=aiohttp.ClientTimeout(total=10)
+        ) as res:
+            text = await res.text()
+            json_data = text.split("=", 1)[1].strip().rstrip(";")
             logger.debug(f"[获取兑换码] url:{new_url}, codeList:{json_data}")
             return json.loads(json_data)
 
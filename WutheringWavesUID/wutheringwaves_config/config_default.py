@@ -137,6 +137,11 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         "库洛域名代理（重启生效）",
         "",
     ),
+    "KuroApiMockUrl": GsStrConfig(
+        "库洛接口模拟服务地址（重启生效）",
+        "压测用，填写后所有库洛接口(含抽卡记录)都请求到该地址，见 utils/api/mock_server.py",
+        "",
+    ),
     "LocalProxyUrl": GsStrConfig(
         "本地代理地址",
         "本地代理地址",
@@ -151,9 +156,72 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
             "get_role_detail_info",
         ],
     ),
+    "TokenValidCacheTTL": GsIntConfig(
+        "token校验缓存时间（单位秒，0为关闭）",
+        "token校验通过后，在该时间内不再重复校验",
+        300,
+        3600,
+    ),
+    "PublicCookiePoolSize": GsIntConfig(
+        "公共ck池大小（0为关闭）",
+        "预先校验并维护的公共ck数量",
+        10,
+        100,
+    ),
+    "PublicCookieHourQuota": GsIntConfig(
+        "公共ck每小时使用次数上限（0为不限制）",
+        "单个公共ck每小时最多被选取的次数",
+        0,
+        10000,
+    ),
+    "PublicCookieRefreshMinute": GsIntConfig(
+        "公共ck池刷新间隔，重启生效（单位min）",
+        "公共ck池后台复查间隔",
+        30,
+        1440,
+    ),
+    "WavesApiCache": GsBoolConfig(
+        "库街区接口缓存",
+        "开启后基础信息、探索度、数据坞等接口短时间内复用查询结果",
+        True,
+    ),
+    "HttpPoolLimit": GsIntConfig(
+        "网络连接池最大连接数，重启生效",
+        "插件共享网络连接池的最大连接数",
+        100,
+        1000,
+    ),
+    "HttpPoolLimitPerHost": GsIntConfig(
+        "网络连接池单域名最大连接数，重启生效（0为不限制）",
+        "插件共享网络连接池对同一域名的最大连接数",
+        20,
+        200,
+    ),
+    "RoleDataCompress": GsBoolConfig(
+        "角色面板数据压缩存储（仅SQLite，需安装zstandard，重启生效）",
+        "开启后角色面板数据以 msgpack+zstd 压缩存储，旧数据在启动后自动转换",
+        False,
+    ),
+    "RoleDataWriteBehind": GsBoolConfig(
+        "角色面板数据合并写入",
+        "开启后刷新面板的角色数据先缓存在内存，由后台任务定时合并多个用户一次提交，缓解大量刷新时的数据库锁竞争",
+        False,
+    ),
+    "RoleDataWriteInterval": GsIntConfig(
+        "角色面板数据合并写入间隔（毫秒）",
+        "合并写入开启时，后台任务每隔多久提交一次",
+        500,
+        10000,
+    ),
+    "RoleDataWriteBatch": GsIntConfig(
+        "角色面板数据合并写入批量（用户数）",
+        "合并写入开启时，缓存的用户数达到该值立即提交",
+        20,
+        200,
+    ),
     "RefreshCardConcurrency": GsIntConfig(
-        "刷新角色面板并发数",
-        "刷新角色面板并发数",
+        "刷新角色面板最大并发数",
+        "刷新角色面板并发数上限，实际并发根据库洛响应情况自动调整",
         10,
         50,
     ),
@@ -11,7 +11,7 @@ from ..utils.button import WavesButton
 from ..utils.database.models import WavesBind
 from ..utils.error_reply import WAVES_CODE_103
 from .draw_slash_query_card import draw_slash_img
-from .endless_rank_cleaner import check_and_clean
+from .endless_rank_cleaner import endless_rank_rotate_job  # noqa: F401
 from .draw_endless_rank_card import draw_endless_rank_img
 from .draw_global_endless_rank_card import draw_global_endless_rank_img
 
@@ -60,7 +60,6 @@ async def send_waves_slash_query_info(bot: Bot, ev: Event):
 
 @sv_waves_endless_rank.on_regex("^无尽(?:排行|排名)$", block=True)
 async def send_endless_rank_card(bot: Bot, ev: Event):
-    await check_and_clean()  # 懒加载检查并清理
     if not ev.group_id:
         return await bot.send("请在群聊中使用")
 
@@ -75,7 +74,6 @@ async def send_endless_rank_card(bot: Bot, ev: Event):
 
 @sv_waves_global_endless_rank.on_regex(r"^无尽总排行(\d*)$", block=True)
 async def send_global_endless_rank_card(bot: Bot, ev: Event):
-    await check_and_clean()  # 懒加载检查并清理
     im = await draw_global_endless_rank_img(bot, ev)
     if isinstance(im, str):
         at_sender = True if ev.group_id else False
@@ -83,6 +81,16 @@ async def send_global_endless_rank_card(bot: Bot, ev: Event):
     if isinstance(im, bytes):
         await bot.send(im)
 
+
+@sv_waves_global_endless_rank.on_regex(r"^无尽上期(?:总)?排行$", block=True)
+async def send_last_global_endless_rank_card(bot: Bot, ev: Event):
+    im = await draw_global_endless_rank_img(bot, ev, last_cycle=True)
+    if isinstance(im, str):
+        at_sender = True if ev.group_id else False
+        await bot.send(im, at_sender)
+    if isinstance(im, bytes):
+        await bot.send(im)
+
 @sv_delete_waves_endless.on_regex(r"^清除无尽(\d*)$", block=True)
 async def send_global_endless_rank_card(bot: Bot, ev: Event):
     from .models import SlashSimpleRecord
@@ -51,18 +51,11 @@ class EndlessRankInfo(BaseModel):
 
 # --- 数据处理函数 ---
 async def get_all_endless_rank_info(
-    group_users: List[WavesBind],
+    user_uid_pairs: List[Tuple[str, str]],
 ) -> List[EndlessRankInfo]:
     """一次性并发获取所有有效用户的最新排行数据"""
     from .models import SlashSimpleRecord
 
-    user_uid_pairs = []
-    for user in group_users:
-        if user.uid:
-            uids = user.uid.split("_")
-            for uid in uids:
-                user_uid_pairs.append((user.user_id, uid))
-
     if not user_uid_pairs:
         return []
 
@@ -239,12 +232,12 @@ def _create_rank_bar(
 
 # --- 主函数 ---
 async def draw_endless_rank_img(bot: Bot, ev: Event) -> Union[str, bytes]:
-    users = await WavesBind.get_group_all_uid(ev.group_id)
+    user_uid_pairs = await WavesBind.get_group_user_uids(ev.group_id)
 
-    if not users:
+    if not user_uid_pairs:
         return f"[鸣潮] 群【{ev.group_id}】暂无登录用户。"
 
-    rank_info_list = await get_all_endless_rank_info(list(users))
+    rank_info_list = await get_all_endless_rank_info(user_uid_pairs)
 
     if not rank_info_list:
         msg = [f"[鸣潮] 群【{ev.group_id}】暂无有效的无尽挑战数据。"]
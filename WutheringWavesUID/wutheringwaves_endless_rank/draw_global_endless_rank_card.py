@@ -50,32 +50,55 @@ class EndlessRankInfo(BaseModel):
 
 
 # --- 数据处理函数 ---
-async def get_all_endless_rank_info() -> List[EndlessRankInfo]:
-    """一次性获取所有用户的最新排行数据"""
-    from .models import SlashSimpleRecord
+def record_to_rank_info(record) -> EndlessRankInfo:
+    """只对需要展示的记录解析队伍数据"""
+    try:
+        half_list = json.loads(record.halfList) if record.halfList else []
+    except (json.JSONDecodeError, AttributeError):
+        half_list = []
+
+    return EndlessRankInfo(
+        qid=record.user_id,
+        uid=record.wavesId,
+        name=record.name or hide_uid(record.wavesId),
+        endless_score=record.score,
+        rank_level=record.rank.lower() if record.rank else "",
+        half_list=half_list,
+    )
 
-    # 一次性从数据库获取所有需要的记录
-    records = await SlashSimpleRecord.get_all_records()
 
-    rank_info_list = []
-    for record in records:
-        try:
-            half_list = json.loads(record.halfList) if record.halfList else []
-        except (json.JSONDecodeError, AttributeError):
-            half_list = []
-
-        rank_info_list.append(
-            EndlessRankInfo(
-                qid=record.user_id,
-                uid=record.wavesId,
-                name=record.name or hide_uid(record.wavesId),
-                endless_score=record.score,
-                rank_level=record.rank.lower() if record.rank else "",
-                half_list=half_list,
-            )
-        )
+async def get_all_endless_rank_info(
+    self_uid: Optional[str] = None,
+    cycle: Optional[int] = None,
+) -> Tuple[
+    List[Tuple[int, EndlessRankInfo]], Optional[Tuple[int, EndlessRankInfo]]
+]:
+    """
+    从数据库直接获取前N名与自己的名次，指定 cycle 时读取该期归档
+    列表与自己的名次使用同一规则 (分数更高的UID数 + 1)
+    """
+    from .models import SlashRankArchive, SlashSimpleRecord
+
+    if cycle is None:
+        ranked = await SlashSimpleRecord.get_top_records(RANK_LENGTH)
+    else:
+        records = await SlashRankArchive.get_top_records(cycle, RANK_LENGTH)
+        # 归档记录使用归档时保存的名次
+        ranked = [(record.position, record) for record in records]
+    display_list = [
+        (position, record_to_rank_info(record)) for position, record in ranked
+    ]
+
+    self_rank = None
+    if self_uid:
+        if cycle is None:
+            rank, record = await SlashSimpleRecord.get_self_rank(self_uid)
+        else:
+            rank, record = await SlashRankArchive.get_self_rank(cycle, self_uid)
+        if rank and record:
+            self_rank = (rank, record_to_rank_info(record))
 
-    return rank_info_list
+    return display_list, self_rank
 
 
 # --- 图像资源获取 ---
@@ -224,34 +247,38 @@ def _create_rank_bar(
 
 
 # --- 主函数 ---
-async def draw_global_endless_rank_img(bot: Bot, ev: Event) -> Union[str, bytes]:
-    # 直接调用获取所有用户数据的方法
-    rank_info_list = await get_all_endless_rank_info()
+async def draw_global_endless_rank_img(
+    bot: Bot, ev: Event, last_cycle: bool = False
+) -> Union[str, bytes]:
+    from .models import SlashRankArchive, SlashSimpleRecord
 
-    if not rank_info_list:
+    cycle = None
+    if last_cycle:
+        cycle = await SlashRankArchive.get_last_cycle()
+        if cycle is None:
+            return "[鸣潮] 暂无上期无尽排行数据。"
+
+    self_uid = await WavesBind.get_uid_by_game(ev.user_id, ev.bot_id)
+    display_list, self_rank = await get_all_endless_rank_info(self_uid, cycle)
+
+    if not display_list:
         # 错误信息不再与特定群组挂钩
         msg = ["[鸣潮] 暂无有效的无尽挑战数据。"]
         msg.append(f"请使用【{PREFIX}无尽】更新数据后再试。")
         return "\n".join(msg)
 
-    rank_info_list.sort(key=lambda i: i.endless_score, reverse=True)
-
-    self_uid = await WavesBind.get_uid_by_game(ev.user_id, ev.bot_id)
     self_rank_info = None
     self_rank_index = -1
-    for i, rank in enumerate(rank_info_list):
-        if rank.uid == self_uid:
-            self_rank_info = rank
-            self_rank_index = i
-            break
+    if self_rank:
+        self_rank_index = self_rank[0] - 1
+        self_rank_info = self_rank[1]
 
-    display_list = rank_info_list[:RANK_LENGTH]
     show_self_at_end = self_rank_info is not None
 
-    users_to_draw = display_list[:]
+    users_to_draw = [info for _, info in display_list]
     if show_self_at_end:
         # 确保自己的信息在待绘制列表中，以获取头像
-        if not any(u.uid == self_rank_info.uid for u in users_to_draw):
+        if not any(u.uid == self_rank_info.uid for _, u in display_list):
             users_to_draw.append(self_rank_info)
 
     user_qids_needed = {rank.qid for rank in users_to_draw}
@@ -282,7 +309,8 @@ async def draw_global_endless_rank_img(bot: Bot, ev: Event) -> Union[str, bytes]
     logo_copy = LOGO_IMG.copy()
     logo_copy.thumbnail((150, 150), Image.LANCZOS)
     card_img.alpha_composite(logo_copy, dest=(50, 55))
-    draw.text((img_width // 2, 80), "海蚀Bot无尽排行", "white", waves_font_40, "mm")
+    title = "海蚀Bot无尽上期排行" if last_cycle else "海蚀Bot无尽排行"
+    draw.text((img_width // 2, 80), title, "white", waves_font_40, "mm")
     draw.text(
         (img_width // 2, 125),
         "数据来源: 千咲 · Bot总排行（使用ww无尽上传后可加入排行）",
@@ -291,14 +319,12 @@ async def draw_global_endless_rank_img(bot: Bot, ev: Event) -> Union[str, bytes]
         "mm",
     )
 
-    if rank_info_list:
-        total_players = len(rank_info_list)
-        avg_score = (
-            sum(i.endless_score for i in rank_info_list) // total_players
-            if total_players
-            else 0
-        )
-        max_score_info = rank_info_list[0]
+    if cycle is None:
+        total_players, avg_score = await SlashSimpleRecord.get_rank_stats()
+    else:
+        total_players, avg_score = await SlashRankArchive.get_rank_stats(cycle)
+    if total_players:
+        max_score_info = display_list[0][1]
         stats_text = (
             f"最高分: {max_score_info.endless_score} (by {max_score_info.name})    "
             f"平均分: {avg_score}"
@@ -320,11 +346,11 @@ async def draw_global_endless_rank_img(bot: Bot, ev: Event) -> Union[str, bytes]
         )
 
     y_pos_start = title_h + header_h
-    for i, rank in enumerate(display_list):
+    for i, (position, rank) in enumerate(display_list):
         user_avatar = user_avatars_map.get(rank.qid)
         if user_avatar:
             bar_image = _create_rank_bar(
-                rank, i + 1, user_avatar, char_avatars_map, is_self_row=False
+                rank, position, user_avatar, char_avatars_map, is_self_row=False
             )
             card_img.paste(bar_image, (centered_x, y_pos_start + i * bar_h), bar_image)
 
@@ -164,7 +164,7 @@ async def draw_slash_img(ev: Event, uid: str, user_id: str) -> Union[bytes, str]
     if not role_info.success:
         return role_info.throw_msg()
 
-    role_info = RoleList.model_validate(role_info.data)
+    role_info = RoleList.parse(role_info.data)
 
     # 绘制图片
     footer_h = 50
@@ -1,33 +1,58 @@
 import os
-from datetime import datetime, timedelta
 import logging
 
-from .models import SlashSimpleRecord
+from gsuid_core.aps import scheduler
+
+from .models import (
+    CYCLE_BASE,
+    CYCLE_WEEKS,
+    SlashSimpleRecord,
+    get_cycle_num,
+)
+
 logger = logging.getLogger(__name__)
 
-# 活动周期基准时间
-CYCLE_BASE = datetime(2025, 8, 4, 4, 0, 0)
-CYCLE_WEEKS = 4
+# 旧版本按周期清理时使用的标记文件，仅在迁移时读取一次
 CLEAN_FLAG_FILE = os.path.join(os.path.dirname(__file__), "endless_rank_clean.flag")
 
 
-async def check_and_clean():
-    now = datetime.now()
-    delta = now - CYCLE_BASE
-    cycle_num = delta.days // (CYCLE_WEEKS * 7)
-    last_cycle = None
+async def migrate_legacy_records():
+    """
+    旧记录没有周期字段: 标记文件记录的是上次清理时的周期，
+    清理后写入的记录都属于该周期；没有标记文件时视为当前周期
+    """
+    cycle = get_cycle_num()
     if os.path.exists(CLEAN_FLAG_FILE):
         with open(CLEAN_FLAG_FILE, "r") as f:
             try:
-                last_cycle = int(f.read().strip())
+                cycle = int(f.read().strip())
             except Exception:
-                last_cycle = None
-    # 如果进入新周期，清理
-    if last_cycle != cycle_num:
-        try:
-            await SlashSimpleRecord.clean_simple()
-            logger.info(f"新周期，清理成功")
-            with open(CLEAN_FLAG_FILE, "w") as f:
-                f.write(str(cycle_num))
-        except Exception as e:
-            logger.error(f"[EndlessRankCleaner] 清理数据库异常: {e}")
+                pass
+    num = await SlashSimpleRecord.migrate_legacy_cycle(cycle)
+    if num:
+        logger.info(f"[EndlessRankCleaner] 旧记录归入周期 {cycle}: {num}")
+    if os.path.exists(CLEAN_FLAG_FILE):
+        os.remove(CLEAN_FLAG_FILE)
+
+
+async def rotate_endless_records():
+    """归档已结束周期的记录"""
+    try:
+        num = await SlashSimpleRecord.archive_finished_cycles()
+        if num:
+            logger.info(f"[EndlessRankCleaner] 新周期，归档上期排行: {num}")
+    except Exception as e:
+        logger.error(f"[EndlessRankCleaner] 归档无尽排行异常: {e}")
+
+
+# 周期在周一 4:00 切换 (CYCLE_BASE)，每周此时检查一次
+@scheduler.scheduled_job(
+    "cron",
+    day_of_week=CYCLE_BASE.weekday(),
+    hour=CYCLE_BASE.hour,
+    minute=CYCLE_BASE.minute,
+    second=30,
+)
+async def endless_rank_rotate_job():
+    logger.debug(f"[EndlessRankCleaner] 检查周期 (每 {CYCLE_WEEKS} 周切换)")
+    await rotate_endless_records()
@@ -1,10 +1,9 @@
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, Dict, List, Tuple, Optional
 
-from sqlalchemy import delete
-from sqlalchemy.orm import aliased
+from sqlalchemy import Index, delete, update
 from sqlmodel import Field, SQLModel, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func, tuple_, operators
@@ -13,8 +12,49 @@ from gsuid_core.utils.database.base_models import with_session
 
 logger = logging.getLogger(__name__)
 
+# 本地无尽排行只记录第12层
+ENDLESS_CHALLENGE_ID = 12
+
+# 活动周期基准时间
+CYCLE_BASE = datetime(2025, 8, 4, 4, 0, 0)
+CYCLE_WEEKS = 4
+# 历史排行保留队伍详情的名次
+ARCHIVE_DETAIL_LENGTH = 20
+# 旧数据的周期 (迁移前写入)
+LEGACY_CYCLE = -1
+
+
+def get_cycle_num(now: Optional[datetime] = None) -> int:
+    """当前所处的活动周期序号"""
+    delta = (now or datetime.now()) - CYCLE_BASE
+    return delta.days // (CYCLE_WEEKS * 7)
+
+
+def get_cycle_start(cycle: int) -> datetime:
+    return CYCLE_BASE + timedelta(weeks=CYCLE_WEEKS * cycle)
+
+
+# 已存在的表补充周期字段与排行索引
+exec_list.extend(
+    [
+        f"ALTER TABLE slash_simple_records ADD COLUMN cycle INTEGER DEFAULT {LEGACY_CYCLE}",
+        "CREATE INDEX IF NOT EXISTS ix_slash_simple_records_cycle "
+        "ON slash_simple_records (cycle)",
+        "CREATE INDEX IF NOT EXISTS ix_slash_challenge_score "
+        "ON slash_simple_records (challengeId, score)",
+        "CREATE INDEX IF NOT EXISTS ix_slash_waves_score "
+        "ON slash_simple_records (wavesId, score)",
+    ]
+)
+
+
 class SlashSimpleRecord(SQLModel, table=True):
     __tablename__ = "slash_simple_records"
+    __table_args__ = (
+        Index("ix_slash_challenge_score", "challengeId", "score"),
+        Index("ix_slash_waves_score", "wavesId", "score"),
+        {"extend_existing": True},
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)
     wavesId: str = Field(index=True)
@@ -24,6 +64,7 @@ class SlashSimpleRecord(SQLModel, table=True):
     halfList: str
     rank: str
     score: int
+    cycle: int = Field(default=LEGACY_CYCLE, index=True)
 
     @classmethod
     @with_session
@@ -34,12 +75,14 @@ class SlashSimpleRecord(SQLModel, table=True):
             waves_id = payload.get("wavesId", "")
             name = payload.get("name", "")
             challenge_id = int(payload.get("challengeId", 0))
+            cycle = get_cycle_num()
 
             result = await session.execute(
                 select(cls).where(
                     (cls.wavesId == waves_id)
                     & (cls.challengeId == challenge_id)
                     & (cls.user_id == user_id)
+                    & (cls.cycle == cycle)
                 )
             )
             existing_record = result.scalar_one_or_none()
@@ -64,6 +107,7 @@ class SlashSimpleRecord(SQLModel, table=True):
                     user_id=user_id,
                     wavesId=waves_id,
                     challengeId=challenge_id,
+                    cycle=cycle,
                     **update_payload,
                 )
                 session.add(record)
@@ -89,6 +133,7 @@ class SlashSimpleRecord(SQLModel, table=True):
             # 使用 operators.in_op 来提高版本兼容性
             statement = select(cls).where(
                 cls.challengeId == challenge_id,
+                cls.cycle == get_cycle_num(),
                 operators.in_op(tuple_(cls.user_id, cls.wavesId), user_uid_pairs),
             )
             result = await session.execute(statement)
@@ -99,32 +144,263 @@ class SlashSimpleRecord(SQLModel, table=True):
 
     @classmethod
     @with_session
-    async def get_all_records(cls, session: AsyncSession) -> List["SlashSimpleRecord"]:
-        """获取所有用户的记录。"""
+    async def get_top_records(
+        cls,
+        session: AsyncSession,
+        limit: int,
+        challenge_id: int = ENDLESS_CHALLENGE_ID,
+    ) -> List[Tuple[int, "SlashSimpleRecord"]]:
+        """
+        按分数取前N名 (每个UID只取最高的一条)，返回 (名次, 记录)
+        名次与 get_self_rank 一致: 分数更高的UID数 + 1，同分同名次
+        沿 (challengeId, score) 索引按分数顺序读取，只加载展示行的完整数据
+        """
         try:
-            subquery = (
-                select(
-                    cls,
-                    func.row_number()
-                    .over(
-                        partition_by=cls.wavesId,
-                        order_by=cls.score.desc(),
+            cycle = get_cycle_num()
+            best: Dict[str, int] = {}
+            offset, batch = 0, limit * 2
+            while len(best) < limit:
+                rows = (
+                    await session.execute(
+                        select(cls.id, cls.wavesId)
+                        .where(cls.challengeId == challenge_id, cls.cycle == cycle)
+                        .order_by(cls.score.desc(), cls.id)
+                        .offset(offset)
+                        .limit(batch)
                     )
-                    .label("row_num"),
+                ).all()
+                for record_id, waves_id in rows:
+                    if waves_id not in best and len(best) < limit:
+                        best[waves_id] = record_id
+                if len(rows) < batch:
+                    break
+                offset += batch
+
+            if not best:
+                return []
+            records = (
+                await session.execute(select(cls).where(cls.id.in_(best.values())))
+            ).scalars().all()
+            records = sorted(records, key=lambda r: (-r.score, r.id))
+            # 按分数降序排列，分数更高的UID都排在前面
+            ranked, position, last_score = [], 0, None
+            for index, record in enumerate(records):
+                if record.score != last_score:
+                    position, last_score = index + 1, record.score
+                ranked.append((position, record))
+            return ranked
+        except Exception as e:
+            logger.error(f"获取排行前列记录失败: {e}")
+            return []
+
+    @classmethod
+    @with_session
+    async def get_self_rank(
+        cls,
+        session: AsyncSession,
+        waves_id: str,
+        challenge_id: int = ENDLESS_CHALLENGE_ID,
+    ) -> Tuple[Optional[int], Optional["SlashSimpleRecord"]]:
+        """该UID的最高记录及名次 (分数更高的UID数 + 1)"""
+        try:
+            cycle = get_cycle_num()
+            record = (
+                await session.execute(
+                    select(cls)
+                    .where(
+                        cls.wavesId == waves_id,
+                        cls.challengeId == challenge_id,
+                        cls.cycle == cycle,
+                    )
+                    .order_by(cls.score.desc(), cls.id)
+                    .limit(1)
                 )
+            ).scalars().first()
+            if not record:
+                return None, None
+            higher = (
+                await session.execute(
+                    select(func.count(func.distinct(cls.wavesId))).where(
+                        cls.challengeId == challenge_id,
+                        cls.cycle == cycle,
+                        cls.score > record.score,
+                    )
+                )
+            ).scalar() or 0
+            return higher + 1, record
+        except Exception as e:
+            logger.error(f"获取个人排名失败: {e}")
+            return None, None
+
+    @classmethod
+    @with_session
+    async def get_rank_stats(
+        cls,
+        session: AsyncSession,
+        challenge_id: int = ENDLESS_CHALLENGE_ID,
+    ) -> Tuple[int, int]:
+        """参与人数与平均分 (每个UID取最高分)"""
+        try:
+            best = (
+                select(func.max(cls.score).label("best"))
+                .where(cls.challengeId == challenge_id, cls.cycle == get_cycle_num())
+                .group_by(cls.wavesId)
                 .subquery()
             )
-            ranked_records_alias = aliased(cls, subquery)
-            statement = select(ranked_records_alias).where(subquery.c.row_num == 1)
-
-            result = await session.execute(statement)
-            return result.scalars().all()
+            row = (
+                await session.execute(
+                    select(func.count(), func.avg(best.c.best)).select_from(best)
+                )
+            ).first()
+            if not row or not row[0]:
+                return 0, 0
+            return int(row[0]), int(row[1] or 0)
         except Exception as e:
-            logger.error(f"获取所有记录失败: {e}")
-            return []
+            logger.error(f"获取排行统计失败: {e}")
+            return 0, 0
 
-    @classmethod 
+    @classmethod
     @with_session
     async def clean_simple(cls, session: AsyncSession):
         await session.execute(delete(SlashSimpleRecord))
         await session.commit()
+
+    @classmethod
+    @with_session
+    async def migrate_legacy_cycle(cls, session: AsyncSession, cycle: int) -> int:
+        """为迁移前写入的记录补上所属周期"""
+        result = await session.execute(
+            update(cls).where(cls.cycle == LEGACY_CYCLE).values(cycle=cycle)
+        )
+        await session.commit()
+        return result.rowcount
+
+    @classmethod
+    @with_session
+    async def archive_finished_cycles(cls, session: AsyncSession) -> int:
+        """
+        将已结束周期的记录归档到 SlashRankArchive 并从当前表移除
+        每个UID只保留最高的一条，前 ARCHIVE_DETAIL_LENGTH 名保留队伍详情
+        """
+        current = get_cycle_num()
+        cycles = (
+            await session.execute(
+                select(cls.cycle)
+                .where(cls.cycle < current, cls.cycle != LEGACY_CYCLE)
+                .distinct()
+            )
+        ).scalars().all()
+
+        archived = 0
+        for cycle in cycles:
+            records = (
+                await session.execute(
+                    select(cls)
+                    .where(
+                        cls.cycle == cycle,
+                        cls.challengeId == ENDLESS_CHALLENGE_ID,
+                    )
+                    .order_by(cls.score.desc(), cls.id)
+                )
+            ).scalars().all()
+
+            seen = set()
+            position, last_score = 0, None
+            for record in records:
+                if record.wavesId in seen:
+                    continue
+                seen.add(record.wavesId)
+                # 与 get_self_rank 一致: 分数更高的UID数 + 1
+                if record.score != last_score:
+                    position = len(seen)
+                    last_score = record.score
+                session.add(
+                    SlashRankArchive(
+                        cycle=cycle,
+                        position=position,
+                        user_id=record.user_id,
+                        wavesId=record.wavesId,
+                        name=record.name,
+                        score=record.score,
+                        rank=record.rank,
+                        halfList=(
+                            record.halfList
+                            if len(seen) <= ARCHIVE_DETAIL_LENGTH
+                            else ""
+                        ),
+                    )
+                )
+
+            await session.execute(delete(cls).where(cls.cycle == cycle))
+            archived += len(seen)
+
+        if cycles:
+            await session.commit()
+        return archived
+
+
+class SlashRankArchive(SQLModel, table=True):
+    """已结束周期的无尽排行 (每个UID一条)"""
+
+    __tablename__ = "slash_rank_archive"
+    __table_args__ = (
+        Index("ix_slash_archive_cycle_position", "cycle", "position"),
+        Index("ix_slash_archive_cycle_waves", "cycle", "wavesId"),
+        {"extend_existing": True},
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    cycle: int
+    position: int
+    user_id: str
+    wavesId: str
+    name: str
+    score: int
+    rank: str
+    halfList: str = ""
+
+    @classmethod
+    @with_session
+    async def get_last_cycle(cls, session: AsyncSession) -> Optional[int]:
+        """最近一个已归档的周期"""
+        return (await session.execute(select(func.max(cls.cycle)))).scalar()
+
+    @classmethod
+    @with_session
+    async def get_top_records(
+        cls, session: AsyncSession, cycle: int, limit: int
+    ) -> List["SlashRankArchive"]:
+        result = await session.execute(
+            select(cls)
+            .where(cls.cycle == cycle)
+            .order_by(cls.position, cls.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    @classmethod
+    @with_session
+    async def get_self_rank(
+        cls, session: AsyncSession, cycle: int, waves_id: str
+    ) -> Tuple[Optional[int], Optional["SlashRankArchive"]]:
+        record = (
+            await session.execute(
+                select(cls).where(cls.cycle == cycle, cls.wavesId == waves_id)
+            )
+        ).scalars().first()
+        if not record:
+            return None, None
+        return record.position, record
+
+    @classmethod
+    @with_session
+    async def get_rank_stats(
+        cls, session: AsyncSession, cycle: int
+    ) -> Tuple[int, int]:
+        row = (
+            await session.execute(
+                select(func.count(), func.avg(cls.score)).where(cls.cycle == cycle)
+            )
+        ).first()
+        if not row or not row[0]:
+            return 0, 0
+        return int(row[0]), int(row[1] or 0)
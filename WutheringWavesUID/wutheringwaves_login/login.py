@@ -5,7 +5,7 @@ import uuid
 from pathlib import Path
 from typing import Union
 
-import httpx
+import aiohttp
 from async_timeout import timeout
 from pydantic import BaseModel
 from starlette.responses import HTMLResponse
@@ -18,6 +18,7 @@ from gsuid_core.segment import MessageSegment
 from gsuid_core.utils.cookie_manager.qrlogin import get_qrcode_base64
 from gsuid_core.web_app import app
 
+from ..utils.api.http_pool import http_pool
 from ..utils.cache import TimedCache
 from ..utils.database.models import WavesBind, WavesUser
 from ..utils.resource.RESOURCE_PATH import waves_templates
@@ -28,6 +29,8 @@ from ..wutheringwaves_user import deal
 from ..wutheringwaves_user.login_succ import login_success_msg
 
 cache = TimedCache(timeout=600, maxsize=10)
+# 登录服务单次请求超时，避免一次卡住的轮询耗掉登录时间
+LOGIN_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=5)
 
 game_title = "[鸣潮]"
 msg_error = "[鸣潮] 登录失败\n1.是否注册过库街区\n2.库街区能否查询当前鸣潮特征码数据\n"
@@ -151,50 +154,62 @@ async def page_login_other(bot: Bot, ev: Event, url):
         await send_login(bot, ev, f"{url}/waves/i/{token}")
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            r = await client.post(
-                url + "/waves/token",
-                json=auth,
-                headers={"Content-Type": "application/json"},
-            )
-            token = r.json().get("token", "")
-        except Exception as e:
-            token = ""
-            logger.error(e)
-        if not token:
-            return await bot.send("登录服务请求失败! 请稍后再试\n", at_sender=at_sender)
-
-        await send_login(bot, ev, f"{url}/waves/i/{token}")
+    client = await http_pool.get_session()
+    try:
+        async with client.post(
+            url + "/waves/token",
+            json=auth,
+            headers={"Content-Type": "application/json"},
+            timeout=LOGIN_REQUEST_TIMEOUT,
+        ) as r:
+            token = (await r.json(content_type=None)).get("token", "")
+    except Exception as e:
+        token = ""
+        logger.error(e)
+    if not token:
+        return await bot.send("登录服务请求失败! 请稍后再试\n", at_sender=at_sender)
+
+    await send_login(bot, ev, f"{url}/waves/i/{token}")
+
+    cache.set(user_token, token)
+    times = 3
+    async with timeout(600):
+        while True:
+            if times <= 0:
+                return await bot.send(
+                    "登录服务请求失败! 请稍后再试\n", at_sender=at_sender
+                )
+
+            try:
+                async with client.post(
+                    url + "/waves/get",
+                    json={"token": token},
+                    timeout=LOGIN_REQUEST_TIMEOUT,
+                ) as result:
+                    if result.status != 200:
+                        data = None
+                    else:
+                        data = await result.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"登录服务轮询失败: {e}")
+                data = None
+            if data is None:
+                times -= 1
+                await asyncio.sleep(5)
+                continue
+            if not data.get("ck"):
+                await asyncio.sleep(1)
+                continue
 
-        cache.set(user_token, token)
-        times = 3
-        async with timeout(600):
-            while True:
-                if times <= 0:
-                    return await bot.send(
-                        "登录服务请求失败! 请稍后再试\n", at_sender=at_sender
-                    )
-
-                result = await client.post(url + "/waves/get", json={"token": token})
-                if result.status_code != 200:
-                    times -= 1
-                    await asyncio.sleep(5)
-                    continue
-                data = result.json()
-                if not data.get("ck"):
-                    await asyncio.sleep(1)
-                    continue
-
-                waves_user = await add_cookie(ev, data["ck"], data["did"])
-                cache.delete(user_token)
-                if waves_user and isinstance(waves_user, WavesUser):
-                    return await login_success_msg(bot, ev, waves_user)
+            waves_user = await add_cookie(ev, data["ck"], data["did"])
+            cache.delete(user_token)
+            if waves_user and isinstance(waves_user, WavesUser):
+                return await login_success_msg(bot, ev, waves_user)
+            else:
+                if isinstance(waves_user, str):
+                    return await bot.send(waves_user, at_sender=at_sender)
                 else:
-                    if isinstance(waves_user, str):
-                        return await bot.send(waves_user, at_sender=at_sender)
-                    else:
-                        return await bot.send(msg_error, at_sender=at_sender)
+                    return await bot.send(msg_error, at_sender=at_sender)
 
 
 async def page_login(bot: Bot, ev: Event):
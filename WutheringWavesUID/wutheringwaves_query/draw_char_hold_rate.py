@@ -1,4 +1,3 @@
-import asyncio
 import copy
 from pathlib import Path
 from typing import Dict, Union
@@ -10,8 +9,11 @@ from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.ascension.char import get_char_model
-from ..utils.char_info_utils import get_all_role_detail_info_list
-from ..utils.database.models import WavesBind, WavesCharHoldRate
+from ..utils.database.hold_rate_index import (
+    char_hold_rate_index,
+    group_hold_rate_cache,
+)
+from ..utils.database.models import WavesBind, WavesCharHoldRate, WavesRoleData
 from ..utils.fonts.waves_fonts import (
     waves_font_20,
     waves_font_24,
@@ -251,8 +253,24 @@ async def draw_pic(roleId):
     condition=lambda x: x,
 )
 async def get_char_hold_rate_data() -> Dict:
-    """获取角色持有率数据（从本地数据库缓存）"""
+    """获取角色持有率数据（优先使用实时计数，未就绪时读取本地数据库缓存）"""
     try:
+        if char_hold_rate_index.ready:
+            total_player_count, stats = char_hold_rate_index.snapshot()
+            if total_player_count:
+                return {
+                    "total_player_count": total_player_count,
+                    "char_hold_rate": [
+                        {
+                            "char_id": i["char_id"],
+                            "player_count": i["hold_count"],
+                            "hold_rate": i["hold_rate"],
+                            "chain_hold_rate": i["chain_distribution"],
+                        }
+                        for i in stats
+                    ],
+                }
+
         # 从缓存表读取
         cache_records = await WavesCharHoldRate.get_all_hold_rates()
 
@@ -283,63 +301,23 @@ async def get_char_hold_rate_data() -> Dict:
 
 
 async def get_group_char_hold_rate_data(group_id: str) -> Dict:
-    """获取群组角色持有率数据"""
+    """获取群组角色持有率数据（数据库层聚合，按群缓存）"""
     res = {}
 
-    users = await WavesBind.get_group_all_uid(group_id)
-    if not users:
+    user_uids = await WavesBind.get_group_user_uids(group_id)
+    if not user_uids:
         return res
 
-    uid_fiter = {}
-
-    # 创建用于处理并发请求的Semaphore
-    semaphore = asyncio.Semaphore(20)
-
-    async def process_uid(uid):
-        """处理单个UID的数据"""
-        if uid in uid_fiter:
-            return None
-
-        # 获取 RoleDetailData 对象列表
-        # 这里会返回包含 RoleDetailData 对象的列表
-        role_details = await get_all_role_detail_info_list(uid)
-        if role_details is None:
-            return None
-
-        uid_data = {}
-        for role_detail in role_details:
-            # 统一调用 get_chain_num()，确保准确获取共鸣链数
-            uid_data[role_detail.role.roleId] = role_detail.get_chain_num()
-
-        return uid, uid_data
-
     # 提取所有需要处理的UID
-    all_uids = []
-    for user in users:
-        if not user.uid:
-            continue
-        uids = user.uid.split("_")
-        for uid in uids:
-            if uid not in uid_fiter:
-                all_uids.append(uid)
-
-    # 使用Semaphore限制并发处理UID
-    async def process_with_semaphore(uid):
-        async with semaphore:
-            return await process_uid(uid)
+    all_uids = {uid for _, uid in user_uids}
 
-    # 并发执行所有UID的任务
-    tasks = [process_with_semaphore(uid) for uid in all_uids]
-    results = await asyncio.gather(*tasks)
+    cache = group_hold_rate_cache.get(group_id, all_uids)
+    if cache is not None:
+        return cache
 
-    # 合并结果
-    for result in results:
-        if result:
-            uid, uid_data = result
-            uid_fiter[uid] = uid_data
-
-    # 计算持有率
-    total_player_count = len(uid_fiter)
+    total_player_count, rows = await WavesRoleData.get_hold_rate_stats(
+        list(all_uids)
+    )
 
     if total_player_count == 0:
         return res
@@ -347,19 +325,18 @@ async def get_group_char_hold_rate_data(group_id: str) -> Dict:
     # 统计角色持有情况
     char_stats = {}
 
-    for uid, chars in uid_fiter.items():
-        for char_id, chain_num in chars.items():
-            if char_id not in char_stats:
-                char_stats[char_id] = {
-                    "player_count": 0,
-                    "chains": {str(i): 0 for i in range(7)},
-                }
+    for char_id, chain_num, count in rows:
+        if char_id not in char_stats:
+            char_stats[char_id] = {
+                "player_count": 0,
+                "chains": {str(i): 0 for i in range(7)},
+            }
 
-            # 增加持有人数
-            char_stats[char_id]["player_count"] += 1
+        # 增加持有人数
+        char_stats[char_id]["player_count"] += count
 
-            # 增加对应共鸣链数量
-            char_stats[char_id]["chains"][str(chain_num)] += 1
+        # 增加对应共鸣链数量
+        char_stats[char_id]["chains"][str(chain_num)] += count
 
     # 构建结果数据
     char_hold_rate = []
@@ -386,6 +363,7 @@ async def get_group_char_hold_rate_data(group_id: str) -> Dict:
 
     # 构建最终结果
     res = {"total_player_count": total_player_count, "char_hold_rate": char_hold_rate}
+    group_hold_rate_cache.set(group_id, all_uids, res)
 
     return res
 
@@ -1,13 +1,14 @@
 from pathlib import Path
 from typing import Dict, List, Union
 
-import httpx
+import aiohttp
 from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.api.http_pool import http_pool
 from ..utils.api.wwapi import ABYSS_TYPE_MAP_REVERSE, GET_TOWER_APPEAR_RATE
 from ..utils.ascension.char import get_char_model
 from ..utils.ascension.model import CharacterModel
@@ -26,19 +27,19 @@ TEXT_PATH = Path(__file__).parent / "texture2d"
 
 @timed_async_cache(expiration=3600, condition=lambda x: isinstance(x, dict))
 async def get_tower_appear_rate_data() -> Union[Dict, None]:
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.get(
-                GET_TOWER_APPEAR_RATE,
-                headers={
-                    "Content-Type": "application/json",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return res.json().get("data", [])
-        except Exception as e:
-            logger.exception(f"获取深塔出场率数据失败: {e}")
+    client = await http_pool.get_session()
+    try:
+        async with client.get(
+            GET_TOWER_APPEAR_RATE,
+            headers={
+                "Content-Type": "application/json",
+            },
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as res:
+            if res.status == 200:
+                return (await res.json(content_type=None)).get("data", [])
+    except Exception as e:
+        logger.exception(f"获取深塔出场率数据失败: {e}")
 
 
 async def draw_tower_use_rate(ev: Event):
@@ -12,17 +12,12 @@ from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
-from ..utils.api.model import RoleDetailData, WeaponData
+from ..utils.api.model import WeaponData
 from ..utils.cache import TimedCache
-from ..utils.calc import WuWaCalc
-from ..utils.calculate import (
-    calc_phantom_score,
-    get_calc_map,
-    get_total_score_bg,
-)
+from ..utils.calculate import calc_phantom_score
 from ..utils.char_info_utils import get_all_role_detail_info_list
 from ..utils.damage.abstract import DamageRankRegister
-from ..utils.database.models import WavesBind, WavesUser, WavesRoleData
+from ..utils.database.models import WavesBind, WavesRoleData
 from ..utils.fonts.waves_fonts import (
     waves_font_14,
     waves_font_16,
@@ -53,6 +48,7 @@ from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
 from ..utils.resource.constant import SPECIAL_CHAR, SPECIAL_CHAR_NAME
 from ..utils.util import hide_uid
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
+from .rank_display import RankDisplay, get_rank_display
 
 rank_length = 20  # 排行长度
 TEXT_PATH = Path(__file__).parent / "texture2d"
@@ -69,7 +65,7 @@ pic_cache = TimedCache(86400, 200)
 
 
 class RankInfo(BaseModel):
-    roleDetail: RoleDetailData  # 角色明细
+    display: RankDisplay  # 展示数据
     qid: str  # qq id
     uid: str  # uid
     level: int  # 角色等级
@@ -82,46 +78,29 @@ class RankInfo(BaseModel):
     sonata_name: str  # 合鸣效果
 
 
-def db_row_to_rank_info(row: WavesRoleData, qid: str) -> RankInfo:
-    """将数据库行数据转换为 RankInfo 对象"""
-    role_detail = RoleDetailData.parse_obj(row.data)
-    sonata_name = ""
-    
-    calc_temp = get_calc_map({}, role_detail.role.roleName, role_detail.role.roleId)
-    
-    # 如果有声骸数据，进行完整计算并更新 calc_temp
-    if role_detail.phantomData and role_detail.phantomData.equipPhantomList:
-        calc = WuWaCalc(role_detail)
-        calc.phantom_pre = calc.prepare_phantom()
-        phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
-        calc_temp = get_calc_map(phantom_card, role_detail.role.roleName, role_detail.role.roleId)
-        
-        ph_detail = phantom_card.get("ph_detail", [])
-        for ph in ph_detail:
-            if ph.get("ph_num") == 5 or ph.get("isFull"):
-                sonata_name = ph.get("ph_name", "")
-                break
-
-    # 获取评分背景 (S/A/B/C)
-    score_bg = get_total_score_bg(role_detail.role.roleName, row.score, calc_temp)
+async def db_row_to_rank_info(row: WavesRoleData, qid: str) -> Optional[RankInfo]:
+    """将数据库行数据转换为 RankInfo 对象 (使用预计算的展示字段)"""
+    display = await get_rank_display(row)
+    if not display:
+        return None
 
     return RankInfo(
-        roleDetail=role_detail,
+        display=display,
         qid=qid,
         uid=row.uid,
-        level=role_detail.role.level,
-        chain=role_detail.get_chain_num(),
-        chainName=role_detail.get_chain_name(),
+        level=display.level,
+        chain=display.chain,
+        chainName=display.chain_name,
         score=row.score,
-        score_bg=score_bg,
+        score_bg=display.score_bg,
         expected_damage=f"{int(row.damage):,}",
         expected_damage_int=int(row.damage),
-        sonata_name=sonata_name,
+        sonata_name=display.sonata_name,
     )
 
 
-async def get_waves_token_condition(ev):
-    wavesTokenUsersMap = {}
+async def get_waves_token_condition(ev) -> bool:
+    """排行是否只统计拥有有效CK的用户"""
     flag = False
 
     # 群组 不限制token
@@ -129,7 +108,7 @@ async def get_waves_token_condition(ev):
         "WavesRankNoLimitGroup"
     ).data
     if WavesRankUseTokenGroup and ev.group_id in WavesRankUseTokenGroup:
-        return flag, wavesTokenUsersMap
+        return flag
 
     # 群组 自定义的
     WavesRankUseTokenGroup = WutheringWavesConfig.get_config(
@@ -140,11 +119,9 @@ async def get_waves_token_condition(ev):
     if (
         WavesRankUseTokenGroup and ev.group_id in WavesRankUseTokenGroup
     ) or RankUseToken:
-        wavesTokenUsers = await WavesUser.get_waves_all_user()
-        wavesTokenUsersMap = {(w.user_id, w.uid): w.cookie for w in wavesTokenUsers}
         flag = True
 
-    return flag, wavesTokenUsersMap
+    return flag
 
 
 async def draw_rank_img(
@@ -172,31 +149,25 @@ async def draw_rank_img(
     logger.info(f"[draw_rank_img] start processing for group: {ev.group_id}")
     
     # 获取群里的所有拥有该角色人的数据
-    users = await WavesBind.get_group_all_uid(ev.group_id)
+    user_uids = await WavesBind.get_group_user_uids(ev.group_id)
     
-    if not users:
+    if not user_uids:
         msg = []
         msg.append(f"[鸣潮] 群【{ev.group_id}】暂无【{char}】面板")
         msg.append(f"请使用【{PREFIX}刷新面板】后再使用此功能！")
         msg.append("")
         return "\n".join(msg)
 
-    tokenLimitFlag, wavesTokenUsersMap = await get_waves_token_condition(ev)
+    tokenLimitFlag = await get_waves_token_condition(ev)
     
     # 构建 uid -> qid(平台用户id) 映射，并在需要时按有效 ck 过滤
     uid_map = {}
-    for bind in users:
-        if not bind.uid:
-            continue
-        for _uid in str(bind.uid).split('_'):
-            _uid = _uid.strip()
-            if not _uid:
+    for user_id, _uid in user_uids:
+        if tokenLimitFlag:
+            # 仅保留拥有有效 cookie 的 (user_id, uid)
+            if not await WavesBind.has_valid_token(user_id, _uid):
                 continue
-            if tokenLimitFlag:
-                # 仅保留拥有有效 cookie 的 (user_id, uid)
-                if (bind.user_id, _uid) not in wavesTokenUsersMap or not wavesTokenUsersMap.get((bind.user_id, _uid)):
-                    continue
-            uid_map[_uid] = bind.user_id
+        uid_map[_uid] = user_id
 
     uid_list = list(uid_map.keys())
 
@@ -232,25 +203,28 @@ async def draw_rank_img(
         return "\n".join(msg)
 
 
-    # 转换为 RankInfo 并处理排名
-    rankInfoList = []
+    # 处理排名，只转换需要展示的行
+    rank_rows = [row for row in all_rows if uid_map.get(row.uid)]
     self_real_index = -1
-    for index, row in enumerate(all_rows):
-        qid = uid_map.get(row.uid)
-        if not qid:
-            continue
-        rank_info = db_row_to_rank_info(row, qid)
-        rankInfoList.append(rank_info)
-        if self_uid and row.uid == self_uid:
-            self_real_index = len(rankInfoList) - 1
-            
-    display_list = rankInfoList[:rank_length]
+    if self_uid:
+        for index, row in enumerate(rank_rows):
+            if row.uid == self_uid:
+                self_real_index = index
+                break
+
+    display_rows = rank_rows[:rank_length]
 
     rankId = None
     if self_real_index != -1:
         rankId = self_real_index + 1
         if self_real_index >= rank_length:
-            display_list.append(rankInfoList[self_real_index])
+            display_rows.append(rank_rows[self_real_index])
+
+    display_list: List[RankInfo] = []
+    for row in display_rows:
+        rank_info = await db_row_to_rank_info(row, uid_map[row.uid])
+        if rank_info:
+            display_list.append(rank_info)
 
     totalNum = len(display_list)
     
@@ -271,14 +245,14 @@ async def draw_rank_img(
 
     # 批量获取头像
     tasks = [
-        get_avatar(ev, rank.qid, rank.roleDetail.role.roleId) for rank in display_list
+        get_avatar(ev, rank.qid, rank.display.role_id) for rank in display_list
     ]
     avatars = await asyncio.gather(*tasks)
 
     for index, temp in enumerate(zip(display_list, avatars)):
         rank, role_avatar = temp
         rank: RankInfo
-        rank_role_detail: RoleDetailData = rank.roleDetail
+        rank_display: RankDisplay = rank.display
         
         bar_bg = bar.copy()
         bar_star_draw = ImageDraw.Draw(bar_bg)
@@ -286,7 +260,7 @@ async def draw_rank_img(
 
         # 属性图标
         role_attribute = await get_attribute(
-            rank_role_detail.role.attributeName or "导电", is_simple=True
+            rank_display.attribute_name or "导电", is_simple=True
         )
         role_attribute = role_attribute.resize((40, 40)).convert("RGBA")
         bar_bg.alpha_composite(role_attribute, (300, 20))
@@ -337,7 +311,7 @@ async def draw_rank_img(
 
         # 武器
         weapon_bg_temp = Image.new("RGBA", (600, 300))
-        weaponData: WeaponData = rank_role_detail.weaponData
+        weaponData: Optional[WeaponData] = rank_display.weaponData
         if weaponData and weaponData.weapon:
              weapon_icon = await get_square_weapon(weaponData.weapon.weaponId)
              weapon_icon = crop_center_img(weapon_icon, 110, 110)
@@ -12,13 +12,8 @@ from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
-from ..utils.api.model import RoleDetailData, WeaponData
+from ..utils.api.model import WeaponData
 from ..utils.cache import TimedCache
-from ..utils.calc import WuWaCalc
-from ..utils.calculate import (
-    get_calc_map,
-    get_total_score_bg,
-)
 from ..utils.damage.abstract import DamageRankRegister
 from ..utils.database.models import WavesBind, WavesRoleData, WavesUser
 from ..utils.fonts.waves_fonts import (
@@ -51,6 +46,7 @@ from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
 from ..utils.resource.constant import SPECIAL_CHAR, SPECIAL_CHAR_NAME
 from ..utils.util import hide_uid
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
+from .rank_display import RankDisplay, get_rank_display
 
 rank_length = 20  # 排行长度
 TEXT_PATH = Path(__file__).parent / "texture2d"
@@ -65,7 +61,7 @@ pic_cache = TimedCache(86400, 200)
 
 
 class RankInfo(BaseModel):
-    roleDetail: RoleDetailData  # 角色明细
+    display: RankDisplay  # 展示数据
     qid: str  # qq id
     uid: str  # uid
     level: int  # 角色等级
@@ -130,59 +126,26 @@ def get_weapon_icon_bg(star: int = 3) -> Image.Image:
 
 
 async def process_rank_data(role_data, rank_id, uid_to_user_id) -> Optional[RankInfo]:
-    """处理数据库数据转为RankInfo，包含评级计算"""
+    """处理数据库数据转为RankInfo，使用保存时预计算的展示字段"""
     try:
-        role_detail = RoleDetailData(**role_data.data) if role_data.data else None
-        if not role_detail:
+        display = await get_rank_display(role_data)
+        if not display:
             return None
 
         user_id = uid_to_user_id.get(role_data.uid, role_data.uid)
 
-        # === 核心修复：重新计算标准以获取正确的 score_bg ===
-        calc = WuWaCalc(role_detail)
-        calc.phantom_pre = calc.prepare_phantom()
-        calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
-        
-        # 获取毕业标准 Map
-        calc_temp = get_calc_map(
-            calc.phantom_card,
-            role_detail.role.roleName,
-            role_detail.role.roleId,
-        )
-
-        # 计算评级背景 S/A/B/C
-        score_bg_val = "C"
-        if role_data.score > 0:
-            score_bg_val = get_total_score_bg(
-                role_detail.role.roleName,
-                role_data.score,
-                calc_temp 
-            )
-        # ===============================================
-
-        # 计算合鸣效果
-        sonata_name = ""
-        ph_detail = calc.phantom_card.get("ph_detail", [])
-        if isinstance(ph_detail, list):
-            for ph in ph_detail:
-                if ph.get("ph_num") == 5:
-                    sonata_name = ph.get("ph_name", "")
-                    break
-                if ph.get("isFull") and not sonata_name:
-                    sonata_name = ph.get("ph_name", "")
-
         return RankInfo(
-            roleDetail=role_detail,
+            display=display,
             qid=str(user_id),
             uid=role_data.uid,
-            level=role_detail.role.level,
-            chain=role_detail.get_chain_num(),
-            chainName=role_detail.get_chain_name(),
+            level=display.level,
+            chain=display.chain,
+            chainName=display.chain_name,
             score=role_data.score,
-            score_bg=score_bg_val,
+            score_bg=display.score_bg,
             expected_damage=f"{int(role_data.damage):,}" if role_data.damage > 0 else "0",
             expected_damage_int=int(role_data.damage),
-            sonata_name=sonata_name,
+            sonata_name=display.sonata_name,
             rank_id=rank_id
         )
     except Exception as e:
@@ -215,17 +178,6 @@ async def draw_all_rank_card(
         if user_data and user_data.cookie and (not user_data.status or user_data.status == ""):
             target_uid = self_uid
 
-    uid_to_user_id = {}
-    all_binds = await WavesBind.get_all_bind()
-    for bind in all_binds:
-        if bind.uid:
-            for uid in bind.uid.split("_"):
-                if uid:
-                    uid_to_user_id[uid] = bind.user_id
-
-    # Ensure the current viewer sees their own avatar in the list for their UID
-    if target_uid:
-        uid_to_user_id[str(target_uid)] = str(ev.user_id)
     # 调用新接口获取排行数据
     rank_result = await WavesRoleData.get_role_rank_data(
         role_id=str(find_char_id),
@@ -240,6 +192,15 @@ async def draw_all_rank_card(
     if not rank_rows and not self_info_data:
         return f"[鸣潮] 暂无【{char_name}】的排行数据\n请先使用【{PREFIX}刷新面板】！"
 
+    # 只查询上榜 UID 对应的用户
+    uid_to_user_id = await WavesBind.get_uid_to_user_id(
+        [row.uid for row in rank_rows]
+    )
+
+    # Ensure the current viewer sees their own avatar in the list for their UID
+    if target_uid:
+        uid_to_user_id[str(target_uid)] = str(ev.user_id)
+
     rankInfoList: List[RankInfo] = []
     for idx, role_data in enumerate(rank_rows):
         current_rank_id = idx + 1
@@ -293,14 +254,14 @@ async def draw_all_rank_card(
 
     # 获取头像
     tasks = [
-        get_avatar(ev, rank.qid, rank.roleDetail.role.roleId) for rank in rankInfoList
+        get_avatar(ev, rank.qid, rank.display.role_id) for rank in rankInfoList
     ]
     results = await asyncio.gather(*tasks)
 
     for index, temp in enumerate(zip(rankInfoList, results)):
         rank, role_avatar = temp
         rank: RankInfo
-        rank_role_detail: RoleDetailData = rank.roleDetail
+        rank_display: RankDisplay = rank.display
         bar_bg = bar.copy()
         bar_star_draw = ImageDraw.Draw(bar_bg)
         
@@ -309,7 +270,7 @@ async def draw_all_rank_card(
 
         # 属性
         role_attribute = await get_attribute(
-            rank_role_detail.role.attributeName or "导电", is_simple=True
+            rank_display.attribute_name or "导电", is_simple=True
         )
         role_attribute = role_attribute.resize((40, 40)).convert("RGBA")
         bar_bg.alpha_composite(role_attribute, (300, 20))
@@ -360,38 +321,39 @@ async def draw_all_rank_card(
 
         # 武器
         weapon_bg_temp = Image.new("RGBA", (600, 300))
-        weaponData: WeaponData = rank_role_detail.weaponData
-        weapon_icon = await get_square_weapon(weaponData.weapon.weaponId)
-        weapon_icon = crop_center_img(weapon_icon, 110, 110)
-        weapon_icon_bg = get_weapon_icon_bg(weaponData.weapon.weaponStarLevel)
-        weapon_icon_bg.paste(weapon_icon, (10, 20), weapon_icon)
-
-        weapon_bg_temp_draw = ImageDraw.Draw(weapon_bg_temp)
-        weapon_bg_temp_draw.text(
-            (200, 30),
-            f"{weaponData.weapon.weaponName}",
-            SPECIAL_GOLD,
-            waves_font_40,
-            "lm",
-        )
-        weapon_bg_temp_draw.text(
-            (203, 75), f"Lv.{weaponData.level}/90", "white", waves_font_30, "lm"
-        )
+        weaponData: Optional[WeaponData] = rank_display.weaponData
+        if weaponData:
+            weapon_icon = await get_square_weapon(weaponData.weapon.weaponId)
+            weapon_icon = crop_center_img(weapon_icon, 110, 110)
+            weapon_icon_bg = get_weapon_icon_bg(weaponData.weapon.weaponStarLevel)
+            weapon_icon_bg.paste(weapon_icon, (10, 20), weapon_icon)
+
+            weapon_bg_temp_draw = ImageDraw.Draw(weapon_bg_temp)
+            weapon_bg_temp_draw.text(
+                (200, 30),
+                f"{weaponData.weapon.weaponName}",
+                SPECIAL_GOLD,
+                waves_font_40,
+                "lm",
+            )
+            weapon_bg_temp_draw.text(
+                (203, 75), f"Lv.{weaponData.level}/90", "white", waves_font_30, "lm"
+            )
 
-        _x = 220
-        _y = 120
-        wrc_fill = WEAPON_RESONLEVEL_COLOR[weaponData.resonLevel or 0] + (
-            int(0.8 * 255),
-        )
-        weapon_bg_temp_draw.rounded_rectangle(
-            [_x - 15, _y - 15, _x + 50, _y + 15], radius=7, fill=wrc_fill
-        )
-        weapon_bg_temp_draw.text(
-            (_x, _y), f"精{weaponData.resonLevel}", "white", waves_font_24, "lm"
-        )
+            _x = 220
+            _y = 120
+            wrc_fill = WEAPON_RESONLEVEL_COLOR[weaponData.resonLevel or 0] + (
+                int(0.8 * 255),
+            )
+            weapon_bg_temp_draw.rounded_rectangle(
+                [_x - 15, _y - 15, _x + 50, _y + 15], radius=7, fill=wrc_fill
+            )
+            weapon_bg_temp_draw.text(
+                (_x, _y), f"精{weaponData.resonLevel}", "white", waves_font_24, "lm"
+            )
 
-        weapon_bg_temp.alpha_composite(weapon_icon_bg, dest=(45, 0))
-        bar_bg.alpha_composite(weapon_bg_temp.resize((260, 130)), dest=(580, 25))
+            weapon_bg_temp.alpha_composite(weapon_icon_bg, dest=(45, 0))
+            bar_bg.alpha_composite(weapon_bg_temp.resize((260, 130)), dest=(580, 25))
 
         # 伤害
         rankDetail = DamageRankRegister.find_class(char_id)
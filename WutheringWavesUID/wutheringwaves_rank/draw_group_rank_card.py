@@ -57,19 +57,16 @@ async def draw_group_rank(bot: Bot, ev: Event) -> Union[str, bytes]:
         self_uid = ""
 
     # 获取群内所有绑定的UID
-    group_binds = await WavesBind.get_group_all_uid(ev.group_id)
-    if not group_binds:
+    group_user_uids = await WavesBind.get_group_user_uids(ev.group_id)
+    if not group_user_uids:
         return "群内暂无用户登录"
 
     # 收集所有UID
     all_uids = []
     uid_to_user_id = {}
-    for bind in group_binds:
-        if bind.uid:
-            for uid in bind.uid.split("_"):
-                if uid:
-                    all_uids.append(uid)
-                    uid_to_user_id[uid] = bind.user_id
+    for user_id, uid in group_user_uids:
+        all_uids.append(uid)
+        uid_to_user_id[uid] = user_id
 
     # Ensure the current viewer sees their own avatar for their UID
     if self_uid:
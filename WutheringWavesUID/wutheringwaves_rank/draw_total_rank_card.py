@@ -93,13 +93,9 @@ async def draw_total_rank(bot: Bot, ev: Event) -> Union[str, bytes]:
         return "[鸣潮] 暂无练度总排行数据\n请先使用刷新面板功能后再试！"
 
     # 获取所有user_id对应的绑定信息
-    uid_to_user_id = {}
-    all_binds = await WavesBind.get_all_bind()
-    for bind in all_binds:
-        if bind.uid:
-            for uid in bind.uid.split("_"):
-                if uid:
-                    uid_to_user_id[uid] = bind.user_id
+    uid_to_user_id = await WavesBind.get_uid_to_user_id(
+        [rank_data["uid"] for rank_data in rank_data_list]
+    )
 
     # Ensure the viewer sees their own avatar for their UID when multiple users share the same UID
     if target_uid:
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from gsuid_core.logger import logger
+
+from ..utils.api.model import RoleDetailData, Weapon, WeaponData
+from ..utils.ascension.char import char_id_data
+from ..utils.ascension.weapon import weapon_id_data
+from ..utils.calc import WuWaCalc
+from ..utils.calculate import get_calc_map
+from ..utils.database.models import RANK_DISPLAY_COLS, WavesRoleData
+from ..utils.resource.constant import ATTRIBUTE_ID_MAP
+
+
+class RankDisplay(BaseModel):
+    """排行榜单行展示数据"""
+
+    role_id: int
+    attribute_name: str
+    level: int
+    chain: int
+    chain_name: str
+    score_bg: str
+    sonata_name: str
+    weaponData: Optional[WeaponData]
+
+
+def _calc_display(role_detail: RoleDetailData, score: float) -> Dict[str, Any]:
+    """旧数据没有预计算的展示字段，按保存时的方式重新计算"""
+    if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
+        calc_temp = get_calc_map({}, role_detail.role.roleName, role_detail.role.roleId)
+        return WuWaCalc.get_rank_display(role_detail, score, None, calc_temp)
+
+    calc = WuWaCalc(role_detail)
+    calc.phantom_pre = calc.prepare_phantom()
+    phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
+    calc_temp = get_calc_map(
+        phantom_card, role_detail.role.roleName, role_detail.role.roleId
+    )
+    return WuWaCalc.get_rank_display(role_detail, score, phantom_card, calc_temp)
+
+
+def calc_rank_display(role_detail: RoleDetailData, score: float) -> Dict[str, Any]:
+    """重新计算展示字段，评分模板计算失败时退回不依赖模板的展示字段"""
+    try:
+        return _calc_display(role_detail, score)
+    except Exception as e:
+        logger.exception(f"角色 {role_detail.role.roleId} 排行展示字段计算失败:", e)
+        return WuWaCalc.get_rank_display(role_detail, score)
+
+
+async def backfill_rank_display(batch: int = 200) -> int:
+    """分批为旧数据补充排行展示字段，返回补充的行数"""
+    last_id, total = 0, 0
+    while True:
+        rows = await WavesRoleData.get_display_missing(last_id, batch)
+        if not rows:
+            return total
+        last_id = rows[-1].id
+        displays: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for row in rows:
+            try:
+                role_detail = RoleDetailData(**(row.data or {}))
+            except Exception as e:
+                logger.warning(f"角色数据无法解析 uid={row.uid} role_id={row.role_id}: {e}")
+                continue
+            displays[(row.uid, row.role_id)] = calc_rank_display(role_detail, row.score)
+        if displays:
+            await WavesRoleData.save_rank_display(displays)
+        total += len(displays)
+        await asyncio.sleep(0)
+
+
+def _weapon_data(display: Dict[str, Any]) -> Optional[WeaponData]:
+    weapon = weapon_id_data.get(str(display["weapon_id"]))
+    if not weapon:
+        return None
+    return WeaponData(
+        weapon=Weapon(
+            weaponId=display["weapon_id"],
+            weaponName=weapon["name"],
+            weaponType=weapon["type"],
+            weaponStarLevel=weapon["starLevel"],
+            weaponIcon=None,
+            weaponEffectName=weapon.get("effectName"),
+        ),
+        level=display["weapon_level"],
+        resonLevel=display["weapon_reson"],
+    )
+
+
+async def get_rank_display(row: WavesRoleData) -> Optional[RankDisplay]:
+    """
+    使用保存时预计算的展示字段，不读取面板数据
+    旧数据(未预计算，启动时后台回填)单独读取该行面板重新计算并写回
+    """
+    if row.score_bg:
+        display = {c: getattr(row, c) for c in RANK_DISPLAY_COLS}
+    else:
+        data = await WavesRoleData.get_role_data(row.uid, row.role_id)
+        if not data:
+            return None
+        display = calc_rank_display(RoleDetailData(**data), row.score)
+        await WavesRoleData.save_rank_display({(row.uid, row.role_id): display})
+
+    char = char_id_data.get(str(row.role_id), {})
+    return RankDisplay(
+        role_id=int(row.role_id),
+        attribute_name=ATTRIBUTE_ID_MAP.get(char.get("attributeId"), ""),
+        level=display["role_level"],
+        chain=row.chain_num,
+        chain_name=display["chain_name"],
+        score_bg=display["score_bg"],
+        sonata_name=display["sonata_name"],
+        weaponData=_weapon_data(display),
+    )
@@ -4,7 +4,7 @@ import re
 from pathlib import Path
 from typing import Optional
 
-import httpx
+import aiohttp
 from PIL import Image, ImageDraw
 
 from gsuid_core.bot import Bot
@@ -13,6 +13,7 @@ from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
+from ..utils.api.http_pool import http_pool
 from ..utils.api.wwapi import (
     GET_SLASH_RANK_URL,
     SlashRank,
@@ -88,23 +89,23 @@ async def get_rank(item: SlashRankItem) -> Optional[SlashRankRes]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_SLASH_RANK_URL,
-                json=item.dict(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return SlashRankRes.model_validate(res.json())
+    client = await http_pool.get_session()
+    try:
+        async with client.post(
+            GET_SLASH_RANK_URL,
+            json=item.dict(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as res:
+            if res.status == 200:
+                return SlashRankRes.model_validate(await res.json(content_type=None))
             else:
-                logger.warning(f"获取排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"获取排行失败: {e}")
+                logger.warning(f"获取排行失败: {res.status} - {await res.text()}")
+    except Exception as e:
+        logger.exception(f"获取排行失败: {e}")
 
 
 async def draw_all_slash_rank_card(bot: Bot, ev: Event):
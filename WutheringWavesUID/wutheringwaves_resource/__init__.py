@@ -6,6 +6,7 @@ from gsuid_core.models import Event
 from gsuid_core.sv import SV
 
 from ..utils.resource.download_all_resource import download_all_resource
+from ..utils.tasks.reload_calc_map import manual_reload_calc_map
 
 sv_download_config = SV("ww资源下载", pm=1)
 
@@ -17,6 +18,11 @@ async def send_download_resource_msg(bot: Bot, ev: Event):
     await bot.send("[鸣潮] 下载完成！")
 
 
+@sv_download_config.on_fullmatch(("重载评分模板", "刷新评分模板"))
+async def send_reload_calc_map_msg(bot: Bot, ev: Event):
+    await bot.send(f"[鸣潮] {await manual_reload_calc_map()}")
+
+
 async def startup():
     logger.info("[鸣潮] 资源下载任务已在后台启动")
     asyncio.create_task(download_all_resource())
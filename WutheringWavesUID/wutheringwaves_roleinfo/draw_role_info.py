@@ -9,9 +9,9 @@ from gsuid_core.utils.image.convert import convert_img
 from ..utils.api.model import (
     AccountBaseInfo,
     CalabashData,
-    Role,
     RoleDetailData,
     RoleList,
+    RoleListItem,
 )
 from ..utils.char_info_utils import get_all_roleid_detail_info_int
 from ..utils.fonts.waves_fonts import (
@@ -49,7 +49,7 @@ async def draw_role_img(uid: str, ck: str, ev: Event):
     if not role_info.success:
         return role_info.throw_msg()
 
-    role_info = RoleList.model_validate(role_info.data)
+    role_info = RoleList.parse(role_info.data)
     role_info.roleList.sort(
         key=lambda i: (i.level, i.starLevel, i.roleId), reverse=True
     )
@@ -157,7 +157,7 @@ async def draw_role_img(uid: str, ck: str, ev: Event):
     # 根据面板数据获取详细信息
     role_detail_info_map = await get_all_roleid_detail_info_int(uid)
 
-    async def calc_role_info(_x: int, _y: int, roleInfo: Role):
+    async def calc_role_info(_x: int, _y: int, roleInfo: RoleListItem):
         if not role_detail_info_map:
             return
         char_bg = Image.open(TEXT_PATH / "char_bg.png")
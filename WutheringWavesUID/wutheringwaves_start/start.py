@@ -1,13 +1,107 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Set
+
 from gsuid_core.logger import logger
-from gsuid_core.server import on_core_start
+from gsuid_core.server import on_core_shutdown, on_core_start
 
 from ..wutheringwaves_resource import startup
 
 
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def compress_role_data():
+    from ..utils.database.models import WavesRoleData
+
+    try:
+        num = await WavesRoleData.compress_legacy_data()
+        if num:
+            logger.info(f"[鸣潮][角色面板压缩] 转换旧数据: {num}")
+    except Exception as e:
+        logger.exception(f"[鸣潮][角色面板压缩] 转换旧数据失败: {e}")
+
+
+async def backfill_rank_display():
+    from ..wutheringwaves_rank.rank_display import backfill_rank_display
+
+    try:
+        num = await backfill_rank_display()
+        if num:
+            logger.info(f"[鸣潮][排行展示字段] 回填旧数据: {num}")
+    except Exception as e:
+        logger.exception(f"[鸣潮][排行展示字段] 回填旧数据失败: {e}")
+
+
+async def _run_step(name: str, func: Callable[[], Awaitable[Any]]) -> Any:
+    """单个启动步骤，出错只记录日志，不影响其他步骤"""
+    try:
+        return await func()
+    except Exception as e:
+        logger.exception(f"[鸣潮][{name}] 失败: {e}")
+
+
+def _create_background_task(coro: Awaitable[Any]):
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def rebuild_indexes():
+    """重建物化表与内存索引，启动完成后在后台执行；未就绪时查询走数据库"""
+    from ..utils.database.models import (
+        WavesBind,
+        WavesCharHoldRate,
+        WavesRoleData,
+        WavesRoleTotal,
+        WavesValidUid,
+    )
+    from ..utils.database.role_codec import init_role_data_codec, role_data_codec
+    from ..wutheringwaves_endless_rank.endless_rank_cleaner import (
+        migrate_legacy_records,
+        rotate_endless_records,
+    )
+
+    # 有效UID表需在各索引之前重建
+    valid_num = await _run_step("重建有效UID", WavesValidUid.rebuild)
+    if valid_num is not None:
+        logger.info(f"[鸣潮][重建有效UID] 数量: {valid_num}")
+    role_num = await _run_step("重建排行索引", WavesRoleData.rebuild_rank_index)
+    if role_num is not None:
+        logger.info(f"[鸣潮][重建排行索引] 角色数据: {role_num}")
+    await _run_step("重建持有率计数", WavesCharHoldRate.rebuild_hold_rate_index)
+    bind_num = await _run_step("重建绑定索引", WavesBind.rebuild_bind_index)
+    if bind_num is not None:
+        logger.info(f"[鸣潮][重建绑定索引] 绑定数: {bind_num}")
+    total_num = await _run_step("练度总排行", WavesRoleTotal.init_totals)
+    if total_num:
+        logger.info(f"[鸣潮][练度总排行] 回填UID数: {total_num}")
+
+    # 无尽排行: 旧记录归入周期，并归档错过切换时间的上期记录
+    await _run_step("无尽排行迁移", migrate_legacy_records)
+    await _run_step("无尽排行归档", rotate_endless_records)
+
+    # 角色面板压缩存储
+    async def init_codec() -> bool:
+        if not init_role_data_codec():
+            return False
+        if not role_data_codec.current_dict_id:
+            samples = await WavesRoleData.sample_role_data()
+            dict_id = role_data_codec.train(samples)
+            logger.info(f"[鸣潮][角色面板压缩] 训练字典: {dict_id}")
+        return True
+
+    if await _run_step("角色面板压缩", init_codec):
+        _create_background_task(compress_role_data())
+
+    # 旧数据补充排行展示字段，排行渲染不再重新计算
+    _create_background_task(backfill_rank_display())
+
+
 @on_core_start
 async def all_start():
     logger.info("[鸣潮] 启动中...")
     try:
+        from ..utils.calculate import calc_map_cache
         from ..utils.damage.register_char import register_char
         from ..utils.damage.register_echo import register_echo
         from ..utils.damage.register_weapon import register_weapon
@@ -22,6 +116,10 @@ async def all_start():
         register_rank()
         register_char()
 
+        # 预加载评分模板
+        char_maps = await asyncio.to_thread(calc_map_cache.reload, True)
+        logger.info(f"[鸣潮][加载评分模板] 角色数: {len(char_maps)}")
+
         # 初始化任务队列
         init_queues()
 
@@ -33,4 +131,21 @@ async def all_start():
     except Exception as e:
         logger.exception(e)
 
+    # 索引重建较慢且相互独立，放到后台，不阻塞资源下载与启动
+    _create_background_task(rebuild_indexes())
+
     logger.success("[鸣潮] 启动完成✅")
+
+
+@on_core_shutdown
+async def all_shutdown():
+    from ..utils.api.http_pool import http_pool
+
+    await http_pool.close()
+    logger.info("[鸣潮] 网络连接池已关闭")
+
+    from ..utils.database.role_write_buffer import role_write_buffer
+
+    num = await role_write_buffer.close()
+    if num:
+        logger.info(f"[鸣潮] 已提交缓冲中的角色数据: {num}")
@@ -1,5 +1,6 @@
 from gsuid_core.status.plugin_status import register_status
 
+from ..utils.api.http_pool import http_pool
 from ..utils.database.models import WavesBind, WavesUser
 from ..utils.image import get_ICON
 
@@ -14,11 +15,19 @@ async def get_add_num():
     return len(datas)
 
 
+async def get_http_pool_status():
+    stats = http_pool.stats().values()
+    active = sum(i["active"] for i in stats)
+    idle = sum(i["idle"] for i in stats)
+    return f"{active}/{idle}"
+
+
 register_status(
     get_ICON(),
     "WutheringWavesUID",
     {
         "绑定UID": get_add_num,
         "登录账户": get_user_num,
+        "连接数(活跃/空闲)": get_http_pool_status,
     },
 )
@@ -3,12 +3,13 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Union
 
-import httpx
+import aiohttp
 from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
 from gsuid_core.utils.image.convert import convert_img
 
+from ..utils.api.http_pool import http_pool
 from ..utils.api.wwapi import GET_POOL_LIST
 from ..utils.fonts.waves_fonts import waves_font_30, waves_font_58
 from ..utils.image import (
@@ -32,19 +33,19 @@ avatar_mask = Image.open(TEXT_PATH / "avatar_mask.png")
 
 @timed_async_cache(expiration=3600, condition=lambda x: isinstance(x, list))
 async def get_pool_data() -> Union[List, None]:
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.get(
-                GET_POOL_LIST,
-                headers={
-                    "Content-Type": "application/json",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return res.json().get("data", [])
-        except Exception as e:
-            logger.exception(f"获取卡池数据失败: {e}")
+    client = await http_pool.get_session()
+    try:
+        async with client.get(
+            GET_POOL_LIST,
+            headers={
+                "Content-Type": "application/json",
+            },
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as res:
+            if res.status == 200:
+                return (await res.json(content_type=None)).get("data", [])
+    except Exception as e:
+        logger.exception(f"获取卡池数据失败: {e}")
 
 
 async def clean_pool_data():
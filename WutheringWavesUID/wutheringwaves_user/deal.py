@@ -4,6 +4,7 @@ from gsuid_core.bot import Bot
 from gsuid_core.models import Event
 
 from ..utils.api.api import GAME_ID
+from ..utils.api.cookie_pool import public_cookie_pool
 from ..utils.api.model import KuroWavesUserInfo
 from ..utils.api.request_util import PLATFORM_SOURCE
 from ..utils.database.models import WavesBind, WavesUser
@@ -73,6 +74,7 @@ async def add_cookie(ev: Event, ck: str, did: str) -> str:
             },
             update_data={"bat": bat, "did": did},
         )
+        await WavesUser.sync_valid_uid(data.roleId)
 
         res = await WavesBind.insert_waves_uid(
             ev.user_id, ev.bot_id, data.roleId, ev.group_id, lenth_limit=9
@@ -98,6 +100,7 @@ async def add_cookie(ev: Event, ck: str, did: str) -> str:
 
 async def delete_cookie(ev: Event, uid: str) -> str:
     count = await WavesUser.delete_cookie(uid, ev.user_id, ev.bot_id)
+    public_cookie_pool.remove(uid=uid)
     if count == 0:
         return f"[鸣潮] 特征码[{uid}]的token删除失败!\n❌不存在该特征码的token!\n"
     return f"[鸣潮] 特征码[{uid}]的token删除成功!\n"